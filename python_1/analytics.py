@@ -0,0 +1,224 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from hint_rules import HINTS, TK_HINTS
+from numberguessinggamepython import setup_difficulty
+from replay import open_records
+from replay_log import DIFFICULTY_IDS, GUESS, NO_CLUE, SOURCES, TIMEOUT
+
+# ================================
+# Streaming Session Analytics
+# ================================
+# Aggregates guess logs (see replay_log.py) into histograms one chunk at a
+# time. The stages are generators, each consuming the one before:
+#   row_ranges -> chunk tasks -> partial histograms (one per chunk) -> merged totals
+# Each chunk is a slice of a memory-mapped file, so only the pages being
+# counted are resident and files larger than RAM work. With --workers > 1 the
+# chunks are counted in worker processes. At most a few chunks per worker are
+# in flight, so memory stays bounded however many chunks a file has.
+#
+# Histograms, per difficulty and level:
+#   solve_attempts  guesses used to clear the level
+#   bands           hot/cold band of every guess (get_adaptive_hint)
+#   exhausted       levels lost by running out of attempts
+#   timeouts        levels lost to the timer
+# and per difficulty, clues: how often each kind of riddle clue was shown,
+# by the kind of the hint rule that gave it (hint_rules.py).
+#
+# Each lost level counts once. Older CLIs logged a TIMEOUT right after a
+# last-attempt miss that ran past the timer; that loss counts as exhausted.
+# Each chunk is read with the row before it, so such a pair split across
+# chunks is still seen.
+#
+#   python3 analytics.py guesses-*.bin --workers 8
+
+DIFFICULTIES = [setup_difficulty(str(code)) for code in sorted(DIFFICULTY_IDS.values())]
+DIFFICULTY_SLOTS = len(DIFFICULTIES) + 1
+LEVEL_SLOTS = max(d["levels"] for d in DIFFICULTIES) + 1
+ATTEMPT_SLOTS = max(d["attempts"] for d in DIFFICULTIES) + 1
+BAND_NAMES = ("spot on", "super hot", "warm", "chilly", "freezing")
+# Indexed by difficulty id; slot 0 is unused.
+ATTEMPTS = np.array([0] + [d["attempts"] for d in DIFFICULTIES], dtype=np.int64)
+BASE_RANGE = np.array([0] + [d["base_range"] for d in DIFFICULTIES], dtype=np.uint64)
+TK_SOURCE = SOURCES.index("tk")
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+
+def clue_kind_names():
+    """Every kind of clue either hint engine gives, rules added since import included."""
+    return tuple(dict.fromkeys(rule.kind for rule in HINTS.rules + TK_HINTS.rules))
+
+
+def empty_totals():
+    return {
+        "solve_attempts": np.zeros((DIFFICULTY_SLOTS, LEVEL_SLOTS, ATTEMPT_SLOTS), dtype=np.int64),
+        "bands": np.zeros((DIFFICULTY_SLOTS, LEVEL_SLOTS, len(BAND_NAMES)), dtype=np.int64),
+        "exhausted": np.zeros((DIFFICULTY_SLOTS, LEVEL_SLOTS), dtype=np.int64),
+        "timeouts": np.zeros((DIFFICULTY_SLOTS, LEVEL_SLOTS), dtype=np.int64),
+        "clues": np.zeros((DIFFICULTY_SLOTS, len(clue_kind_names())), dtype=np.int64),
+    }
+
+
+def count(shape, *indices):
+    """Histogram of index tuples into an array of the given shape."""
+    flat = np.ravel_multi_index([np.asarray(i, dtype=np.int64) for i in indices], shape)
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+# ================================
+# Per-chunk aggregation
+# ================================
+def clue_kinds(target, difficulty, clue, source):
+    """Which clue_kind_names() entry each shown riddle clue was; -1 for a clue
+    index the target never had."""
+    names = clue_kind_names()
+    kinds = np.full(len(target), -1, dtype=np.int64)
+    tk = source == TK_SOURCE
+    for hints, rows in ((HINTS, ~tk), (TK_HINTS, tk)):
+        if not rows.any():
+            continue
+        rules = hints.clue_rules(target[rows], BASE_RANGE[difficulty[rows]])
+        column = np.minimum(clue[rows].astype(np.int64), rules.shape[1])
+        rules = np.hstack([rules, np.full((len(rules), 1), -1, dtype=rules.dtype)])
+        shown = rules[np.arange(len(rules)), column]
+        # Rule index -1 (no such clue) picks the trailing -1.
+        kind_ids = np.array([names.index(rule.kind) for rule in hints.rules] + [-1])
+        kinds[rows] = kind_ids[shown]
+    return kinds
+
+
+def aggregate(chunk, context=0):
+    """Histograms for one chunk of records. The first context rows are not
+    counted; they are read only to judge the rows after them."""
+    totals = empty_totals()
+    difficulty = chunk["difficulty"].astype(np.int64)
+    level = chunk["level"].astype(np.int64)
+    attempts_left = chunk["attempts_left"].astype(np.int64)
+    target = chunk["target"].astype(np.int64)
+    counted = np.arange(len(chunk)) >= context
+    missed_last = ((chunk["event"] == GUESS) & (chunk["guess"] != target) & (attempts_left == 0))
+    # A timeout logged straight after the same level's last miss is the same loss.
+    after_loss = np.zeros(len(chunk), dtype=bool)
+    after_loss[1:] = (missed_last[:-1] & (chunk["session"][1:] == chunk["session"][:-1])
+                      & (level[1:] == level[:-1]))
+    guessed = counted & (chunk["event"] == GUESS)
+    solved = guessed & (chunk["guess"] == target)
+    plane = totals["exhausted"].shape
+
+    # The CLIs check a correct guess before spending the attempt; Tk spends it first.
+    used = ATTEMPTS[difficulty] - attempts_left + (chunk["source"] != TK_SOURCE)
+    used = np.clip(used, 0, ATTEMPT_SLOTS - 1)
+    totals["solve_attempts"] += count(totals["solve_attempts"].shape,
+                                      difficulty[solved], level[solved], used[solved])
+    totals["bands"] += count(totals["bands"].shape,
+                             difficulty[guessed], level[guessed], chunk["band"][guessed])
+
+    lost = guessed & missed_last
+    totals["exhausted"] += count(plane, difficulty[lost], level[lost])
+    timed_out = counted & (chunk["event"] == TIMEOUT) & ~after_loss
+    totals["timeouts"] += count(plane, difficulty[timed_out], level[timed_out])
+
+    riddled = guessed & (chunk["clue"] != NO_CLUE)
+    if riddled.any():
+        kinds = clue_kinds(chunk["target"][riddled], difficulty[riddled], chunk["clue"][riddled],
+                           chunk["source"][riddled])
+        known = kinds >= 0
+        totals["clues"] += count(totals["clues"].shape, difficulty[riddled][known], kinds[known])
+    return totals
+
+
+def aggregate_range(task):
+    path, start, stop = task
+    context = 1 if start else 0
+    return aggregate(open_records(path)[start - context:stop], context)
+
+
+# ================================
+# Streaming stages
+# ================================
+def row_ranges(count_rows, chunk_rows):
+    for start in range(0, count_rows, chunk_rows):
+        yield start, min(count_rows, start + chunk_rows)
+
+
+def chunk_tasks(paths, chunk_rows):
+    for path in paths:
+        for start, stop in row_ranges(len(open_records(path)), chunk_rows):
+            yield path, start, stop
+
+
+def partial_totals(tasks, workers):
+    """Histograms per chunk, in order, with at most 4 chunks per worker in flight."""
+    if workers <= 1:
+        yield from map(aggregate_range, tasks)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        in_flight = deque()
+        for task in tasks:
+            in_flight.append(pool.submit(aggregate_range, task))
+            if len(in_flight) >= workers * 4:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def merge(partials):
+    totals = empty_totals()
+    for partial in partials:
+        for name, values in partial.items():
+            totals[name] += values
+    return totals
+
+
+def analyse(paths, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1):
+    return merge(partial_totals(chunk_tasks(paths, chunk_rows), workers))
+
+
+# ================================
+# Report
+# ================================
+def print_report(totals):
+    for code, difficulty in enumerate(DIFFICULTIES, 1):
+        bands = totals["bands"][code]
+        if not bands.any() and not totals["timeouts"][code].any():
+            continue
+        print(f"\n{difficulty['name']}")
+        print(f"{'Level':>5} {'Guesses':>10} {'Cleared':>8} {'Avg tries':>9} {'Exhausted':>9} "
+              f"{'Timeouts':>8}   " + " / ".join(BAND_NAMES))
+        for level in range(1, difficulty["levels"] + 1):
+            solves = totals["solve_attempts"][code, level]
+            cleared = int(solves.sum())
+            average = (solves * np.arange(ATTEMPT_SLOTS)).sum() / cleared if cleared else 0.0
+            guesses = int(bands[level].sum())
+            shares = " / ".join(f"{share:.0%}" for share in bands[level] / max(1, guesses))
+            print(f"{level:>5} {guesses:>10} {cleared:>8} {average:>9.2f} "
+                  f"{int(totals['exhausted'][code, level]):>9} "
+                  f"{int(totals['timeouts'][code, level]):>8}   {shares}")
+
+        solves = totals["solve_attempts"][code].sum(axis=0)
+        if solves.any():
+            print("  tries to clear: " + ", ".join(f"{tries}: {int(n)}" for tries, n in enumerate(solves) if n))
+        clues = totals["clues"][code]
+        if clues.any():
+            shown = zip(clue_kind_names(), clues)
+            print("  riddle clues:   " + ", ".join(f"{kind} {int(n)}" for kind, n in shown if n))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming histograms over guess logs.")
+    parser.add_argument("paths", nargs="+", help="guess logs written with GUESS_RECORD=<path>")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    print_report(analyse(args.paths, args.chunk_rows, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import difficulty_config
+from simulator import DIFFICULTY_CHOICES, level_range_for, simulate
+
+# ================================
+# Difficulty Auto-Tuner
+# ================================
+# Searches levels, attempts, base_range and timer for each difficulty so that
+# reference players win about as often as the target says. A configuration is
+# scored by the weighted average win rate of PLAYER_MODELS, each simulated
+# with simulator.simulate. The seed is fixed, so configurations are compared on
+# the same random draws.
+#
+# The search is a pattern search over the grids below. It starts from the
+# current table and, each round, evaluates in a process pool every neighbour
+# one step away in a single parameter. It moves to the best neighbour. When
+# none gets closer, e.g. on a plateau where every nearby table always wins,
+# the step doubles. It stops once the blended win rate is within --tolerance
+# of the target, or no step size helps.
+#
+# Evaluations are cached on disk by configuration, model, session count and
+# seed. Re-runs and searches that revisit a configuration cost nothing.
+# SIMULATOR_VERSION is part of the key; bump it when the simulated rules
+# change so stale results are not reused.
+#
+# Only the difficulties in DEFAULT_TARGETS are tuned. Huge's range is far
+# outside the base_range grid and its rounds are won by bisection, so it has
+# no win rate worth tuning.
+#
+# The tuned table is written next to the cache unless --table says otherwise;
+# both are generated files and are gitignored.
+#
+# The simulator models riddle mode by its hot/cold hints only, so Hard win
+# rates are a slight underestimate for players who use the clues.
+#
+#   python3 autotune.py --target Easy=0.9 --target Hard=0.4 --table difficulty_table.json
+
+DEFAULT_TARGETS = {"Easy": 0.9, "Normal": 0.65, "Hard": 0.4}
+PLAYER_MODELS = {
+    "methodical": {"strategy": "bisect", "think_time": 3.0, "weight": 0.5},
+    "casual": {"strategy": "random", "think_time": 4.0, "weight": 0.5},
+}
+GRID = {
+    "levels": tuple(range(2, 11)),
+    "attempts": tuple(range(3, 16)),
+    "base_range": (10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000),
+    "timer": (0, 10, 15, 20, 25, 30, 45, 60),
+}
+# 2: a guess after the level timer ran out is a timeout, not a clear.
+SIMULATOR_VERSION = 2
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autotune_cache.json")
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "difficulty_table.json")
+
+
+def evaluate(job):
+    """Simulate one configuration for one player model."""
+    config, model, sessions, seed = job
+    difficulty = dict(config)
+    settings = PLAYER_MODELS[model]
+    report = simulate(difficulty, sessions, seed, settings["strategy"], settings["think_time"])
+    return {
+        "win_rate": report["win_rate"],
+        "clear_rates": [row["clear_rate"] for row in report["levels"]],
+        "timeouts": sum(row["timeouts"] for row in report["levels"]) / sessions,
+    }
+
+
+def cache_key(config, model, sessions, seed):
+    return json.dumps([SIMULATOR_VERSION, config, model, sessions, seed], sort_keys=True)
+
+
+class Tuner:
+    def __init__(self, sessions=20_000, seed=0, workers=1, cache_path=DEFAULT_CACHE_PATH):
+        self.sessions = sessions
+        self.seed = seed
+        self.workers = workers
+        self.cache_path = cache_path
+        self.cache = {}
+        self.hits = 0
+        self.evaluations = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.cache = json.load(f)
+        self.pool = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.save()
+
+    def save(self):
+        if self.cache_path:
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.cache, f)
+            os.replace(temp_path, self.cache_path)
+
+    def results(self, configs):
+        """Per-model results for each config, simulating only what is not cached."""
+        jobs = {}
+        for config in configs:
+            for model in PLAYER_MODELS:
+                key = cache_key(config, model, self.sessions, self.seed)
+                if key in self.cache:
+                    self.hits += 1
+                else:
+                    jobs[key] = (config, model, self.sessions, self.seed)
+        runner = self.pool.map if self.pool is not None else map
+        for key, result in zip(jobs, runner(evaluate, jobs.values())):
+            self.cache[key] = result
+        self.evaluations += len(jobs)
+        return [{model: self.cache[cache_key(config, model, self.sessions, self.seed)]
+                 for model in PLAYER_MODELS} for config in configs]
+
+    def tune(self, start, target, tolerance=0.01, max_rounds=50):
+        """Search from start; return (config, per-model results, trail of moves)."""
+        current = start
+        current_result = self.results([current])[0]
+        trail = [(current, blended_win_rate(current_result))]
+        step = 1
+        for _ in range(max_rounds):
+            if abs(blended_win_rate(current_result) - target) <= tolerance:
+                break
+            candidates = list(neighbours(current, step))
+            if not candidates:
+                break
+            scored = zip(candidates, self.results(candidates))
+            best, best_result = min(
+                scored, key=lambda item: (abs(blended_win_rate(item[1]) - target),
+                                          distance(item[0], start)))
+            if abs(blended_win_rate(best_result) - target) >= abs(blended_win_rate(current_result) - target):
+                step *= 2
+                continue
+            current, current_result = best, best_result
+            trail.append((current, blended_win_rate(current_result)))
+            step = 1
+        return current, current_result, trail
+
+
+def blended_win_rate(results):
+    total = sum(settings["weight"] for settings in PLAYER_MODELS.values())
+    return sum(results[model]["win_rate"] * settings["weight"]
+               for model, settings in PLAYER_MODELS.items()) / total
+
+
+def snap(value, grid):
+    return min(grid, key=lambda option: abs(option - value))
+
+
+def starting_config(name):
+    difficulty = difficulty_config(DIFFICULTY_CHOICES[name])
+    for param, grid in GRID.items():
+        difficulty[param] = snap(difficulty[param], grid)
+    return difficulty
+
+
+def neighbours(config, step=1):
+    """Configs step grid positions away in a single parameter."""
+    for param, grid in GRID.items():
+        index = grid.index(config[param])
+        for move in (-step, step):
+            if 0 <= index + move < len(grid):
+                neighbour = dict(config)
+                neighbour[param] = grid[index + move]
+                yield neighbour
+
+
+def distance(config, start):
+    return sum(abs(GRID[p].index(config[p]) - GRID[p].index(start[p])) for p in GRID)
+
+
+# ================================
+# Report
+# ================================
+def report_lines(name, start, tuned, result, target, trail):
+    lines = [f"{name}: target win rate {target:.0%}, tuned {blended_win_rate(result):.1%} "
+             f"in {len(trail) - 1} steps"]
+    for param in GRID:
+        change = "" if start[param] == tuned[param] else f"   (was {start[param]})"
+        lines.append(f"  {param:<10} {tuned[param]}{change}")
+    for model, outcome in result.items():
+        clears = ", ".join(f"{rate:.0%}" for rate in outcome["clear_rates"])
+        lines.append(f"  {model:<10} win {outcome['win_rate']:.1%}, timed out {outcome['timeouts']:.1%}, "
+                     f"level clear rates {clears}")
+    ranges = ", ".join(str(level_range_for(tuned, level)) for level in range(1, tuned["levels"] + 1))
+    lines.append(f"  level ranges {ranges}")
+    return lines
+
+
+def parse_target(text):
+    name, _, rate = text.partition("=")
+    if name not in DEFAULT_TARGETS or not rate:
+        raise argparse.ArgumentTypeError(f"expected Name=rate with Name in {list(DEFAULT_TARGETS)}")
+    try:
+        rate = float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a win rate, not {rate!r}") from None
+    if not 0 <= rate <= 1:
+        raise argparse.ArgumentTypeError(f"expected a win rate between 0 and 1, not {rate}")
+    return name, rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune difficulty parameters to target win rates.")
+    parser.add_argument("--target", type=parse_target, action="append",
+                        help="Name=win rate, e.g. Hard=0.4 (repeatable; default Easy, Normal, Hard)")
+    parser.add_argument("--sessions", type=int, default=20_000, help="simulated games per evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="evaluation cache ('' disables it)")
+    parser.add_argument("--table", default=DEFAULT_TABLE_PATH, help="where to write the tuned table")
+    parser.add_argument("--report", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    targets = dict(args.target) if args.target else DEFAULT_TARGETS
+    tuner = Tuner(args.sessions, args.seed, args.workers, args.cache)
+    table = {}
+    report = []
+    try:
+        for name, target in targets.items():
+            start = starting_config(name)
+            tuned, result, trail = tuner.tune(start, target, args.tolerance)
+            table[name] = tuned
+            report.extend(report_lines(name, start, tuned, result, target, trail))
+            report.append("")
+    finally:
+        tuner.close()
+    report.append(f"{tuner.evaluations} simulations run, {tuner.hits} served from cache")
+
+    with open(args.table, "w") as f:
+        json.dump(table, f, indent=2)
+    print("\n".join(report))
+    print(f"Difficulty table written to {args.table}")
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write("\n".join(report) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
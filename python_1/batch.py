@@ -0,0 +1,185 @@
+import argparse
+import io
+import json
+import random
+import sys
+
+from engine import DIFFICULTY_CHOICES, Round, difficulty_config, level_info
+
+# ================================
+# Scripted Batch Mode
+# ================================
+# Plays the CLI game from JSON lines instead of input(). It uses the same
+# difficulty, hint and scoring rules as play_level, with no slow_print and no
+# renderer. Input lines, from a file or stdin, may interleave any number of
+# sessions:
+#
+#   {"session": "a", "start": "Hard", "seed": 7}     start (or restart) a game;
+#                                                    start is a name or "1"-"4"
+#   {"session": "a", "guess": 50, "elapsed": 3.5}    one guess; elapsed seconds
+#                                                    into the level (default 0,
+#                                                    a finite number >= 0)
+#
+# Optional start fields: "seed" seeds the session's targets and riddle clues,
+# defaulting to "<--seed>:<session>". "targets" pins the target of each level.
+#
+# One JSON line is written per input line, in order:
+#   start    {"session", "result": "start", "difficulty", "level", "range", "attempts"}
+#   guess    {"session", "result", "level", "guess", "score", ...} where result is
+#            miss     + "hints" (the lines play_level prints) and "attempts_left"
+#            correct  + "gained" and the next level's "range"
+#            won      + "gained"
+#            lost     + "hints" and "target"
+#   bad line {"line", "error"} (+ "session" when known); the run goes on.
+#
+# Input is read a line at a time and output is written in blocks, so memory
+# depends only on the number of sessions still in progress. A session is
+# dropped when it is won or lost.
+#
+#   python3 batch.py sessions.jsonl > results.jsonl
+#   python3 numberguessinggamepython.py --batch < sessions.jsonl
+
+WRITE_BLOCK = 1 << 16
+
+
+class BatchSession:
+    """One scripted game: the state play_game keeps between input() calls."""
+
+    __slots__ = ("name", "difficulty", "rng", "targets", "level", "score", "round")
+
+    def __init__(self, name, difficulty, rng, targets=()):
+        self.name = name
+        self.difficulty = difficulty
+        self.rng = rng
+        self.targets = targets
+        self.level = 1
+        self.score = 0
+        self.start_level()
+
+    def start_level(self):
+        level = level_info(self.difficulty, self.level)
+        if self.level <= len(self.targets):
+            target = self.targets[self.level - 1]
+        else:
+            target = self.rng.randint(1, level.range)
+        self.round = Round(level, target, rng=self.rng)
+
+    def guess(self, guess, elapsed=0):
+        """Apply one guess; return (result dict, whether the session is over)."""
+        result = {"session": self.name, "result": "miss", "level": self.level, "guess": guess}
+        outcome = self.round.guess(guess, elapsed)
+        if outcome.cleared:
+            self.score += outcome.gained
+            result["gained"] = outcome.gained
+            result["score"] = self.score
+            if self.level == self.difficulty["levels"]:
+                result["result"] = "won"
+                return result, True
+            self.level += 1
+            self.start_level()
+            result["result"] = "correct"
+            result["range"] = self.round.level.range
+            return result, False
+
+        result["hints"] = outcome.feedback.lines()
+        result["score"] = self.score
+        if outcome.lost:
+            result["result"] = "lost"
+            result["target"] = self.round.target
+            return result, True
+        result["attempts_left"] = self.round.attempts_left
+        return result, False
+
+
+def start_session(message, seed):
+    name = message.get("session")
+    choice = str(message["start"])
+    choice = DIFFICULTY_CHOICES.get(choice, choice)
+    if choice not in DIFFICULTY_CHOICES.values():
+        raise ValueError(f"unknown difficulty {message['start']!r}")
+    targets = tuple(int(t) for t in message.get("targets", ()))
+    rng = random.Random(message.get("seed", f"{seed}:{name}"))
+    session = BatchSession(name, difficulty_config(choice, timed=False), rng, targets)
+    return session, {"session": name, "result": "start", "difficulty": session.difficulty["name"],
+                     "level": 1, "range": session.round.level.range,
+                     "attempts": session.round.attempts_left}
+
+
+def parse_elapsed(message):
+    """The guess line's elapsed seconds; checked on every guess, not just correct ones."""
+    elapsed = message.get("elapsed", 0)
+    if isinstance(elapsed, bool) or not isinstance(elapsed, (int, float)):
+        raise ValueError(f"elapsed must be a number of seconds, not {elapsed!r}")
+    if not 0 <= elapsed < float("inf"):
+        raise ValueError(f"elapsed must be finite and not negative, not {elapsed!r}")
+    return elapsed
+
+
+def run(lines, seed=0):
+    """Yield one result dict per input line."""
+    sessions = {}
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        name = None
+        try:
+            message = json.loads(line)
+            name = message.get("session")
+            if "start" in message:
+                sessions[name], result = start_session(message, seed)
+            elif "guess" in message:
+                if name not in sessions:
+                    raise ValueError("no game in progress, send start first")
+                guess = message["guess"]
+                if isinstance(guess, bool) or not isinstance(guess, int):
+                    raise ValueError("Please enter a valid number.")
+                result, over = sessions[name].guess(guess, parse_elapsed(message))
+                if over:
+                    del sessions[name]
+            else:
+                raise ValueError("expected a start or guess field")
+        except (ValueError, TypeError, AttributeError) as error:
+            result = {"line": number, "error": str(error)}
+            if name is not None:
+                result["session"] = name
+        yield result
+
+
+def write_results(results, out):
+    """Write results as JSON lines, one write per WRITE_BLOCK characters."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    block = []
+    size = 0
+    for result in results:
+        text = encode(result)
+        block.append(text)
+        size += len(text) + 1
+        if size >= WRITE_BLOCK:
+            out.write("\n".join(block) + "\n")
+            block = []
+            size = 0
+    if block:
+        out.write("\n".join(block) + "\n")
+    out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play scripted CLI games from JSON lines.")
+    parser.add_argument("path", nargs="?", default="-", help="JSON lines file (default: stdin)")
+    parser.add_argument("--seed", default="0", help="base seed for sessions that give none")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="\n")
+    else:
+        source = open(args.path, encoding="utf-8", buffering=1 << 20)
+    out = open(args.output or sys.stdout.fileno(), "w", encoding="utf-8", buffering=1 << 20,
+               closefd=args.output is not None)
+    with source, out:
+        write_results(run(source, args.seed), out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import numberguessinggamepython as game
+import startup_bench
+from number_index import NUMBER_INDEX
+from streams import SessionStream
+
+# ================================
+# Benchmark Suite
+# ================================
+# Reproducible benchmarks for the paths performance work touches:
+#   hints    is_prime, get_riddle_hint and get_adaptive_hint throughput for
+#            targets drawn from ranges of 10^2 up to 10^12
+#   play     headless play_level rounds per second, per difficulty
+#   tk       Tk screen transition times (tk_transition_timing.py), under
+#            xvfb-run when there is no display; skipped when neither exists
+#   startup  CLI time to first prompt (startup_bench.py)
+# Inputs come from fixed seeds. As with timeit, the garbage collector is off
+# while timing and each throughput is the best of --repeat passes, which
+# filters out scheduler noise.
+#
+# Every run is saved to the history directory (bench_results/ next to this
+# file by default) as <UTC time>-<commit>.json. Results only mean something on
+# the machine that produced them, so the directory is gitignored, not
+# committed. Each run is compared with a baseline: by default the newest
+# earlier result from the same machine and Python. A metric that is worse by
+# more than --threshold is a regression and makes the exit status 1. The threshold has to sit above
+# the machine's own run-to-run noise: on shared or throttled hosts, run the
+# full suite on an idle machine and raise --threshold rather than trusting
+# --quick numbers.
+#
+#   python3 bench_suite.py run                      # run, save, compare with last
+#   python3 bench_suite.py run --only hints,play --quick
+#   python3 bench_suite.py compare old.json new.json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, "bench_results")
+RANGE_SIZES = (10 ** 2, 10 ** 4, 10 ** 6, 10 ** 12)
+DIFFICULTY_CHOICES = {"Easy": "1", "Normal": "2", "Hard": "3"}
+DEFAULT_THRESHOLD = 0.10
+
+
+class Skipped(Exception):
+    """A benchmark that cannot run here; the message says why."""
+
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best_rate(call, inputs, repeat):
+    """Calls per second of call(*args) over inputs, best of repeat passes."""
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for args in inputs:
+                call(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return len(inputs) / best
+
+
+# ================================
+# Benchmarks
+# ================================
+def bench_hints(quick, repeat):
+    calls = 20_000 if quick else 200_000
+    results = {}
+    for size in RANGE_SIZES:
+        rng = random.Random(size)
+        targets = [(rng.randint(1, size),) for _ in range(calls)]
+        pairs = [(rng.randint(1, size), target) for (target,) in targets]
+        NUMBER_INDEX.ensure(min(size, NUMBER_INDEX.max_limit))
+        label = f"1e{len(str(size)) - 1}"
+        results[f"hints.is_prime.{label}"] = metric(
+            best_rate(NUMBER_INDEX.is_prime, targets, repeat), "calls/s", "higher")
+        results[f"hints.riddle_hint.{label}"] = metric(
+            best_rate(lambda target: game.get_riddle_hint(target, size), targets, repeat),
+            "calls/s", "higher")
+        results[f"hints.adaptive_hint.{label}"] = metric(
+            best_rate(game.get_adaptive_hint, pairs, repeat), "calls/s", "higher")
+    return results
+
+
+def bench_play(quick, repeat):
+    """Levels per second through play_level, with random guesses and output discarded."""
+    rounds = 500 if quick else 5_000
+    results = {}
+    saved = game.RENDERER.mode, game.RENDERER.stream
+    game.RENDERER.mode = "instant"
+    try:
+        with open(os.devnull, "w") as sink:
+            game.RENDERER.stream = sink
+            for name, choice in DIFFICULTY_CHOICES.items():
+                difficulty = game.setup_difficulty(choice)
+                best = float("inf")
+                for _ in range(repeat):
+                    stream = SessionStream(0, 0)
+                    guesses = random.Random(1)
+                    level_range = difficulty["base_range"] + 5
+
+                    def ask(prompt):
+                        return str(guesses.randint(1, level_range))
+
+                    start = time.perf_counter()
+                    for i in range(rounds):
+                        game.play_level(i % difficulty["levels"] + 1, difficulty, 0, ask, stream)
+                    game.RENDERER.flush()
+                    best = min(best, time.perf_counter() - start)
+                results[f"play.levels.{name}"] = metric(rounds / best, "levels/s", "higher")
+    finally:
+        game.RENDERER.mode, game.RENDERER.stream = saved
+    return results
+
+
+def bench_tk(quick, repeat):
+    command = [sys.executable, os.path.join(HERE, "tk_transition_timing.py"),
+               "--rounds", "20" if quick else "200", "--json"]
+    if not os.environ.get("DISPLAY"):
+        if shutil.which("xvfb-run") is None:
+            raise Skipped("no display and no xvfb-run")
+        command = ["xvfb-run", "-a"] + command
+    result = subprocess.run(command, cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Skipped((result.stdout + result.stderr).strip().splitlines()[-1])
+    transitions = json.loads(result.stdout)["transitions"]
+    return {f"tk.{name.replace(' -> ', '_to_')}.mean": metric(row["mean_ms"], "ms", "lower")
+            for name, row in transitions.items()}
+
+
+def bench_startup(quick, repeat):
+    measured = startup_bench.measure(3 if quick else 15)
+    results = {}
+    for name, row in measured["prompt"].items():
+        if "median_ms" in row:
+            results[f"startup.first_prompt.{name}"] = metric(row["median_ms"], "ms", "lower")
+    for name, row in measured["imports"].items():
+        if "total_ms" in row:
+            results[f"startup.import.{name}"] = metric(row["total_ms"], "ms", "lower")
+    return results
+
+
+BENCHMARKS = {"hints": bench_hints, "play": bench_play, "tk": bench_tk, "startup": bench_startup}
+
+
+# ================================
+# Runs and history
+# ================================
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True)
+    except OSError:
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run_suite(names, quick=False, repeat=5):
+    results = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "commit": git_commit(),
+               "machine": machine(), "quick": quick, "metrics": {}, "skipped": {}}
+    for name in names:
+        try:
+            results["metrics"].update(BENCHMARKS[name](quick, repeat))
+        except Skipped as reason:
+            results["skipped"][name] = str(reason)
+    return results
+
+
+def save(results, history):
+    os.makedirs(history, exist_ok=True)
+    stamp = results["time"].replace(":", "").replace("-", "")
+    path = os.path.join(history, f"{stamp}-{results['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def latest_baseline(history, results):
+    """The newest saved run from the same machine, Python and quick setting."""
+    for path in sorted(glob.glob(os.path.join(history, "*.json")), reverse=True):
+        with open(path) as f:
+            previous = json.load(f)
+        if (previous.get("machine") == results["machine"] and previous.get("quick") == results["quick"]
+                and previous["time"] < results["time"]):
+            return path, previous
+    return None, None
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Rows of (metric, old, new, relative change for the better, regressed)."""
+    rows = []
+    for name, new in current["metrics"].items():
+        old = baseline["metrics"].get(name)
+        if old is None or not old["value"]:
+            continue
+        change = new["value"] / old["value"] - 1
+        if new["better"] == "lower":
+            change = old["value"] / new["value"] - 1 if new["value"] else 0.0
+        rows.append((name, old["value"], new["value"], new["unit"], change, change < -threshold))
+    return rows
+
+
+def print_results(results):
+    for name, row in results["metrics"].items():
+        print(f"  {name:<36} {row['value']:>14,.1f} {row['unit']}")
+    for name, reason in results["skipped"].items():
+        print(f"  {name:<36} skipped: {reason}")
+
+
+def print_comparison(rows, threshold):
+    print(f"  {'Metric':<36} {'Before':>14} {'After':>14}   Change")
+    for name, old, new, unit, change, regressed in rows:
+        flag = f"   REGRESSION (>{threshold:.0%})" if regressed else ""
+        print(f"  {name:<36} {old:>14,.1f} {new:>14,.1f}   {change:+7.1%} {unit}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare with history.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run benchmarks, save the result and compare")
+    run.add_argument("--only", default=",".join(BENCHMARKS),
+                     help=f"comma-separated subset of {', '.join(BENCHMARKS)}")
+    run.add_argument("--quick", action="store_true", help="smaller inputs, for a fast check")
+    run.add_argument("--repeat", type=int, default=5, help="passes per throughput measurement")
+    run.add_argument("--history", default=DEFAULT_HISTORY, help="directory of saved results")
+    run.add_argument("--baseline", help="compare with this result file instead of the last run")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="relative slowdown that counts as a regression")
+    run.add_argument("--no-save", action="store_true", help="do not add this run to the history")
+    diff = commands.add_parser("compare", help="compare two saved result files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows, args.threshold)
+        return 1 if any(row[-1] for row in rows) else 0
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    results = run_suite(names, args.quick, args.repeat)
+    print(f"Benchmarks at {results['commit']} ({results['machine']['python']}, "
+          f"{results['machine']['cpus']} CPUs)")
+    print_results(results)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_path, baseline = args.baseline, json.load(f)
+    else:
+        baseline_path, baseline = latest_baseline(args.history, results)
+    if not args.no_save:
+        print(f"Saved {save(results, args.history)}")
+    if baseline is None:
+        print("No earlier result to compare with.")
+        return 0
+    print(f"Compared with {baseline_path}")
+    rows = compare(baseline, results, args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
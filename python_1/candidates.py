@@ -0,0 +1,401 @@
+import argparse
+import functools
+import math
+import sys
+from collections import namedtuple
+
+from hint_rules import HIGHER, HINTS, LOWER, NO_DIRECTION, TK_HINTS, Feedback
+from number_index import NUMBER_CLUES, NUMBER_INDEX, pack_bits
+from engine import level_info
+from numberguessinggamepython import setup_difficulty
+from replay import chunks, open_records, session_records
+from replay_log import NO_CLUE, SOURCES, TIMEOUT
+
+# ================================
+# Candidate Tracker
+# ================================
+# Keeps the targets still consistent with every hint of one level as a
+# big-int bitset. Bit i stands for target lo + i, and lo..hi is the tightest
+# window around the candidates. Each hint is one or two mask operations:
+#   miss          clear the guessed bit
+#   higher/lower  cut the window at the guess
+#   hot/cold      keep guess ± the band's farthest distance, clear the inner span
+#   riddle clue   AND with the clue's mask; property clues come from
+#                 NUMBER_INDEX.clue_mask, other clues test the remaining bits only
+# Nothing rescans 1..level_range per guess. The cost of an operation grows with
+# the window, and the window shrinks with every hint.
+#
+# Windows wider than BITSET_LIMIT (big-range play) are kept as the window
+# minus a list of excluded spans until the hints narrow them. Clues heard
+# before then are applied when the bitset is built, and until that point the
+# count is an upper bound (exact is False).
+#
+# Every hint reports the candidate count before and after it. Information gain
+# is log2(before / after), and a hint that leaves the count unchanged, such as
+# "It’s 50 or less." on a range of 1..15, is flagged useless.
+#
+#   python3 candidates.py guesses.bin                      # gain per hint kind
+#   python3 candidates.py guesses.bin --session 123456789  # hint by hint
+
+BITSET_LIMIT = 1 << 22
+
+
+class HintGain(namedtuple("HintGain", "kind text before after")):
+    """Candidate counts around one hint; after is None for a deferred clue."""
+
+    __slots__ = ()
+
+    @property
+    def bits(self):
+        if self.after is None:
+            return None
+        if self.after == 0:
+            return math.inf
+        return math.log2(self.before / self.after)
+
+    @property
+    def useless(self):
+        return self.after == self.before
+
+
+def ones(n):
+    return (1 << n) - 1
+
+
+def set_bits(mask):
+    """Positions of the set bits of mask, lowest first."""
+    digits = bin(mask)[:1:-1]
+    i = digits.find("1")
+    while i >= 0:
+        yield i
+        i = digits.find("1", i + 1)
+
+
+@functools.lru_cache(maxsize=64)
+def property_mask(code, limit):
+    return NUMBER_INDEX.clue_mask(code, limit)
+
+
+class CandidateTracker:
+    """Targets in 1..level_range still consistent with the hints of one level."""
+
+    def __init__(self, level_range, upper, hints=HINTS):
+        self.level_range = level_range
+        self.upper = upper
+        self.hints = hints
+        self.lo, self.hi = 1, level_range
+        self.mask = None
+        self.holes = []
+        self.pending = []
+        self._materialize()
+
+    @property
+    def exact(self):
+        return not self.pending
+
+    @property
+    def count(self):
+        if self.hi < self.lo:
+            return 0
+        if self.mask is not None:
+            return self.mask.bit_count()
+        return self.hi - self.lo + 1 - sum(last - first + 1 for first, last in self.holes)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, target):
+        if not self.lo <= target <= self.hi:
+            return False
+        if self.mask is not None:
+            return (self.mask >> (target - self.lo)) & 1 == 1
+        return not any(first <= target <= last for first, last in self.holes)
+
+    def __iter__(self):
+        if self.mask is not None:
+            for offset in set_bits(self.mask):
+                yield self.lo + offset
+            return
+        start = self.lo
+        for first, last in self.holes:
+            yield from range(start, first)
+            start = last + 1
+        yield from range(start, self.hi + 1)
+
+    def nth(self, k):
+        """The k-th smallest candidate, counting from 0."""
+        if not 0 <= k < self.count:
+            raise IndexError(k)
+        if self.mask is None:
+            target = self.lo + k
+            for first, last in self.holes:
+                if first > target:
+                    break
+                target += last - first + 1
+            return target
+        # Smallest bit position whose prefix holds more than k candidates.
+        low, high = 0, self.mask.bit_length() - 1
+        while low < high:
+            middle = (low + high) // 2
+            if (self.mask & ones(middle + 1)).bit_count() > k:
+                high = middle
+            else:
+                low = middle + 1
+        return self.lo + low
+
+    # -------------------------
+    # Hints
+    # -------------------------
+    def add_miss(self, guess):
+        return self._measure("miss", f"not {guess}", self._exclude, guess, guess)
+
+    def add_band(self, guess, band):
+        return self._measure("band", self.hints.band_texts[band], self._apply_band, guess, band)
+
+    def add_direction(self, guess, direction):
+        text = "higher" if direction == HIGHER else "lower"
+        return self._measure("direction", text, self._apply_direction, guess, direction)
+
+    def add_clue(self, text):
+        return self._measure("clue", text, self._apply_clue, text)
+
+    def observe(self, guess, feedback):
+        """Apply everything one miss showed (a hint_rules.Feedback); return a HintGain per hint."""
+        gains = [self.add_miss(guess), self.add_band(guess, feedback.band)]
+        if feedback.direction != NO_DIRECTION:
+            gains.append(self.add_direction(guess, feedback.direction))
+        if feedback.clue_text is not None:
+            gains.append(self.add_clue(feedback.clue_text))
+        return gains
+
+    def _measure(self, kind, text, apply, *args):
+        before = self.count
+        apply(*args)
+        after = None if kind == "clue" and self.mask is None else self.count
+        return HintGain(kind, text, before, after)
+
+    def _apply_band(self, guess, band):
+        limits = self.hints.band_limits
+        closest = 0 if band == 0 else limits[band - 1] + 1
+        if band < len(limits):
+            self._restrict(guess - limits[band], guess + limits[band])
+        if closest:
+            self._exclude(guess - closest + 1, guess + closest - 1)
+
+    def _apply_direction(self, guess, direction):
+        if direction == HIGHER:
+            self._restrict(guess + 1, self.hi)
+        elif direction == LOWER:
+            self._restrict(self.lo, guess - 1)
+
+    def _apply_clue(self, text):
+        if self.mask is None:
+            self.pending.append(text)
+            return
+        if not self.mask:
+            return
+        # One property mask per level range serves every window inside it.
+        limit = self.level_range if self.level_range <= NUMBER_INDEX.max_limit else self.hi
+        if text in NUMBER_CLUES and limit <= NUMBER_INDEX.max_limit:
+            keep = property_mask(NUMBER_CLUES.index(text), limit) >> self.lo
+        else:
+            flags = bytearray(self.hi - self.lo + 1)
+            for offset in set_bits(self.mask):
+                if text in self.hints.clues(self.lo + offset, self.upper):
+                    flags[offset] = 1
+            keep = int.from_bytes(pack_bits(flags), "little")
+        self.mask &= keep
+        self._tighten()
+
+    # -------------------------
+    # Window and mask upkeep
+    # -------------------------
+    def _restrict(self, first, last):
+        """Keep only candidates in first..last."""
+        first, last = max(first, self.lo), min(last, self.hi)
+        if first > last:
+            self._clear()
+            return
+        if self.mask is not None:
+            self.mask = (self.mask >> (first - self.lo)) & ones(last - first + 1)
+        else:
+            self.holes = [(max(a, first), min(b, last)) for a, b in self.holes if b >= first and a <= last]
+        self.lo, self.hi = first, last
+        self._tighten()
+
+    def _exclude(self, first, last):
+        """Drop candidates in first..last."""
+        first, last = max(first, self.lo), min(last, self.hi)
+        if first > last:
+            return
+        if self.mask is not None:
+            self.mask &= ~(ones(last - first + 1) << (first - self.lo))
+        else:
+            merged = []
+            for a, b in sorted(self.holes + [(first, last)]):
+                if merged and a <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+                else:
+                    merged.append((a, b))
+            self.holes = merged
+        self._tighten()
+
+    def _tighten(self):
+        """Shrink lo..hi to the lowest and highest candidate."""
+        if self.mask is not None:
+            if not self.mask:
+                self._clear()
+                return
+            low = (self.mask & -self.mask).bit_length() - 1
+            self.hi = self.lo + self.mask.bit_length() - 1
+            self.lo += low
+            self.mask >>= low
+            return
+        while self.holes and self.holes[0][0] <= self.lo:
+            self.lo = max(self.lo, self.holes.pop(0)[1] + 1)
+        while self.holes and self.holes[-1][1] >= self.hi:
+            self.hi = min(self.hi, self.holes.pop()[0] - 1)
+        if self.lo > self.hi:
+            self._clear()
+        else:
+            self._materialize()
+
+    def _materialize(self):
+        """Switch to a bitset once the window fits, then apply deferred clues."""
+        if self.mask is not None or self.hi - self.lo >= BITSET_LIMIT:
+            return
+        mask = ones(self.hi - self.lo + 1)
+        for first, last in self.holes:
+            mask &= ~(ones(last - first + 1) << (first - self.lo))
+        self.mask, self.holes = mask, []
+        pending, self.pending = self.pending, []
+        for text in pending:
+            self._apply_clue(text)
+
+    def _clear(self):
+        self.lo, self.hi, self.mask, self.holes, self.pending = 1, 0, 0, [], []
+
+
+# ================================
+# Guess log reports
+# ================================
+TK_SOURCE = SOURCES.index("tk")
+
+
+class LevelReplay:
+    """Feeds one session's records, in order, to a tracker per level."""
+
+    def __init__(self):
+        self.tracker = None
+        self.key = None
+
+    @property
+    def open(self):
+        """True while a level is under way."""
+        return self.key is not None
+
+    def feed(self, row):
+        """(level, guess, tracker, gains) for a guess record, None for a timeout."""
+        if row["event"] == TIMEOUT:
+            self.key = None
+            return None
+        difficulty = setup_difficulty(str(int(row["difficulty"])))
+        level = int(row["level"])
+        target = int(row["target"])
+        guess = int(row["guess"])
+        # The Tk app gives its own clue set, always for 1..100.
+        hints, upper = (TK_HINTS, 100) if row["source"] == TK_SOURCE else (HINTS, difficulty["base_range"])
+        if self.key != (level, target):
+            self.key = (level, target)
+            self.tracker = CandidateTracker(level_info(difficulty, level).range, upper, hints)
+        tracker = self.tracker
+        if guess == target:
+            self.key = None
+            return level, guess, tracker, []
+        clue = int(row["clue"])
+        clue_text = None if clue == NO_CLUE else hints.clues(target, upper)[clue]
+        band = int(row["band"])
+        feedback = Feedback(band, hints.band_texts[band], int(row["direction"]), None, clue, clue_text)
+        if int(row["attempts_left"]) == 0:
+            # Out of attempts: the level is lost.
+            self.key = None
+        return level, guess, tracker, tracker.observe(guess, feedback)
+
+
+def session_gains(rows):
+    """(level, guess, tracker, gains) per guess of one session's records, in order."""
+    replay = LevelReplay()
+    for row in rows:
+        played = replay.feed(row)
+        if played is not None:
+            yield played
+
+
+def describe(gain):
+    if gain.after is None:
+        return f"  {gain.text:<30} {gain.before:>8} candidates (applied once the range narrows)"
+    line = f"  {gain.text:<30} {gain.before:>8} → {gain.after:<8} {gain.bits:5.2f} bits"
+    return line + ("   ⚠ adds nothing" if gain.useless else "")
+
+
+def print_session(rows):
+    level = None
+    for row_level, guess, tracker, gains in session_gains(rows):
+        if row_level != level:
+            level = row_level
+            print(f"Level {level}")
+        if not gains:
+            print(f"> {guess}  correct, one of {tracker.count} candidates")
+            continue
+        print(f"> {guess}")
+        for gain in gains:
+            print(describe(gain))
+        print(f"  {tracker.count} candidates left" + ("" if tracker.exact else " (at most)"))
+
+
+def hint_totals(records):
+    """Per hint kind: [hints shown, useless, total bits], over every session in records.
+
+    Records are streamed: only sessions with a level under way keep state (its
+    tracker), so memory follows the number of games played at once, not the
+    length of the log, even where processes sharing it interleaved their sessions.
+    """
+    playing = {}
+    totals = {}
+    for chunk in chunks(records):
+        for row in chunk:
+            session = int(row["session"])
+            replay = playing.pop(session, None) or LevelReplay()
+            played = replay.feed(row)
+            if replay.open:
+                playing[session] = replay
+            if played is None:
+                continue
+            for gain in played[3]:
+                if gain.after is None:
+                    continue
+                total = totals.setdefault(gain.kind, [0, 0, 0.0])
+                total[0] += 1
+                total[1] += gain.useless
+                total[2] += gain.bits
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="How much each hint narrowed the possible targets.")
+    parser.add_argument("path", help="guess log written with GUESS_RECORD=<path>")
+    parser.add_argument("--session", type=int, help="show one session hint by hint")
+    args = parser.parse_args(argv)
+
+    records = open_records(args.path)
+    if args.session is not None:
+        print_session(session_records(records, args.session))
+        return 0
+    print(f"{'Hint':<10} {'Shown':>8} {'Useless':>8} {'Mean bits':>10}")
+    for kind, (shown, useless, bits) in hint_totals(records).items():
+        print(f"{kind:<10} {shown:>8} {useless:>8} {bits / shown:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
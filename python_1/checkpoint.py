@@ -0,0 +1,406 @@
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from engine import level_table
+from file_lock import LockFile
+from renderer import cache_dir
+from streams import SessionStream
+
+# ================================
+# Session Checkpoints
+# ================================
+# Games in progress are checkpointed after every guess, so a crashed CLI, a
+# closed Tk window or a server restarted mid-deploy can pick each run up
+# where it stopped. A checkpoint log is an append-only file of fixed-width
+# little-endian records after a 16-byte header (magic, record size, version):
+#
+#   key u64 | seed u64 | game u64 | target u64 | saved_at f64 | elapsed f64
+#   | score u32 | difficulty u8 | level u8 | attempts_left u8 | source u8
+#
+# key identifies the game: the stream's session id in the single-player
+# frontends, the session id on the server. The newest record for a key wins;
+# one with difficulty 0 is a tombstone for a game that ended. elapsed is the
+# time already spent on the level, so a resumed timer continues from there
+# and downtime is not charged to the player. Later targets are not stored:
+# they are redrawn from (seed, game) as in streams.py. Tombstones keep the
+# seed and game too, and compaction writes one per seed under DEALT_KEY, so
+# the highest game index ever dealt survives and is never dealt again.
+#
+# A log has one writer: opening it takes its lock (file_lock.py), and a log
+# another process holds raises CheckpointBusy. save() only buffers. flush()
+# writes the buffer with one os.write on an O_APPEND descriptor, so a process
+# that dies after flushing loses nothing. sync() also fsyncs. Callers sync
+# once per sync_interval, so one fsync covers every checkpoint written in that
+# window. load() reads the log in one pass; a log with a bad header is moved
+# aside to "<path>.corrupt" and treated as empty. When the log holds
+# compact_ratio times more records than live games, it is compacted through
+# a temp file and os.replace.
+#
+# The CLIs and the Tk app save each game to its own log in the checkpoints
+# directory of the banner cache (GameSaves). The lock of a game being played
+# is held, so a newly launched frontend offers only games whose process has
+# gone. Set GUESS_CHECKPOINT to another directory, or to "off" to disable it.
+# The server keeps one log for all its sessions with --checkpoint.
+#
+#   python3 checkpoint.py ~/.cache/number-guess/checkpoints
+
+MAGIC = b"GUESSCP1"
+VERSION = 1
+RECORD = struct.Struct("<QQQQddIBBBB")
+HEADER = struct.Struct("<8sII")
+ENV_PATH = "GUESS_CHECKPOINT"
+DEFAULT_SYNC_INTERVAL = 1.0
+BATCH_BYTES = 64 * 1024
+MIN_COMPACT_RECORDS = 4096
+SOURCES = ("cli", "timed_cli", "tk", "server")
+DIFFICULTY_IDS = {"Easy": 1, "Normal": 2, "Hard": 3, "Huge": 4}
+ENDED = 0
+DEALT_KEY = (1 << 64) - 1
+
+Checkpoint = namedtuple(
+    "Checkpoint",
+    "key seed game target saved_at elapsed score difficulty level attempts_left source")
+
+
+class CheckpointBusy(Exception):
+    """Another process has the checkpoint log open."""
+
+
+def read_log(path):
+    """(records, games, highest) for a checkpoint log, without locking it.
+
+    games maps each key still in progress to its newest Checkpoint; highest
+    maps each seed to the highest game index in any record. Raises ValueError
+    if the header is missing or not a checkpoint log header.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        data = f.read()
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: checkpoint log header is cut short")
+    magic, record_size, version = HEADER.unpack(header)
+    if magic != MAGIC or record_size != RECORD.size or version != VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint log (magic {magic!r}, version {version})")
+    # A record cut short by a crash mid-write is ignored.
+    whole = len(data) - len(data) % RECORD.size
+    newest = {}
+    dealt = []
+    for values in RECORD.iter_unpack(data[:whole]):
+        if values[0] == DEALT_KEY:
+            dealt.append(values)
+        else:
+            newest[values[0]] = values
+    # The newest record of a key is from its latest game, since games are
+    # numbered in the order they start.
+    highest = {}
+    for values in dealt + list(newest.values()):
+        if values[2] > highest.get(values[1], -1):
+            highest[values[1]] = values[2]
+    games = {key: Checkpoint(*values) for key, values in newest.items() if values[7] != ENDED}
+    return whole // RECORD.size, games, highest
+
+
+class CheckpointLog:
+    def __init__(self, path, sync_interval=DEFAULT_SYNC_INTERVAL, compact_ratio=4):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.compact_ratio = compact_ratio
+        self.log_records = 0
+        # seed -> highest game index saved under it.
+        self.highest = {}
+        self._batch = bytearray()
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+        self._fd = None
+        self._lock = LockFile(path)
+        if not self._lock.acquire(blocking=False):
+            raise CheckpointBusy(f"{path} is in use by another process")
+        try:
+            self._open()
+        except OSError:
+            self._lock.release()
+            raise
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, HEADER.pack(MAGIC, RECORD.size, VERSION))
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def save(self, checkpoint):
+        self._batch += RECORD.pack(*checkpoint)
+        self.log_records += 1
+        if checkpoint.game > self.highest.get(checkpoint.seed, -1):
+            self.highest[checkpoint.seed] = checkpoint.game
+        if len(self._batch) >= BATCH_BYTES:
+            self.flush()
+
+    def drop(self, key, seed=0, game=0):
+        """Mark key's game as ended."""
+        self.save(Checkpoint(key, seed, game, 0, time.time(), 0.0, 0, ENDED, 0, 0, 0))
+
+    def flush(self):
+        if self._batch:
+            os.write(self._fd, self._batch)
+            self._batch.clear()
+            self._unsynced = True
+
+    def sync(self):
+        """Flush, then fsync whatever was written since the last sync."""
+        self.flush()
+        self.fsync()
+
+    def fsync(self):
+        """fsync what flush() has written. Safe to run in a worker thread while
+        the owning thread keeps saving, as long as it does not compact."""
+        if self._unsynced:
+            self._unsynced = False
+            os.fsync(self._fd)
+        self._last_sync = time.monotonic()
+
+    def sync_due(self):
+        return (bool(self._batch) or self._unsynced) and \
+            time.monotonic() - self._last_sync >= self.sync_interval
+
+    def close(self):
+        """Sync and close the log, keeping it for the next process."""
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+            self._lock.release()
+
+    def delete(self):
+        """Close and remove the log, e.g. once its only game is over."""
+        if self._fd is not None:
+            self._batch.clear()
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._lock.release(remove=True)
+
+    # -------------------------
+    # Reading and compaction
+    # -------------------------
+    def load(self):
+        """{key: Checkpoint} of every game still in progress."""
+        self.flush()
+        try:
+            self.log_records, games, highest = read_log(self.path)
+        except (ValueError, struct.error):
+            self._set_aside()
+            return {}
+        for seed, game in highest.items():
+            if game > self.highest.get(seed, -1):
+                self.highest[seed] = game
+        if self.needs_compaction(len(games)):
+            self.compact(games.values())
+        return games
+
+    def _set_aside(self):
+        """Move an unreadable log to "<path>.corrupt" and start an empty one."""
+        os.close(self._fd)
+        os.replace(self.path, self.path + ".corrupt")
+        self._open()
+        self.log_records = 0
+        self._unsynced = False
+
+    def needs_compaction(self, live):
+        return self.log_records > max(MIN_COMPACT_RECORDS, self.compact_ratio * live)
+
+    def compact(self, checkpoints):
+        """Rewrite the log with only the given checkpoints."""
+        self.flush()
+        temp_path = self.path + ".compact"
+        count = 0
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, RECORD.size, VERSION))
+            for checkpoint in checkpoints:
+                f.write(RECORD.pack(*checkpoint))
+                count += 1
+            now = time.time()
+            for seed, game in self.highest.items():
+                f.write(RECORD.pack(DEALT_KEY, seed, game, 0, now, 0.0, 0, ENDED, 0, 0, 0))
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        os.close(self._fd)
+        self._open()
+        self.log_records = count
+        self._unsynced = False
+
+
+def latest(games):
+    """The most recently saved of several checkpoints, or None."""
+    return max(games.values(), key=lambda checkpoint: checkpoint.saved_at, default=None)
+
+
+def checkpoint_for(key, seed, game, difficulty, level, target, attempts_left, score, elapsed, source):
+    return Checkpoint(key, seed, game, target, time.time(), elapsed, score,
+                      DIFFICULTY_IDS[difficulty["name"]], level, attempts_left, SOURCES.index(source))
+
+
+def resume_stream(checkpoint, difficulty):
+    """The game's SessionStream, positioned just after the checkpointed level's target.
+
+    Raises ValueError if the stream did not deal the checkpointed target,
+    i.e. the record is corrupt or from another seed.
+    """
+    stream = SessionStream(checkpoint.seed, checkpoint.game)
+    target = None
+    for level in level_table(difficulty)[:checkpoint.level]:
+        target = stream.target(level)
+    if target != checkpoint.target:
+        raise ValueError(f"checkpoint {checkpoint.key}: target does not match its stream")
+    return stream
+
+
+class GameSaves:
+    """The saved games of a single-player frontend, one game in play at a time.
+
+    Each game is saved to its own log, "<source>-<random>.bin" in directory,
+    locked by the process playing it. GameFlow and the Tk app call this
+    instead of writing records themselves.
+    """
+
+    def __init__(self, directory, source, sync_interval=DEFAULT_SYNC_INTERVAL):
+        self.directory = directory
+        self.source = source
+        self.sync_interval = sync_interval
+        self.log = None
+        # (log, checkpoint) of the game unfinished() offered, claimed until
+        # resume() or discard().
+        self._offered = None
+
+    def _paths(self):
+        prefix = self.source + "-"
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(prefix) and name.endswith(".bin"):
+                yield os.path.join(self.directory, name)
+
+    def unfinished(self):
+        """The most recently saved game whose process has gone, or None."""
+        self._release_offer()
+        best = None
+        for path in self._paths():
+            try:
+                log = CheckpointLog(path, self.sync_interval)
+            except (CheckpointBusy, OSError):
+                continue
+            saved = latest(log.load())
+            if saved is None:
+                # Nothing left to resume: the game ended or the log was unreadable.
+                log.delete()
+            elif best is None or saved.saved_at > best[1].saved_at:
+                if best is not None:
+                    best[0].close()
+                best = (log, saved)
+            else:
+                log.close()
+        self._offered = best
+        return None if best is None else best[1]
+
+    def resume(self, difficulty):
+        """The offered game's SessionStream, or None (and the game is discarded)
+        if it cannot be restored. Its log becomes this process's."""
+        log, saved = self._offered
+        self._offered = None
+        try:
+            stream = resume_stream(saved, difficulty)
+        except ValueError:
+            log.delete()
+            return None
+        self.end()
+        self.log = log
+        return stream
+
+    def discard(self):
+        """Forget the offered game; the player chose not to resume it."""
+        if self._offered is not None:
+            self._offered[0].delete()
+            self._offered = None
+
+    def _release_offer(self):
+        if self._offered is not None:
+            self._offered[0].close()
+            self._offered = None
+
+    def save(self, stream, difficulty, level, target, attempts_left, score, elapsed):
+        if self.log is None:
+            name = f"{self.source}-{os.urandom(8).hex()}.bin"
+            self.log = CheckpointLog(os.path.join(self.directory, name), self.sync_interval)
+        self.log.save(checkpoint_for(stream.session_id, stream.seed, stream.index, difficulty, level,
+                                     target, attempts_left, score, elapsed, self.source))
+        # Written before the next prompt; fsynced at most once per sync interval.
+        self.log.flush()
+        if self.log.sync_due():
+            self.log.sync()
+
+    def end(self):
+        """The game in play is over: won, lost or abandoned for a new one."""
+        if self.log is not None:
+            self.log.delete()
+            self.log = None
+
+    def close(self):
+        """Keep the game in play for the next launch and let it go."""
+        self._release_offer()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+def open_default(source):
+    """GameSaves for a frontend, or None when GUESS_CHECKPOINT is "off"."""
+    directory = os.environ.get(ENV_PATH)
+    if directory == "off":
+        return None
+    if not directory:
+        directory = os.path.join(cache_dir(), "checkpoints")
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    return GameSaves(directory, source)
+
+
+def main(argv=None):
+    # Imported here: the games import this module at startup and never need argparse.
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="List the games saved in a checkpoint log, or in a directory of them.")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    paths = [args.path]
+    if os.path.isdir(args.path):
+        paths = sorted(os.path.join(args.path, name) for name in os.listdir(args.path)
+                       if name.endswith(".bin"))
+    names = {code: name for name, code in DIFFICULTY_IDS.items()}
+    games = {}
+    for path in paths:
+        try:
+            games.update(read_log(path)[1])
+        except (OSError, ValueError, struct.error) as error:
+            print(f"skipped {path}: {error}")
+    print(f"{len(games)} games in progress")
+    for checkpoint in sorted(games.values(), key=lambda c: c.saved_at, reverse=True):
+        saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(checkpoint.saved_at))
+        print(f"  {checkpoint.key:>20}  {SOURCES[checkpoint.source]:<9} {names[checkpoint.difficulty]:<6} "
+              f"level {checkpoint.level}  attempts {checkpoint.attempts_left}  score {checkpoint.score}  "
+              f"{checkpoint.elapsed:.1f}s in  saved {saved}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
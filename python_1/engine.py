@@ -0,0 +1,136 @@
+import functools
+import random
+from collections import namedtuple
+
+from hint_rules import HINTS
+from metrics import instrument
+from number_index import NUMBER_INDEX
+
+# ================================
+# Game Engine
+# ================================
+# The rules every frontend plays by: the difficulties, the per-level range,
+# attempts, timer and hint mode, scoring, and what happens on each guess.
+# The plain CLI, the colorama CLI, the Tk app, the server, batch mode and the
+# tools all drive this module. A rule changed here changes everywhere.
+#
+# Level tables are tuples of immutable Level rows, built once per distinct
+# difficulty config and cached, so frontends look values up instead of
+# recomputing them each level. Round holds one level in play. It does no I/O
+# and reads no clock; callers pass the elapsed seconds and show the Outcome
+# however they like. A guess made after a timed level's timer ran out does not
+# count: callers check Round.timed_out(seconds) before Round.guess.
+
+Difficulty = namedtuple("Difficulty", "choice name levels attempts base_range hint_type timer")
+DIFFICULTIES = (
+    Difficulty("1", "Easy", 3, 10, 10, "direct", 0),
+    Difficulty("2", "Normal", 5, 7, 50, "mixed", 25),
+    Difficulty("3", "Hard", 7, 5, 100, "riddle", 20),
+    Difficulty("4", "Huge", 3, 64, 10 ** 18, "direct", 0),
+)
+DIFFICULTY_CHOICES = {d.name: d.choice for d in DIFFICULTIES}
+# Guess logs and checkpoints store targets as u64, so no level may go higher.
+MAX_TARGET = (1 << 64) - 1
+BY_CHOICE = {d.choice: d for d in DIFFICULTIES}
+
+# upper is the top of the difficulty's range, which riddle range clues refer to.
+Level = namedtuple("Level", "number range attempts timer hint_type upper")
+Outcome = namedtuple("Outcome", "cleared gained feedback lost")
+
+
+def difficulty_config(choice, base_range=None, timed=True):
+    """The config dict for a menu choice; anything but 1-3 is Huge, as in the menus.
+
+    base_range overrides the range, e.g. for big-range play; ValueError if the
+    last level's range would pass MAX_TARGET. Untimed configs have no timer
+    key, as in the plain CLI.
+    """
+    difficulty = BY_CHOICE.get(choice, DIFFICULTIES[-1])
+    if base_range is not None and level_range(base_range, difficulty.levels, difficulty.levels) > MAX_TARGET:
+        raise ValueError(f"base_range {base_range} deals targets above {MAX_TARGET}")
+    config = {
+        "name": difficulty.name,
+        "levels": difficulty.levels,
+        "attempts": difficulty.attempts,
+        "base_range": difficulty.base_range if base_range is None else base_range,
+        "hint_type": difficulty.hint_type,
+    }
+    if timed:
+        config["timer"] = difficulty.timer
+    return config
+
+
+def level_range(base_range, levels, level):
+    # Integer arithmetic keeps big ranges exact.
+    return base_range * level // levels + 5
+
+
+@functools.lru_cache(maxsize=256)
+def _level_table(levels, attempts, base_range, hint_type, timer):
+    return tuple(Level(number, level_range(base_range, levels, number), attempts, timer, hint_type,
+                       base_range) for number in range(1, levels + 1))
+
+
+def level_table(difficulty):
+    """Every Level of a difficulty config, built once per distinct config."""
+    return _level_table(difficulty["levels"], difficulty["attempts"], difficulty["base_range"],
+                        difficulty["hint_type"], difficulty.get("timer", 0))
+
+
+def level_info(difficulty, level):
+    return level_table(difficulty)[level - 1]
+
+
+@instrument("scoring")
+def level_score(attempts_left, level, seconds):
+    """Points for a clear: 10 per attempt left, 5 per level, up to 10 for speed."""
+    return attempts_left * 10 + level * 5 + max(0, 10 - int(seconds))
+
+
+# The built-in difficulties' tables, built at import.
+LEVEL_TABLES = {d.name: level_table(difficulty_config(d.choice)) for d in DIFFICULTIES}
+
+
+class Round:
+    """One level in play: its target and the attempts left.
+
+    spend_first charges the attempt before checking the guess, as the Tk app
+    does, so a clear there scores one attempt fewer than in the CLIs.
+    """
+
+    __slots__ = ("level", "target", "attempts_left", "hints", "rng", "spend_first")
+
+    def __init__(self, level, target, hints=HINTS, rng=random, spend_first=False, attempts_left=None):
+        self.level = level
+        self.target = target
+        self.attempts_left = level.attempts if attempts_left is None else attempts_left
+        self.hints = hints
+        self.rng = rng
+        self.spend_first = spend_first
+
+    def timed_out(self, seconds):
+        """True if seconds into the level is past its timer, if it has one."""
+        return bool(self.level.timer) and seconds > self.level.timer
+
+    def guess(self, guess, seconds=0.0):
+        """Apply one guess made seconds into the level."""
+        if self.spend_first:
+            self.attempts_left -= 1
+        if guess == self.target:
+            return Outcome(True, level_score(self.attempts_left, self.level.number, seconds), None, False)
+        if not self.spend_first:
+            self.attempts_left -= 1
+        feedback = self.hints.miss(self.level.hint_type, guess, self.target, self.attempts_left,
+                                   self.level.upper, self.rng)
+        return Outcome(False, 0, feedback, self.attempts_left <= 0)
+
+
+def new_round(level, stream, hints=HINTS, spend_first=False, target=None, attempts_left=None):
+    """Start a level with the next target of a SessionStream, which also picks riddle clues.
+
+    target and attempts_left continue a level restored from a checkpoint.
+    """
+    NUMBER_INDEX.ensure(level.range)
+    if target is None:
+        target = stream.target(level)
+    return Round(level, target, hints, stream.clues, spend_first, attempts_left)
@@ -0,0 +1,75 @@
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# ================================
+# Advisory File Locks
+# ================================
+# Files that several game processes may open (checkpoint logs, the
+# leaderboard) are guarded by a lock on a "<path>.lock" sidecar rather than on
+# the file itself, so the file can be replaced with os.replace while the lock
+# is held. POSIX uses flock, which has shared and exclusive modes; Windows
+# uses msvcrt.locking, where every lock is exclusive. The OS drops a lock when
+# its process exits, however it exits, so a lock that can be taken means its
+# last owner is gone.
+
+
+class LockFile:
+    """An advisory lock on path + ".lock"."""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self, shared=False, blocking=True):
+        """Take the lock. Without blocking, return False if another process holds it."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                fcntl.flock(fd, mode if blocking else mode | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            if blocking:
+                raise
+            return False
+        self._fd = fd
+        return True
+
+    def release(self, remove=False):
+        """Give the lock up; remove also deletes the sidecar, e.g. with the file it guarded."""
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,183 @@
+import time
+
+from engine import level_info, new_round
+from hint_rules import HINTS
+from leaderboard import record_score
+from renderer import RENDERER
+from replay_log import RECORDER
+from streams import STREAMS
+
+# ================================
+# Shared Game Flow
+# ================================
+# The plain CLI and the colorama CLI play the same game: welcome, pick a
+# difficulty, play levels, restart on a loss, finish on a win, and offer to
+# resume a checkpointed game at launch. That flow lives here, once. Each
+# frontend subclasses GameFlow and supplies only its I/O:
+#
+#   welcome_screen()          the banner and difficulty menu
+#   victory_banner()
+#   setup_difficulty(choice)  the config for a menu choice (timed or not)
+#   play_level(...)           one level's prompt loop (see start_round)
+#   say(text, colour)         typed-out text; colour is a colorama Fore name
+#
+# The Tk app is event-driven, so it drives GameSaves (checkpoint.py) and
+# start_round directly instead.
+
+TYPE_DELAY = 0.03
+
+
+def select_difficulty(ask=RENDERER.ask):
+    """Ask for a difficulty; the menu itself is part of the welcome screen."""
+    while True:
+        choice = ask("Enter 1, 2, 3, or 4: ").strip()
+        if choice in ["1", "2", "3", "4"]:
+            return choice
+        RENDERER.show("Invalid input. Please enter 1, 2, 3, or 4.")
+
+
+def start_round(level, difficulty, stream, resume=None, hints=HINTS, spend_first=False):
+    """(Round, start time) for a level: the next one from stream, or the one
+    checkpoint resume was saved in, with its time so far already on the clock."""
+    info = level_info(difficulty, level)
+    if resume is None:
+        return new_round(info, stream, hints, spend_first), time.perf_counter()
+    game_round = new_round(info, stream, hints, spend_first, resume.target, resume.attempts_left)
+    return game_round, time.perf_counter() - resume.elapsed
+
+
+class GameFlow:
+    """play_game as an explicit state machine.
+
+    welcome → level → result → (level | restart → welcome | victory → done).
+    Each step() runs one state and moves to the next, so restarts never grow
+    the stack. ask stands in for input() so scripted callers can drive it.
+    checkpoints is the frontend's GameSaves, or None to play without saving.
+    """
+
+    def __init__(self, ask=RENDERER.ask, checkpoints=None):
+        self.ask = ask
+        self.checkpoints = checkpoints
+        self.resume = None
+        self.state = "welcome"
+        self.difficulty = None
+        self.stream = None
+        self.level = 1
+        self.score = 0
+        self.success = False
+        self.restarts = 0
+
+    # -------------------------
+    # Frontend I/O
+    # -------------------------
+    def welcome_screen(self):
+        raise NotImplementedError
+
+    def victory_banner(self):
+        raise NotImplementedError
+
+    def setup_difficulty(self, choice):
+        raise NotImplementedError
+
+    def play_level(self, level, difficulty, score, ask, stream, resume, save):
+        raise NotImplementedError
+
+    def say(self, text, colour=None):
+        RENDERER.type(text, TYPE_DELAY)
+
+    # -------------------------
+    # States
+    # -------------------------
+    def step(self):
+        """Run the current state and return the next one."""
+        self.state = getattr(self, "_" + self.state)()
+        return self.state
+
+    def run(self):
+        while self.state != "done":
+            self.step()
+        return self.score
+
+    def _welcome(self):
+        if self._resume_saved_game():
+            return "level"
+        self.stream = STREAMS.spawn()
+        RECORDER.start_session(self.stream)
+        RENDERER.show(self.welcome_screen())
+
+        self.difficulty = self.setup_difficulty(select_difficulty(self.ask))
+
+        self.say(f"\nYou selected {self.difficulty['name']} mode.")
+        self.say("Let's begin!\n")
+
+        self.level = 1
+        self.score = 0
+        return "level"
+
+    def _level(self):
+        self.success, self.score = self.play_level(
+            self.level, self.difficulty, self.score, self.ask, self.stream, self.resume,
+            None if self.checkpoints is None else self._save)
+        self.resume = None
+        return "result"
+
+    def _result(self):
+        if not self.success:
+            return "restart"
+        if self.level == self.difficulty["levels"]:
+            return "victory"
+        self.level += 1
+        return "level"
+
+    def _restart(self):
+        self._end_game()
+        self.say("Restarting from Level 1...", "RED")
+        self.restarts += 1
+        return "welcome"
+
+    def _victory(self):
+        self._end_game()
+        self.say(self.victory_banner())
+        self.say(f"🏆 Final Score: {self.score}", "YELLOW")
+        rank = record_score(self.difficulty["name"], self.score)
+        if rank is not None:
+            self.say(f"📜 Leaderboard rank on {self.difficulty['name']}: #{rank}")
+        self.say("Thanks for playing!\n")
+        return "done"
+
+    # -------------------------
+    # Checkpoints
+    # -------------------------
+    def _resume_saved_game(self):
+        """Offer to continue the last unfinished game; return True if the player does."""
+        if self.checkpoints is None:
+            return False
+        saved = self.checkpoints.unfinished()
+        if saved is None:
+            return False
+        difficulty = self.setup_difficulty(str(saved.difficulty))
+        answer = self.ask(f"Resume your {difficulty['name']} game at level {saved.level} "
+                          f"(score {saved.score})? (y/n): ")
+        if not answer.strip().lower().startswith("y"):
+            self.checkpoints.discard()
+            return False
+        stream = self.checkpoints.resume(difficulty)
+        if stream is None:
+            RENDERER.show("The saved game could not be restored.")
+            return False
+        self.stream = stream
+        RECORDER.start_session(self.stream)
+        self.difficulty = difficulty
+        self.level = saved.level
+        self.score = saved.score
+        self.resume = saved
+        self.say(f"\nResuming {difficulty['name']} mode.")
+        return True
+
+    def _save(self, game_round, score, seconds):
+        self.checkpoints.save(self.stream, self.difficulty, game_round.level.number,
+                              game_round.target, game_round.attempts_left, score, seconds)
+
+    def _end_game(self):
+        if self.checkpoints is not None:
+            self.checkpoints.end()
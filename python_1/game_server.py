@@ -0,0 +1,540 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from checkpoint import (DEFAULT_SYNC_INTERVAL, DIFFICULTY_IDS, CheckpointBusy, CheckpointLog,
+                        checkpoint_for, latest)
+from engine import Round, difficulty_config, level_info
+from hint_rules import HINTS
+from leaderboard import Leaderboard
+from metrics import METRICS, instrument
+from streams import ENV_SEED, SessionStreams, keyed_random
+from session_store import DIFFICULTY_TABLE, SLOT_BITS, SLOT_MASK, SessionStore, intern_difficulty
+
+# ================================
+# Multi-Session Game Server
+# ================================
+# One asyncio process hosts any number of guessing sessions over TCP, using the
+# same difficulty, hint and scoring rules as play_level; like the plain CLI,
+# levels have no timer. Session state lives in a SessionStore, so a dropped
+# connection leaves an idle session behind that the player can pick up again
+# with RESUME until the store evicts it. With a leaderboard path, every VICTORY
+# is recorded under the session id; records are buffered and flushed when the
+# connection closes. Each START numbers a new game; its targets and riddle clue
+# picks derive from --seed and that number alone (see streams.py), so game n
+# gets the same targets in every run with the same seed.
+#
+# With --checkpoint, every game in progress is checkpointed (checkpoint.py)
+# after each command that touches it. Records are written every
+# FLUSH_INTERVAL and fsynced together once per --checkpoint-sync seconds, in a
+# worker thread so the event loop keeps serving. A server restarted on the
+# same log adopts every saved game under its old session id in one pass, so
+# players carry on with RESUME. Without --seed it also keeps the seed the
+# games were dealt from, and new games are numbered after the highest one the
+# log ever saw, finished games included. Only one server may own a log; a
+# second one started on it exits with an error.
+#
+# Line protocol (UTF-8, one message per line):
+#   on connect         WELCOME <session id>, sent again before a reply when the
+#                      session came back from spill under a new id
+#   client -> server   START <1|2|3|4>   GUESS <n>   STATUS   RESUME <session id>   QUIT
+#   server -> client   informational lines   HINT <text>   CORRECT <gained> <score>
+#                      final line of a reply LEVEL <level> <levels> <range> <attempts>
+#                                            MISS <attempts_left>
+#                                            LOST attempts
+#                                            VICTORY <score>
+#                                            ERROR <message>
+#                                            BYE
+# Every command gets exactly one final line, so clients read until they see one.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+FLUSH_INTERVAL = 0.05
+FINAL_REPLIES = ("LEVEL", "MISS", "LOST", "VICTORY", "ERROR", "BYE")
+
+
+def _column(name):
+    """Property that reads and writes one SessionStore column for this session."""
+    def fget(self):
+        return self.store.columns[name][self.slot]
+
+    def fset(self, value):
+        self.store.columns[name][self.slot] = value
+
+    return property(fget, fset)
+
+
+class GameSession:
+    """One player's game, stored as a row of a SessionStore and driven one command at a time."""
+
+    __slots__ = ("store", "streams", "sid", "slot")
+
+    level = _column("level")
+    score = _column("score")
+    attempts_left = _column("attempts_left")
+    number_to_guess = _column("number_to_guess")
+    game = _column("game")
+    start_time = _column("start_time")
+
+    def __init__(self, store, streams, sid=None):
+        self.store = store
+        self.streams = streams
+        self.sid, self.slot = store.resolve(store.create() if sid is None else sid)
+
+    @property
+    def difficulty(self):
+        return DIFFICULTY_TABLE[self.store.columns["difficulty_id"][self.slot]]
+
+    @difficulty.setter
+    def difficulty(self, difficulty):
+        self.store.columns["difficulty_id"][self.slot] = (
+            0 if difficulty is None else intern_difficulty(difficulty))
+
+    @property
+    def level_info(self):
+        return level_info(self.difficulty, self.level)
+
+    @property
+    def level_range(self):
+        return self.level_info.range
+
+    def start(self, choice):
+        if choice not in ("1", "2", "3", "4"):
+            return ["ERROR choose 1, 2, 3 or 4"]
+        self.difficulty = difficulty_config(choice, timed=False)
+        self.level = 1
+        self.score = 0
+        self.game = self.streams.claim()
+        return self.start_level()
+
+    def start_level(self):
+        # Targets come from the game's row of the difficulty's pool, so a game
+        # replays exactly from the server seed and its index.
+        self.number_to_guess = self.streams.pool(self.difficulty).targets(self.game)[self.level - 1]
+        self.attempts_left = self.difficulty["attempts"]
+        self.start_time = time.monotonic()
+        return [f"LEVEL {self.level} {self.difficulty['levels']} {self.level_range} {self.attempts_left}"]
+
+    def guess(self, guess):
+        if self.difficulty is None:
+            return ["ERROR send START first"]
+
+        # The level's state is stored as columns; play the guess on a Round built from them.
+        level = self.level_info
+        clues = None
+        if HINTS.gives_clues(level.hint_type):
+            # Keyed by the miss, so a resumed session picks the same clues.
+            clues = keyed_random(self.streams.seed, self.game, f"clues:{self.level}:{self.attempts_left}")
+        game_round = Round(level, self.number_to_guess, rng=clues, attempts_left=self.attempts_left)
+        outcome = game_round.guess(guess, time.monotonic() - self.start_time)
+        if outcome.cleared:
+            gained = outcome.gained
+            self.score += gained
+            METRICS.count("level_cleared")
+            METRICS.count("points", gained)
+            replies = [f"CORRECT {gained} {self.score}"]
+            self.level += 1
+            if self.level > self.difficulty["levels"]:
+                replies.append(f"VICTORY {self.score}")
+                self.difficulty = None
+            else:
+                replies.extend(self.start_level())
+            return replies
+
+        self.attempts_left = game_round.attempts_left
+        replies = [f"HINT {line}" for line in outcome.feedback.lines()]
+
+        if outcome.lost:
+            self.difficulty = None
+            METRICS.count("level_lost")
+            replies.append("LOST attempts")
+        else:
+            replies.append(f"MISS {self.attempts_left}")
+        return replies
+
+    def status(self):
+        if self.difficulty is None:
+            return ["ERROR no game in progress, send START"]
+        return [f"LEVEL {self.level} {self.difficulty['levels']} {self.level_range} {self.attempts_left}"]
+
+    def refresh(self):
+        """Point at the session's current row, restoring it from spill (under a
+        new id) if needed. Returns an error reply if it expired, else None."""
+        try:
+            self.sid, self.slot = self.store.resolve(self.sid)
+        except KeyError:
+            self.sid, self.slot = self.store.resolve(self.store.create())
+            return ["ERROR session expired, send START"]
+        return None
+
+    @instrument("server_command")
+    def handle(self, line):
+        """Apply one protocol line and return the reply lines."""
+        expired = self.refresh()
+        if expired:
+            return expired
+        command, _, arg = line.strip().partition(" ")
+        command = command.upper()
+        if command == "START":
+            return self.start(arg.strip())
+        elif command == "GUESS":
+            try:
+                return self.guess(int(arg))
+            except ValueError:
+                return ["ERROR Please enter a valid number."]
+        elif command == "STATUS":
+            return self.status()
+        elif command == "QUIT":
+            self.store.release(self.sid)
+            return ["BYE"]
+        return [f"ERROR unknown command {command or '(empty)'}"]
+
+
+# ================================
+# Server
+# ================================
+class GameServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, seed=None,
+                 memory_budget=DEFAULT_MEMORY_BUDGET, idle_timeout=300.0, spill_path=None,
+                 leaderboard_path=None, checkpoint_path=None, checkpoint_sync=DEFAULT_SYNC_INTERVAL):
+        self.host = host
+        self.port = port
+        self.streams = SessionStreams(seed)
+        self.store = SessionStore(memory_budget, idle_timeout, spill_path)
+        self.active_connections = 0
+        self.total_connections = 0
+        self.server = None
+        self.leaderboard = Leaderboard(leaderboard_path) if leaderboard_path else None
+        self.checkpoints = None
+        self.restored = 0
+        self._sync_task = None
+        if checkpoint_path:
+            self.checkpoints = CheckpointLog(checkpoint_path, checkpoint_sync)
+            self.restored = self.restore(keep_seed=seed is not None or ENV_SEED in os.environ)
+
+    # -------------------------
+    # Checkpoints
+    # -------------------------
+    def restore(self, keep_seed=True):
+        """Adopt every game saved in the checkpoint log; return how many.
+
+        Games dealt from another seed are skipped, since their later targets
+        would differ. Unless keep_seed, the server takes the newest game's seed.
+        """
+        games = self.checkpoints.load()
+        if games and not keep_seed:
+            self.streams = SessionStreams(latest(games).seed)
+        # Carry on after the highest game ever dealt, finished ones included.
+        self.streams.spawned = self.checkpoints.highest.get(self.streams.seed, -1) + 1
+        if not games:
+            return 0
+        # Newest first, so a slot saved under two generations keeps the later game.
+        by_slot = {}
+        for checkpoint in sorted(games.values(), key=lambda c: c.saved_at, reverse=True):
+            if checkpoint.seed == self.streams.seed:
+                by_slot.setdefault(checkpoint.key & SLOT_MASK, checkpoint)
+        restored = list(by_slot.values())
+        slots = self.store.adopt([checkpoint.key for checkpoint in restored])
+
+        difficulty_ids = {code: intern_difficulty(difficulty_config(str(code), timed=False))
+                          for code in DIFFICULTY_IDS.values()}
+        columns = self.store.columns
+        now, wall = time.monotonic(), time.time()
+        for checkpoint, slot in zip(restored, slots):
+            columns["difficulty_id"][slot] = difficulty_ids[checkpoint.difficulty]
+            columns["level"][slot] = checkpoint.level
+            columns["attempts_left"][slot] = checkpoint.attempts_left
+            columns["score"][slot] = checkpoint.score
+            columns["number_to_guess"][slot] = checkpoint.target
+            columns["game"][slot] = checkpoint.game
+            # Downtime counts as idle time but not as time spent on the level.
+            columns["start_time"][slot] = now - checkpoint.elapsed
+            columns["last_active"][slot] = now - max(0.0, wall - checkpoint.saved_at)
+        return len(restored)
+
+    def checkpoint(self, session, old_sid=None, playing=False):
+        """Save session's game after a command, or mark it ended if it was playing.
+
+        old_sid is an id the session had before it was restored from spill.
+        """
+        if self.checkpoints is None:
+            return
+        seed, game = self.streams.seed, session.game
+        if old_sid is not None and old_sid != session.sid:
+            self.checkpoints.drop(old_sid, seed, game)
+        difficulty = session.difficulty if session.sid in self.store else None
+        if difficulty is not None:
+            self.checkpoints.save(checkpoint_for(
+                session.sid, seed, game, difficulty, session.level,
+                session.number_to_guess, session.attempts_left, session.score,
+                time.monotonic() - session.start_time, "server"))
+        elif playing:
+            self.checkpoints.drop(session.sid, seed, game)
+
+    def live_checkpoints(self):
+        """A checkpoint of every game in progress in the store, for compaction."""
+        columns = self.store.columns
+        generation = self.store.generation
+        seed, now = self.streams.seed, time.monotonic()
+        for slot, difficulty_id in enumerate(columns["difficulty_id"]):
+            if difficulty_id and columns["last_active"][slot] != float("inf"):
+                yield checkpoint_for(
+                    (generation[slot] << SLOT_BITS) | slot, seed, columns["game"][slot],
+                    DIFFICULTY_TABLE[difficulty_id], columns["level"][slot],
+                    columns["number_to_guess"][slot], columns["attempts_left"][slot],
+                    columns["score"][slot], now - columns["start_time"][slot], "server")
+
+    async def sync_checkpoints(self):
+        """Write checkpoints every FLUSH_INTERVAL and fsync them as a group."""
+        loop = asyncio.get_running_loop()
+        checkpoints = self.checkpoints
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            checkpoints.flush()
+            if checkpoints.sync_due():
+                await loop.run_in_executor(None, checkpoints.fsync)
+            if checkpoints.needs_compaction(self.store.live):
+                checkpoints.compact(self.live_checkpoints())
+
+    def resume(self, session, arg):
+        """Switch a connection to an existing session id."""
+        try:
+            resumed = GameSession(self.store, self.streams, int(arg))
+        except (KeyError, ValueError):
+            return session, ["ERROR unknown or expired session"]
+        session.refresh()
+        if resumed.sid != session.sid:
+            playing = session.difficulty is not None
+            self.store.release(session.sid)
+            self.checkpoint(session, playing=playing)
+        self.checkpoint(resumed, old_sid=int(arg))
+        return resumed, [f"WELCOME {resumed.sid}"] + resumed.status()
+
+    async def handle_client(self, reader, writer):
+        session = GameSession(self.store, self.streams)
+        self.active_connections += 1
+        self.total_connections += 1
+        try:
+            writer.write(f"WELCOME {session.sid}\n".encode("utf-8"))
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode("utf-8", "replace")
+                if text.upper().startswith("RESUME"):
+                    session, replies = self.resume(session, text[6:].strip())
+                else:
+                    # Resolve first: a spilled session comes back under a new id
+                    # and slot, and its old slot may hold another session by now.
+                    sid = session.sid
+                    expired = session.refresh()
+                    playing = session.difficulty
+                    replies = expired or session.handle(text)
+                    if session.sid != sid:
+                        replies.insert(0, f"WELCOME {session.sid}")
+                    if self.leaderboard and playing and replies[-1].startswith("VICTORY"):
+                        self.leaderboard.record(playing["name"], session.score, f"session-{session.sid}")
+                    self.checkpoint(session, sid, playing is not None)
+                writer.write(("\n".join(replies) + "\n").encode("utf-8"))
+                await writer.drain()
+                if replies[-1] == "BYE":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.active_connections -= 1
+            if self.leaderboard:
+                self.leaderboard.flush()
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, backlog=4096)
+        if self.checkpoints is not None:
+            self._sync_task = asyncio.create_task(self.sync_checkpoints())
+        return self.server
+
+    def close_checkpoints(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close_checkpoints()
+
+
+# ================================
+# Local Client and Load Generator
+# ================================
+async def read_reply(reader):
+    """Read lines until the final line of one reply."""
+    lines = []
+    while True:
+        line = (await reader.readline()).decode("utf-8").rstrip("\n")
+        if not line:
+            raise ConnectionError("server closed the connection")
+        lines.append(line)
+        if line.split(" ", 1)[0] in FINAL_REPLIES:
+            return lines
+
+
+async def run_client(host, port):
+    """Relay stdin commands to the server and print its replies."""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    print((await reader.readline()).decode("utf-8").rstrip())
+    print("Commands: START <1-4>, GUESS <n>, STATUS, RESUME <id>, QUIT")
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            line = "QUIT\n"
+        writer.write(line.encode("utf-8"))
+        await writer.drain()
+        replies = await read_reply(reader)
+        print("\n".join(replies))
+        if replies[-1] == "BYE":
+            break
+    writer.close()
+
+
+async def play_bot_session(host, port, choice, latencies):
+    """Play one full game with a simple bisecting bot; return the final reply."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readline()
+        command = f"START {choice}"
+        lo = hi = 0
+        guess = None
+        while True:
+            sent = time.perf_counter()
+            writer.write((command + "\n").encode("utf-8"))
+            await writer.drain()
+            replies = await read_reply(reader)
+            latencies.append(time.perf_counter() - sent)
+
+            final = replies[-1].split(" ")
+            if final[0] in ("LOST", "VICTORY", "ERROR"):
+                writer.write(b"QUIT\n")
+                return final[0]
+            text = " ".join(replies)
+            if final[0] == "LEVEL":
+                lo, hi = 1, int(final[3])
+                guess = (lo + hi) // 2
+            elif "higher" in text or "lower" in text:
+                if "higher" in text:
+                    lo = guess + 1
+                else:
+                    hi = guess - 1
+                guess = (lo + hi) // 2
+            else:
+                # No direction this turn: step through the window instead.
+                guess = guess + 1 if guess < hi else lo
+            command = f"GUESS {guess}"
+    finally:
+        writer.close()
+
+
+def raise_open_file_limit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def run_load(host, port, sessions, concurrency, choice, with_server=False):
+    """Drive many concurrent bot sessions and report throughput and latency."""
+    server = None
+    if with_server:
+        server = GameServer(host, port)
+        await server.start()
+
+    latencies = []
+    outcomes = {}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            result = await play_bot_session(host, port, choice, latencies)
+            outcomes[result] = outcomes.get(result, 0) + 1
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(sessions)), return_exceptions=True)
+    wall = time.perf_counter() - started
+    errors = [r for r in results if isinstance(r, Exception)]
+
+    if server is not None:
+        server.server.close()
+        await server.server.wait_closed()
+
+    latencies.sort()
+    print(f"{sessions} sessions ({concurrency} concurrent) in {wall:.2f}s "
+          f"— {sessions / wall:.0f} sessions/s, {len(latencies) / wall:.0f} commands/s")
+    if latencies:
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+        print(f"Latency ms: p50={pick(0.5):.2f} p99={pick(0.99):.2f} max={latencies[-1] * 1000:.2f}")
+    print(f"Outcomes: {outcomes}  errors: {len(errors)}")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Number guessing game server.")
+    parser.add_argument("mode", choices=["serve", "client", "load"], nargs="?", default="serve")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET,
+                        help="serve: session store size in bytes before idle eviction")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="serve: seconds before an idle session may be evicted")
+    parser.add_argument("--spill-path", default=None,
+                        help="serve: file for evicted sessions (dropped if not set)")
+    parser.add_argument("--leaderboard", default=None,
+                        help="serve: leaderboard log that records every victory (off if not set)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="serve: checkpoint log to save games to and restore them from (off if not set)")
+    parser.add_argument("--checkpoint-sync", type=float, default=DEFAULT_SYNC_INTERVAL,
+                        help="serve: seconds between fsyncs of the checkpoint log")
+    parser.add_argument("--sessions", type=int, default=10_000, help="load: games to play")
+    parser.add_argument("--concurrency", type=int, default=10_000, help="load: open connections")
+    parser.add_argument("--difficulty", default="2", help="load: menu choice for the bots")
+    parser.add_argument("--with-server", action="store_true",
+                        help="load: host the server in the same process (two sockets per session)")
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        raise_open_file_limit()
+        started = time.perf_counter()
+        try:
+            server = GameServer(args.host, args.port, args.seed, args.memory_budget,
+                                args.idle_timeout, args.spill_path, args.leaderboard,
+                                args.checkpoint, args.checkpoint_sync)
+        except CheckpointBusy as error:
+            parser.error(f"--checkpoint: {error}; is another server running on it?")
+        if args.checkpoint:
+            print(f"Restored {server.restored} games from {args.checkpoint} "
+                  f"in {time.perf_counter() - started:.2f}s")
+        print(f"Serving on {args.host}:{args.port}")
+        asyncio.run(server.serve_forever())
+    elif args.mode == "client":
+        asyncio.run(run_client(args.host, args.port))
+    else:
+        raise_open_file_limit()
+        asyncio.run(run_load(args.host, args.port, args.sessions, args.concurrency,
+                             args.difficulty, args.with_server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import bisect
+import functools
+import random
+from collections import namedtuple
+
+from metrics import instrument
+from number_index import DIV_3, DIV_5, EVEN, NUMBER_CLUES, NUMBER_INDEX, ODD, PRIME, SQUARE
+
+# ================================
+# Hint Rules
+# ================================
+# Every hint the game gives is declared once here as data:
+#   BANDS         hot/cold text by distance from the target
+#   HINT_TYPES    when each difficulty shows higher/lower, and whether it gives riddle clues
+#   DIRECTION_TEXTS  how each frontend words higher/lower
+#   CLUE_RULES    riddle clues, in groups; each group contributes its first matching rule
+# HintEngine compiles these into lookup tables: band limits for bisect and
+# np.searchsorted, (every, on) pairs for the direction test, and a tuple of
+# rule groups for clues. Clue lists depend only on (target, upper), so they are
+# memoized. A target is asked about on every miss, and batches share targets.
+#
+# A rule's when(number, upper) is written with operators that work on ints and
+# NumPy arrays alike, so clue_rules evaluates every rule over a whole array of
+# targets at once; property rules read number_index.py's tables either way.
+# Each rule has a kind, a stable name analytics counts clues by.
+#
+# New clue types are added with HintEngine.add_clue_rule (or by extending
+# CLUE_RULES); the engine recompiles and nothing on the hot path changes.
+# Batch methods need NumPy; scalar ones do not. NumPy is imported by the
+# first batch call, never at load, because it is most of a game's import time.
+
+NO_DIRECTION, HIGHER, LOWER = 0, 1, 2
+# (farthest distance, text); None means any distance.
+BANDS = (
+    (0, "🎯 Spot on!"),
+    (3, "🔥 Super hot!"),
+    (10, "🌡️ Getting warm."),
+    (20, "❄️ A bit chilly."),
+    (None, "🥶 Freezing cold."),
+)
+# direction: (every, on) shows higher/lower when attempts_left % every == on,
+# counting attempts_left after the miss; None never shows it.
+HINT_TYPES = {
+    "direct": {"direction": (1, 0), "clues": False},
+    "mixed": {"direction": (2, 0), "clues": False},
+    "riddle": {"direction": None, "clues": True},
+}
+# (higher text, lower text) per frontend style and hint type.
+DIRECTION_TEXTS = {
+    "cli": {
+        "direct": ("Too low! Try higher.", "Too high! Try lower."),
+        "mixed": ("Hint: The number is higher.", "Hint: The number is lower."),
+    },
+    "tk": {
+        "direct": (" (Higher)", " (Lower)"),
+        "mixed": (" (Hint: Higher)", " (Hint: Lower)"),
+    },
+}
+
+
+
+def property_is(code):
+    """when() for the property clue code: number_index's table, for ints or arrays."""
+    def when(n, upper):
+        if isinstance(n, int):
+            return NUMBER_INDEX.clue_code(n) == code
+        return NUMBER_INDEX.clue_codes(n) == code
+    return when
+
+
+# when(number, upper) -> bool (or a bool array), or None for always; text is a
+# string or text(number, upper).
+ClueRule = namedtuple("ClueRule", "group kind when text")
+CLUE_RULES = (
+    ClueRule("property", "prime", property_is(PRIME), NUMBER_CLUES[PRIME]),
+    ClueRule("property", "square", property_is(SQUARE), NUMBER_CLUES[SQUARE]),
+    ClueRule("property", "divisible by 5", property_is(DIV_5), NUMBER_CLUES[DIV_5]),
+    ClueRule("property", "divisible by 3", property_is(DIV_3), NUMBER_CLUES[DIV_3]),
+    ClueRule("property", "even", property_is(EVEN), NUMBER_CLUES[EVEN]),
+    ClueRule("property", "odd", None, NUMBER_CLUES[ODD]),
+    ClueRule("half", "above half", lambda n, upper: n > upper // 2,
+             lambda n, upper: f"It’s greater than {upper // 2}."),
+    ClueRule("half", "half or less", None, lambda n, upper: f"It’s {upper // 2} or less."),
+    ClueRule("edge", "single digit", lambda n, upper: n < 10, "It’s a single-digit number."),
+    ClueRule("edge", "close to top", lambda n, upper: n >= upper - upper // 10,
+             lambda n, upper: f"It’s close to {upper}."),
+)
+# Guesses this far out are "freezing" for every target, so clipping them keeps
+# guess - target inside int64 in the batch methods.
+SAFE_GUESS = 1 << 62
+
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+class Feedback(namedtuple("Feedback", "band band_text direction direction_text clue clue_text")):
+    """Everything shown after one miss; direction and clue are codes for logs."""
+
+    __slots__ = ()
+
+    def lines(self):
+        return [text for text in (self.band_text, self.direction_text, self.clue_text) if text]
+
+
+class HintEngine:
+    def __init__(self, clue_groups=None, style="cli", memo_size=1 << 16):
+        self.clue_groups = clue_groups
+        self.style = style
+        self.memo_size = memo_size
+        self.band_limits = tuple(limit for limit, _ in BANDS if limit is not None)
+        self.band_texts = tuple(text for _, text in BANDS)
+        self.rules = list(CLUE_RULES)
+        self.compile()
+
+    def compile(self):
+        groups = {}
+        for rule_id, rule in enumerate(self.rules):
+            if self.clue_groups is None or rule.group in self.clue_groups:
+                text = rule.text if callable(rule.text) else (lambda n, upper, text=rule.text: text)
+                groups.setdefault(rule.group, []).append((rule_id, rule.when, text))
+        self._groups = tuple(tuple(rules) for rules in groups.values())
+        self._directions = {name: spec["direction"] for name, spec in HINT_TYPES.items()}
+        self._clue_types = frozenset(name for name, spec in HINT_TYPES.items() if spec["clues"])
+        self.clues = functools.lru_cache(maxsize=self.memo_size)(self._clues)
+
+    def add_clue_rule(self, group, when, text, kind=None):
+        """Declare a new riddle clue; an unknown group adds a clue to every target it matches.
+
+        kind names it for analytics; it defaults to the text, or the group
+        when the text is computed.
+        """
+        if kind is None:
+            kind = group if callable(text) else text
+        self.rules.append(ClueRule(group, kind, when, text))
+        self.compile()
+
+    # -------------------------
+    # One guess
+    # -------------------------
+    def band(self, guess, target):
+        return bisect.bisect_left(self.band_limits, abs(guess - target))
+
+    def band_text(self, guess, target):
+        return self.band_texts[self.band(guess, target)]
+
+    def shows_direction(self, hint_type, attempts_left):
+        rule = self._directions[hint_type]
+        return rule is not None and attempts_left % rule[0] == rule[1]
+
+    def direction(self, hint_type, guess, target, attempts_left):
+        if guess == target or not self.shows_direction(hint_type, attempts_left):
+            return NO_DIRECTION
+        return HIGHER if guess < target else LOWER
+
+    def direction_text(self, hint_type, direction):
+        if direction == NO_DIRECTION:
+            return None
+        return DIRECTION_TEXTS[self.style][hint_type][direction - HIGHER]
+
+    def gives_clues(self, hint_type):
+        return hint_type in self._clue_types
+
+    @instrument("riddle_clues")
+    def _clues(self, target, upper):
+        found = []
+        for rules in self._groups:
+            for _, when, text in rules:
+                if when is None or when(target, upper):
+                    found.append(text(target, upper))
+                    break
+        return tuple(found)
+
+    @instrument("hint")
+    def miss(self, hint_type, guess, target, attempts_left, upper, rng=random):
+        """The feedback for a wrong guess, attempts_left already spent."""
+        band = self.band(guess, target)
+        direction = self.direction(hint_type, guess, target, attempts_left)
+        clue = None
+        clue_text = None
+        if self.gives_clues(hint_type):
+            clues = self.clues(target, upper)
+            clue = rng.randrange(len(clues))
+            clue_text = clues[clue]
+        return Feedback(band, self.band_texts[band], direction,
+                        self.direction_text(hint_type, direction), clue, clue_text)
+
+    # -------------------------
+    # Batches
+    # -------------------------
+    def bands(self, guesses, targets):
+        """Band codes for arrays of guesses and targets."""
+        np = _numpy()
+        guesses = np.clip(np.asarray(guesses, dtype=np.int64), -SAFE_GUESS, SAFE_GUESS)
+        targets = np.asarray(targets).astype(np.int64)
+        return np.searchsorted(np.array(self.band_limits, dtype=np.int64), np.abs(guesses - targets))
+
+    def band_text_array(self, codes):
+        np = _numpy()
+        return np.array(self.band_texts, dtype=object)[codes]
+
+    def directions(self, hint_type, guesses, targets, attempts_left):
+        """Direction codes for arrays; attempts_left may be a scalar or an array."""
+        np = _numpy()
+        guesses = np.asarray(guesses, dtype=np.int64)
+        targets = np.asarray(targets).astype(np.int64)
+        rule = self._directions[hint_type]
+        if rule is None:
+            return np.zeros(np.broadcast(guesses, targets).shape, dtype=np.uint8)
+        shown = (np.asarray(attempts_left) % rule[0] == rule[1]) & (guesses != targets)
+        return np.where(shown, np.where(guesses < targets, HIGHER, LOWER), NO_DIRECTION).astype(np.uint8)
+
+    def clue_rules(self, targets, upper):
+        """Which rule gave each clue, for an array of targets.
+
+        Returns an int array with a row per target: column k holds the index
+        in self.rules of the k-th clue clues(target, upper) lists, -1 past the
+        last. upper may be an int or an array matching targets.
+        """
+        np = _numpy()
+        targets = np.asarray(targets)
+        found = np.full((len(targets), len(self._groups)), -1, dtype=np.int64)
+        counts = np.zeros(len(targets), dtype=np.int64)
+        rows = np.arange(len(targets))
+        for rules in self._groups:
+            chosen = np.full(len(targets), -1, dtype=np.int64)
+            for rule_id, when, _ in rules:
+                undecided = chosen < 0
+                hit = undecided if when is None else undecided & when(targets, upper)
+                chosen[hit] = rule_id
+            given = chosen >= 0
+            found[rows[given], counts[given]] = chosen[given]
+            counts += given
+        return found
+
+    def clue_table(self, targets, upper):
+        """Clue tuples for an array of targets, as clues() gives them.
+
+        Rules are matched over the whole array by clue_rules; only texts that
+        are computed from the number are built one target at a time.
+        """
+        np = _numpy()
+        targets = np.asarray(targets)
+        rules = self.clue_rules(targets, upper)
+        texts = np.empty(rules.shape, dtype=object)
+        for rule_id in np.unique(rules[rules >= 0]).tolist():
+            hit = rules == rule_id
+            text = self.rules[rule_id].text
+            if callable(text):
+                given = hit.any(axis=1)
+                uppers = np.broadcast_to(upper, targets.shape)[given].tolist()
+                texts[hit] = [text(n, top) for n, top in zip(targets[given].tolist(), uppers)]
+            else:
+                texts[hit] = text
+        table = np.empty(len(targets), dtype=object)
+        for i, row in enumerate(texts.tolist()):
+            table[i] = tuple(text for text in row if text is not None)
+        return table
+
+
+# Shared engines: the CLIs, server and tools use HINTS; the Tk app words
+# directions its own way and gives only the property and half clues.
+HINTS = HintEngine()
+TK_HINTS = HintEngine(clue_groups=("property", "half"), style="tk")
@@ -1,21 +1,61 @@
+import functools
 import random
 import sys
 import time
-from colorama import Fore, Style, init
 
-# Initialize colorama
-init(autoreset=True)
+import game_flow
+from checkpoint import open_default
+from engine import difficulty_config
+from game_flow import start_round
+from hint_rules import HINTS
+from metrics import METRICS
+from number_index import NUMBER_INDEX
+from renderer import RENDERER, cached_banner
+from replay_log import RECORDER
+from streams import STREAMS
+from timed_input import InputTimeout
+
+RECORDER.source = "timed_cli"
+
+
+# ================================
+# Colours
+# ================================
+# colorama is imported and initialized the first time a colour is used. The
+# welcome screen comes pre-rendered from the banner cache, so that happens
+# after the first prompt instead of at launch.
+@functools.lru_cache(maxsize=None)
+def load_colorama():
+    import colorama
+    colorama.init(autoreset=True)
+    return colorama
+
+
+class LazyPalette:
+    """Stands in for colorama.Fore or colorama.Style until a colour is needed."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, colour):
+        value = getattr(getattr(load_colorama(), self.name), colour)
+        setattr(self, colour, value)
+        return value
+
+
+Fore = LazyPalette("Fore")
+Style = LazyPalette("Style")
 
 
 # ================================
 # Utility Functions
 # ================================
 def slow_print(text, delay=0.03):
-    """Print text slowly for dramatic effect."""
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
+    """Print text slowly for dramatic effect.
+
+    The renderer buffers it and types it out when the game next waits for input.
+    """
+    RENDERER.type(text, delay)
 
 
 def countdown_timer(seconds):
@@ -50,187 +90,159 @@ __     ______  _    _   _      ____   _    _   _
 {Style.RESET_ALL}"""
 
 
+def get_welcome_screen():
+    """Banner, greeting and difficulty menu, shown at once before the first prompt."""
+    return "\n".join([
+        get_ascii_banner(),
+        "🎯 Welcome to the Number Guessing Game — Deluxe Edition!\n",
+        "\nSelect a difficulty:",
+        "1. Easy",
+        "2. Normal",
+        "3. Hard",
+        "4. Huge (targets up to 10^18)",
+    ])
+
+
 # ================================
 # Riddle and Hint System
 # ================================
 def is_prime(n):
-    if n < 2:
-        return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
-            return False
-    return True
+    return NUMBER_INDEX.is_prime(n)
+
 
+def get_riddle_clues(number, upper=100):
+    """Every clue get_riddle_hint may give for number.
 
-def get_riddle_hint(number):
+    Range clues are relative to upper, the top of the difficulty's range.
+    """
+    return list(HINTS.clues(number, upper))
+
+
+def get_riddle_hint(number, upper=100):
     """Enhanced riddle-style hints for Hard mode."""
-    clues = []
-
-    if is_prime(number):
-        clues.append("It’s a prime number.")
-    elif int(number ** 0.5) ** 2 == number:
-        clues.append("It’s a perfect square.")
-    elif number % 5 == 0:
-        clues.append("It’s divisible by 5.")
-    elif number % 3 == 0:
-        clues.append("It’s divisible by 3.")
-    elif number % 2 == 0:
-        clues.append("It’s an even number.")
-    else:
-        clues.append("It’s an odd number.")
-
-    if number > 50:
-        clues.append("It’s greater than 50.")
-    else:
-        clues.append("It’s 50 or less.")
-
-    if number < 10:
-        clues.append("It’s a single-digit number.")
-    elif number >= 90:
-        clues.append("It’s close to 100.")
-
-    return random.choice(clues)
+    return random.choice(HINTS.clues(number, upper))
 
 
 def get_adaptive_hint(guess, target):
     """Give adaptive hot/cold hints based on distance."""
-    diff = abs(guess - target)
-    if diff == 0:
-        return "🎯 Spot on!"
-    elif diff <= 3:
-        return "🔥 Super hot!"
-    elif diff <= 10:
-        return "🌡️ Getting warm."
-    elif diff <= 20:
-        return "❄️ A bit chilly."
-    else:
-        return "🥶 Freezing cold."
+    return HINTS.band_text(guess, target)
 
 
 # ================================
 # Difficulty and Game Logic
 # ================================
-def select_difficulty():
-    slow_print("\nSelect a difficulty:")
-    slow_print("1. Easy")
-    slow_print("2. Normal")
-    slow_print("3. Hard")
-
-    while True:
-        choice = input("Enter 1, 2, or 3: ").strip()
-        if choice in ["1", "2", "3"]:
-            return choice
-        print("Invalid input. Please enter 1, 2, or 3.")
-
-
-def setup_difficulty(choice):
-    """Configure difficulty settings."""
-    if choice == "1":
-        return {
-            "name": "Easy",
-            "levels": 3,
-            "attempts": 10,
-            "base_range": 10,
-            "hint_type": "direct",
-            "timer": 0
-        }
-    elif choice == "2":
-        return {
-            "name": "Normal",
-            "levels": 5,
-            "attempts": 7,
-            "base_range": 50,
-            "hint_type": "mixed",
-            "timer": 25
-        }
-    else:
-        return {
-            "name": "Hard",
-            "levels": 7,
-            "attempts": 5,
-            "base_range": 100,
-            "hint_type": "riddle",
-            "timer": 20
-        }
-
-
-def play_level(level, difficulty, score):
-    """Play a single level and return (success, new_score)."""
-    level_range = int(difficulty["base_range"] * (level / difficulty["levels"])) + 5
-    number_to_guess = random.randint(1, level_range)
-    attempts_left = difficulty["attempts"]
-    start_time = time.time()
-
-    slow_print(f"\n{Fore.CYAN}Level {level} — Range: 1 to {level_range}")
-    slow_print(f"You have {attempts_left} attempts!")
-
-    while attempts_left > 0:
-        try:
-            guess = int(input("Enter your guess: "))
-        except ValueError:
-            print(Fore.RED + "Please enter a valid number.")
-            continue
+def setup_difficulty(choice, base_range=None):
+    """Configure difficulty settings.
 
-        if guess == number_to_guess:
-            elapsed = int(time.time() - start_time)
-            time_bonus = max(0, 10 - elapsed)
-            gained = (attempts_left * 10) + (level * 5) + time_bonus
-            score += gained
+    base_range overrides the chosen mode's range, e.g. for big-range play.
+    """
+    return difficulty_config(choice, base_range)
 
-            slow_print(Fore.GREEN + f"🎉 Correct! You cleared Level {level}!")
-            slow_print(Fore.YELLOW + f"🏅 You earned {gained} points (Total: {score})")
-            return True, score
 
-        attempts_left -= 1
-        print(Fore.MAGENTA + get_adaptive_hint(guess, number_to_guess))
+def time_up(level, difficulty, game_round, seconds):
+    """Record a level lost to its timer and tell the player."""
+    RECORDER.record_timeout(level, difficulty, game_round.target, game_round.attempts_left, seconds)
+    METRICS.count("timeout")
+    slow_print(Fore.RED + "\n⏰ Time’s up! You ran out of time.")
 
-        if difficulty["hint_type"] == "direct":
-            if guess < number_to_guess:
-                print("Too low! Try higher.")
-            else:
-                print("Too high! Try lower.")
-        elif difficulty["hint_type"] == "mixed" and attempts_left % 2 == 0:
-            if guess < number_to_guess:
-                print("Hint: The number is higher.")
+
+def play_level(level, difficulty, score, ask=RENDERER.ask, stream=None, resume=None, save=None):
+    """Play a single level and return (success, new_score).
+
+    stream is the game's SessionStream; without one the level gets a fresh stream.
+    resume is a Checkpoint of this level to continue from. save(game_round,
+    score, seconds) is called once the level starts and after every miss.
+    """
+    stream = STREAMS.spawn() if stream is None else stream
+    game_round, start_time = start_round(level, difficulty, stream, resume)
+    timer = game_round.level.timer
+    deadline = start_time + timer if timer else None
+
+    slow_print(f"\n{Fore.CYAN}Level {level} — Range: 1 to {game_round.level.range}")
+    slow_print(f"You have {game_round.attempts_left} attempts!")
+    if deadline is not None:
+        slow_print(f"You have {timer} seconds!")
+    if save is not None:
+        save(game_round, score, time.perf_counter() - start_time)
+
+    while game_round.attempts_left > 0:
+        try:
+            if deadline is not None and ask == RENDERER.ask:
+                # The interactive prompt enforces the deadline while the player types.
+                guess = int(RENDERER.ask("Enter your guess: ", deadline=deadline))
             else:
-                print("Hint: The number is lower.")
-        elif difficulty["hint_type"] == "riddle":
-            print(Fore.BLUE + get_riddle_hint(number_to_guess))
+                guess = int(ask("Enter your guess: "))
+        except InputTimeout:
+            time_up(level, difficulty, game_round, time.perf_counter() - start_time)
+            return False, score
+        except ValueError:
+            RENDERER.show(Fore.RED + "Please enter a valid number.")
+            continue
 
-        print(Fore.CYAN + f"Attempts left: {attempts_left}")
+        seconds = time.perf_counter() - start_time
+        if game_round.timed_out(seconds):
+            # Only scripted input gets here late; the live prompt raises InputTimeout.
+            time_up(level, difficulty, game_round, seconds)
+            return False, score
+        outcome = game_round.guess(guess, seconds)
+        if outcome.cleared:
+            RECORDER.record(level, difficulty, game_round.target, guess, game_round.attempts_left, seconds)
+            score += outcome.gained
+            METRICS.observe("level", seconds)
+            METRICS.count("level_cleared")
+            METRICS.count("points", outcome.gained)
 
-        if difficulty["timer"]:
-            elapsed = int(time.time() - start_time)
-            if elapsed > difficulty["timer"]:
-                slow_print(Fore.RED + "\n⏰ Time’s up! You ran out of time.")
-                return False, score
+            slow_print(Fore.GREEN + f"🎉 Correct! You cleared Level {level}!")
+            slow_print(Fore.YELLOW + f"🏅 You earned {outcome.gained} points (Total: {score})")
+            return True, score
 
+        feedback = outcome.feedback
+        RENDERER.show(Fore.MAGENTA + feedback.band_text)
+        if feedback.direction_text:
+            RENDERER.show(feedback.direction_text)
+        if feedback.clue_text:
+            RENDERER.show(Fore.BLUE + feedback.clue_text)
+        RECORDER.record(level, difficulty, game_round.target, guess, game_round.attempts_left,
+                        seconds, feedback.direction, feedback.clue)
+
+        RENDERER.show(Fore.CYAN + f"Attempts left: {game_round.attempts_left}")
+        if save is not None:
+            save(game_round, score, seconds)
+
+        # With no attempts left the level is lost to the miss, not the timer.
+        if deadline is not None and game_round.attempts_left > 0 and time.perf_counter() > deadline:
+            time_up(level, difficulty, game_round, time.perf_counter() - start_time)
+            return False, score
+
+    METRICS.count("level_lost")
     slow_print(Fore.RED + "\n💀 Out of attempts! Game over.")
     return False, score
 
 
-def play_game():
-    """Main game loop."""
-    print(get_ascii_banner())
-    slow_print("🎯 Welcome to the Number Guessing Game — Deluxe Edition!\n")
+class GameFlow(game_flow.GameFlow):
+    """The shared game flow (game_flow.py) with this CLI's screens, colours and timed prompts."""
+
+    setup_difficulty = staticmethod(setup_difficulty)
+    play_level = staticmethod(play_level)
 
-    difficulty_choice = select_difficulty()
-    difficulty = setup_difficulty(difficulty_choice)
+    def welcome_screen(self):
+        return cached_banner("timed-welcome", get_welcome_screen, __file__)
 
-    slow_print(f"\nYou selected {difficulty['name']} mode.")
-    slow_print("Let's begin!\n")
+    def victory_banner(self):
+        return get_victory_banner()
 
-    score = 0
+    def say(self, text, colour=None):
+        slow_print(text if colour is None else getattr(Fore, colour) + text)
 
-    for level in range(1, difficulty["levels"] + 1):
-        success, score = play_level(level, difficulty, score)
-        if not success:
-            slow_print(Fore.RED + "Restarting from Level 1...")
-            return play_game()
 
-    slow_print(get_victory_banner())
-    slow_print(Fore.YELLOW + f"🏆 Final Score: {score}")
-    slow_print("Thanks for playing!\n")
+def play_game():
+    """Main game loop."""
+    checkpoints = open_default("timed_cli")
+    try:
+        GameFlow(checkpoints=checkpoints).run()
+    finally:
+        if checkpoints is not None:
+            checkpoints.close()
     sys.exit()
 
 
@@ -0,0 +1,271 @@
+import heapq
+import os
+import struct
+import time
+
+from file_lock import LockFile
+from renderer import cache_dir
+
+# ================================
+# Leaderboard
+# ================================
+# Final scores are appended to a binary log of fixed-width records:
+#   timestamp (f64) | score (u32) | difficulty id (u8) | name length (u8) | name (32 bytes UTF-8)
+# Only the best `keep` scores per difficulty stay in memory, in a min-heap, so
+# memory is bounded however long the log grows. Top-K answers come from a sorted
+# copy of the heap that is rebuilt only after a write changed it.
+#
+# The log keeps every record ever written until it is compacted. Compaction
+# rewrites it with only the records still on a board, through a temp file and
+# os.replace so a crash never leaves a half-written log. It runs automatically
+# once the log holds compact_ratio times more records than the boards.
+#
+# Several games may share the log (the CLIs, the Tk app, a server), so every
+# write and every compaction happens under its lock (file_lock.py). record()
+# only buffers; flush() takes the lock, first reads the records other
+# processes appended since this one last looked, then appends its own with one
+# os.write. If another process compacted the log meanwhile (a new inode), the
+# boards are reloaded from it instead; the log is read through a handle kept
+# open, so its inode cannot be freed and reused by the replacement. Compaction does the same catch-up
+# before it rewrites, so no process's scores are lost to another's rewrite.
+# The default log lives in the cache directory (renderer.cache_dir).
+
+RECORD = struct.Struct("<dIBB32s")
+NAME_BYTES = 32
+DIFFICULTIES = ("Easy", "Normal", "Hard", "Huge")
+BATCH_BYTES = 64 * 1024
+
+
+def default_path():
+    return os.path.join(cache_dir(), "leaderboard.bin")
+
+
+def encode_name(player):
+    raw = player.encode("utf-8")[:NAME_BYTES]
+    # Don't cut a multi-byte character in half.
+    return raw.decode("utf-8", "ignore").encode("utf-8")
+
+
+class Leaderboard:
+    def __init__(self, path=None, keep=1000, compact_ratio=4):
+        self.path = path or default_path()
+        self.keep = keep
+        self.compact_ratio = compact_ratio
+        self._lock = LockFile(self.path)
+        self._pending = bytearray()
+        self._file = None
+        self._reset()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._catch_up()
+
+    # -------------------------
+    # Loading and writing
+    # -------------------------
+    def _reset(self):
+        self._heaps = [[] for _ in DIFFICULTIES]
+        self._sorted = [None for _ in DIFFICULTIES]
+        self.log_records = self.retained = 0
+        # How far self._file has been read.
+        self._offset = 0
+
+    def _offer_records(self, data):
+        for timestamp, score, difficulty, length, name in RECORD.iter_unpack(data):
+            self._offer(difficulty, score, timestamp, name[:length].decode("utf-8"))
+            self.log_records += 1
+
+    def _catch_up(self, chunk_records=65536):
+        """Read what other processes appended since the last look; the lock is held."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        if (self._file is None or stat is None or stat.st_size < self._offset
+                or stat.st_ino != os.fstat(self._file.fileno()).st_ino):
+            # First look, or another process compacted the log: start over,
+            # keeping this process's unwritten records.
+            self._reset()
+            self._offer_records(self._pending)
+            self._close_file()
+            if stat is None:
+                return
+            self._file = open(self.path, "rb")
+        self._file.seek(self._offset)
+        while True:
+            chunk = self._file.read(RECORD.size * chunk_records)
+            whole = len(chunk) - len(chunk) % RECORD.size
+            self._offer_records(chunk[:whole])
+            self._offset += whole
+            if len(chunk) < RECORD.size * chunk_records:
+                break
+        if self._offset < stat.st_size:
+            # A partial record left by a writer that crashed mid-write; appending
+            # after it would misalign every later record.
+            os.truncate(self.path, self._offset)
+
+    def _offer(self, difficulty, score, timestamp, player):
+        """Put an entry on a board if it ranks; return True if the board changed."""
+        heap = self._heaps[difficulty]
+        entry = (score, -timestamp, player)
+        if len(heap) < self.keep:
+            heapq.heappush(heap, entry)
+            self.retained += 1
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        else:
+            return False
+        self._sorted[difficulty] = None
+        return True
+
+    def record(self, difficulty_name, score, player=None, timestamp=None):
+        """Append a final score; buffered until flush() or close()."""
+        difficulty = DIFFICULTIES.index(difficulty_name)
+        player = player or default_player()
+        timestamp = time.time() if timestamp is None else timestamp
+        name = encode_name(player)
+        self._pending += RECORD.pack(timestamp, score, difficulty, len(name), name)
+        self.log_records += 1
+        self._offer(difficulty, score, timestamp, name.decode("utf-8"))
+        if self.log_records > self.compact_ratio * max(self.retained, self.keep):
+            self.compact()
+        elif len(self._pending) >= BATCH_BYTES:
+            self.flush()
+
+    def flush(self):
+        """Catch up with other writers, then append the buffered records."""
+        with self._lock:
+            self._catch_up()
+            if not self._pending:
+                return
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, self._pending)
+            finally:
+                os.close(fd)
+            if self._file is None:
+                self._file = open(self.path, "rb")
+            self._offset += len(self._pending)
+            self._pending.clear()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.flush()
+        self._close_file()
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def top(self, difficulty_name, k=100):
+        """Best k scores as (player, score, timestamp), highest first."""
+        difficulty = DIFFICULTIES.index(difficulty_name)
+        ranked = self._sorted[difficulty]
+        if ranked is None:
+            ranked = sorted(self._heaps[difficulty], reverse=True)
+            self._sorted[difficulty] = ranked
+        return [(player, score, -negative_time) for score, negative_time, player in ranked[:k]]
+
+    def rank(self, difficulty_name, score, timestamp, player):
+        """1-based rank of one entry on its board, or None if it is not on it."""
+        entry = (score, -timestamp, encode_name(player).decode("utf-8"))
+        for rank, (name, best, when) in enumerate(self.top(difficulty_name, self.keep), 1):
+            if (best, -when, name) == entry:
+                return rank
+        return None
+
+    # -------------------------
+    # Compaction
+    # -------------------------
+    def compact(self):
+        """Rewrite the log with only the records still on a board, every process's included."""
+        with self._lock:
+            self._catch_up()
+            temp_path = self.path + ".compact"
+            with open(temp_path, "wb") as f:
+                for difficulty, heap in enumerate(self._heaps):
+                    for score, negative_time, player in sorted(heap, reverse=True):
+                        name = player.encode("utf-8")
+                        f.write(RECORD.pack(-negative_time, score, difficulty, len(name), name))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            # The boards now hold exactly the log, buffered records included.
+            self._pending.clear()
+            self._close_file()
+            self._file = open(self.path, "rb")
+            self._offset = self.retained * RECORD.size
+            self.log_records = self.retained
+
+
+def default_player():
+    # Imported here: getpass costs a few ms and is only needed after a win.
+    import getpass
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "player"
+
+
+_default_board = None
+
+
+def record_score(difficulty_name, score, player=None, path=None, board=None):
+    """Record a finished game and return its rank.
+
+    The game goes on board if one is given, else on the default leaderboard.
+    """
+    global _default_board
+    if board is None:
+        if _default_board is None:
+            _default_board = Leaderboard(path)
+        board = _default_board
+    player = player or default_player()
+    timestamp = time.time()
+    board.record(difficulty_name, score, player, timestamp)
+    board.flush()
+    return board.rank(difficulty_name, score, timestamp, player)
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import tracemalloc
+
+    count = 1_000_000
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "leaderboard.bin")
+    board = Leaderboard(path)
+    games = [(rng.choice(DIFFICULTIES[:3]), rng.randint(0, 500), f"player{i % 5000}") for i in range(count)]
+
+    start = time.perf_counter()
+    for i, (difficulty, score, player) in enumerate(games):
+        board.record(difficulty, score, player, i)
+    board.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{count} records in {elapsed:.2f}s ({count / elapsed:.0f}/s), "
+          f"log now {os.path.getsize(path) // RECORD.size} records")
+
+    board.top("Hard")
+    board.record("Hard", 600, "champion")
+    start = time.perf_counter()
+    best = board.top("Hard", 100)
+    print(f"top 100 on Hard after a write: {(time.perf_counter() - start) * 1e6:.0f} µs, "
+          f"leader {best[0][:2]}")
+    start = time.perf_counter()
+    for _ in range(1000):
+        board.top("Hard", 100)
+    print(f"top 100 on Hard, cached: {(time.perf_counter() - start) * 1e3:.1f} µs")
+    board.close()
+
+    # Memory stays bounded by keep, not by how many games were played.
+    tracemalloc.start()
+    board = Leaderboard(path)
+    for i, (difficulty, score, player) in enumerate(games[:200_000]):
+        board.record(difficulty, score, player, count + i)
+    print(f"traced memory after 200000 more records: {tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB")
+    board.close()
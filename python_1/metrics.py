@@ -0,0 +1,257 @@
+import argparse
+import atexit
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+
+# ================================
+# Instrumentation and Metrics Export
+# ================================
+# Opt-in timers, counters and latency histograms for the game's hot paths,
+# exported in the Prometheus text format. Set GUESS_METRICS=<path> before
+# launching a game or the server to turn them on. "{pid}" in the path is
+# replaced by the process id, so a launcher that spawns one process per
+# player can point every process at one directory. The file is rewritten
+# every GUESS_METRICS_INTERVAL seconds (default 10) and at exit, atomically,
+# so a Prometheus textfile collector can scrape it at any time.
+#
+# Disabled (the default), @instrument returns the function it decorates
+# unchanged, so instrumented code runs exactly as before. METRICS.count is a
+# method call that returns at once; it is only used once per level or game.
+#
+# An export that fails is logged and retried next interval; the thread keeps
+# running whatever went wrong. A GUESS_METRICS_INTERVAL that is not a positive
+# number is logged and the default used.
+#
+# Families:
+#   guess_latency_seconds{op}   histogram of time per call of an instrumented op
+#   guess_events_total{event}   counter of game events (levels cleared, ...)
+#
+#   GUESS_METRICS=/tmp/guess-{pid}.prom python3 numberguessinggamepython.py
+#   python3 metrics.py /tmp/guess-*.prom      # count, mean and quantiles per op
+
+ENV_PATH = "GUESS_METRICS"
+ENV_INTERVAL = "GUESS_METRICS_INTERVAL"
+# Upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+LATENCY = "guess_latency_seconds"
+EVENTS = "guess_events_total"
+DEFAULT_INTERVAL = 10.0
+
+
+class Histogram:
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+
+
+class Metrics:
+    def __init__(self, path=None, interval=DEFAULT_INTERVAL):
+        self.path = path.replace("{pid}", str(os.getpid())) if path else None
+        self.enabled = self.path is not None
+        self.interval = interval
+        self.histograms = {}
+        self.counters = {}
+        self._exporter = None
+
+    def histogram(self, op):
+        if op not in self.histograms:
+            self.histograms[op] = Histogram()
+        return self.histograms[op]
+
+    def count(self, event, n=1):
+        if self.enabled:
+            self.counters[event] = self.counters.get(event, 0) + n
+
+    def observe(self, op, seconds):
+        if self.enabled:
+            self.histogram(op).observe(seconds)
+
+    def start(self):
+        """Write the file now, every interval seconds, and at exit."""
+        if not self.enabled or self._exporter is not None:
+            return
+        self._exporter = threading.Thread(target=self._export_loop, name="metrics-export", daemon=True)
+        self._exporter.start()
+        atexit.register(self._export)
+
+    def _export(self):
+        try:
+            self.write()
+        except Exception:
+            _logger().exception("metrics export to %s failed", self.path)
+
+    def _export_loop(self):
+        while True:
+            self._export()
+            time.sleep(self.interval)
+
+    # -------------------------
+    # Prometheus text format
+    # -------------------------
+    def render(self):
+        lines = [f"# HELP {LATENCY} Time per call of an instrumented operation.",
+                 f"# TYPE {LATENCY} histogram"]
+        # The game threads keep adding ops and events; copy before iterating.
+        for op, histogram in sorted(dict(self.histograms).items()):
+            counts = list(histogram.counts)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (None,), counts):
+                cumulative += n
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f'{LATENCY}_bucket{{op="{op}",le="{le}"}} {cumulative}')
+            lines.append(f'{LATENCY}_sum{{op="{op}"}} {histogram.total!r}')
+            lines.append(f'{LATENCY}_count{{op="{op}"}} {cumulative}')
+        lines.append(f"# HELP {EVENTS} Game events.")
+        lines.append(f"# TYPE {EVENTS} counter")
+        for event, n in sorted(dict(self.counters).items()):
+            lines.append(f'{EVENTS}{{event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=None):
+        path = path or self.path
+        if path is None:
+            return
+        text = self.render()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+def _logger():
+    # Imported here: logging is only needed when something goes wrong.
+    import logging
+    return logging.getLogger(__name__)
+
+
+def env_interval():
+    """GUESS_METRICS_INTERVAL in seconds, or the default if unset or invalid."""
+    text = os.environ.get(ENV_INTERVAL)
+    if text is None:
+        return DEFAULT_INTERVAL
+    try:
+        interval = float(text)
+    except ValueError:
+        interval = 0.0
+    if not 0 < interval < float("inf"):
+        _logger().warning("%s=%r is not a positive number of seconds; using %s",
+                          ENV_INTERVAL, text, DEFAULT_INTERVAL)
+        return DEFAULT_INTERVAL
+    return interval
+
+
+METRICS = Metrics(os.environ.get(ENV_PATH) or None, env_interval())
+METRICS.start()
+
+
+def instrument(op, metrics=METRICS):
+    """Decorator timing each call into the op's latency histogram.
+
+    When metrics are off at import time the function is returned as is.
+    """
+    def decorate(func):
+        if not metrics.enabled:
+            return func
+        histogram = metrics.histogram(op)
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(clock() - start)
+        return timed
+    return decorate
+
+
+# ================================
+# Reading exported files
+# ================================
+def parse(paths):
+    """Merge exported files into ({op: (bucket counts, sum)}, {event: count})."""
+    histograms = {}
+    counters = {}
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                name_labels, _, value = line.rpartition(" ")
+                name, _, labels = name_labels.partition("{")
+                fields = dict(part.split("=", 1) for part in labels.rstrip("}").split(",") if part)
+                fields = {key: text.strip('"') for key, text in fields.items()}
+                if name == EVENTS:
+                    counters[fields["event"]] = counters.get(fields["event"], 0) + int(value)
+                    continue
+                counts, total = histograms.setdefault(fields.get("op"), ([0] * (len(BUCKETS) + 1), [0.0]))
+                if name == LATENCY + "_bucket":
+                    le = fields["le"]
+                    index = len(BUCKETS) if le == "+Inf" else BUCKETS.index(float(le))
+                    counts[index] += int(value)
+                elif name == LATENCY + "_sum":
+                    total[0] += float(value)
+    # Files store cumulative bucket counts; turn them back into per-bucket counts.
+    merged = {}
+    for op, (cumulative, total) in histograms.items():
+        merged[op] = ([cumulative[0]] + [b - a for a, b in zip(cumulative, cumulative[1:])], total[0])
+    return merged, counters
+
+
+def quantile(counts, q):
+    """Estimate a quantile from bucket counts, interpolating inside the bucket."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, n in enumerate(counts):
+        if n and seen + n >= rank:
+            low = BUCKETS[i - 1] if i else 0.0
+            high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return low + (high - low) * (rank - seen) / n
+        seen += n
+    return BUCKETS[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize exported game metrics.")
+    parser.add_argument("paths", nargs="+", help="files written with GUESS_METRICS=<path>")
+    args = parser.parse_args(argv)
+
+    histograms, counters = parse(args.paths)
+    print(f"{'Operation':<18} {'Calls':>10} {'Mean':>10} {'p50':>10} {'p90':>10} {'p99':>10}")
+    for op, (counts, total) in sorted(histograms.items()):
+        calls = sum(counts)
+        if not calls:
+            continue
+        cells = [total / calls] + [quantile(counts, q) for q in (0.5, 0.9, 0.99)]
+        print(f"{op:<18} {calls:>10} " + " ".join(f"{seconds * 1e3:>8.3f}ms" for seconds in cells))
+    for event, n in sorted(counters.items()):
+        print(f"{event:<18} {n:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import functools
+import math
+
+from metrics import instrument
+
+# ================================
+# Number Property Index
+# ================================
+# Precomputed prime / square / divisibility flags for 0..limit so riddle hints
+# are table lookups instead of trial division. Flags are bit-packed: bit n of
+# a flag array lives in byte n >> 3 at position n & 7. The index grows lazily
+# (doubling) the first time a number past its limit is looked up, up to
+# max_limit. Past that (big-range mode, targets up to 10^18 and beyond) the
+# same questions are answered arithmetically: Miller–Rabin for primality and
+# math.isqrt for squares. clue_codes answers a whole NumPy array with one table
+# lookup; only numbers past max_limit are worked out one at a time.
+
+NUMBER_CLUES = (
+    "It’s a prime number.",
+    "It’s a perfect square.",
+    "It’s divisible by 5.",
+    "It’s divisible by 3.",
+    "It’s an even number.",
+    "It’s an odd number.",
+)
+PRIME, SQUARE, DIV_5, DIV_3, EVEN, ODD = range(len(NUMBER_CLUES))
+
+DEFAULT_DIVISORS = (2, 3, 5)
+DEFAULT_MAX_LIMIT = 1 << 22
+
+# Deterministic Miller–Rabin witness sets, smallest first: (upper bound, bases).
+# The last set is deterministic for every n < 3,317,044,064,679,887,385,961,981;
+# beyond that it is a strong probable-prime test to the same bases.
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MILLER_RABIN_BASES = (
+    (3_215_031_751, (2, 3, 5, 7)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),
+    (None, SMALL_PRIMES),
+)
+_TO_BITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def pack_bits(flags):
+    """Pack a bytearray of 0/1 flags into a little-endian bitset."""
+    if not flags:
+        return bytearray()
+    as_int = int(flags[::-1].translate(_TO_BITS), 2)
+    return bytearray(as_int.to_bytes((len(flags) + 7) >> 3, "little"))
+
+
+def sieve_flags(limit):
+    """Return a bytearray where flags[n] == 1 iff n is prime."""
+    flags = bytearray([1]) * (limit + 1)
+    flags[:2] = b"\x00\x00"[:limit + 1]
+    for p in range(2, math.isqrt(limit) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    return flags
+
+
+def miller_rabin(n):
+    """Primality test that stays fast for 64-bit and larger n."""
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for bound, bases in MILLER_RABIN_BASES:
+        if bound is None or n < bound:
+            break
+    for a in bases:
+        a %= n
+        if a == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_perfect_square(n):
+    return n >= 0 and math.isqrt(n) ** 2 == n
+
+
+@functools.lru_cache(maxsize=4096)
+def big_clue_code(n):
+    """Clue code for numbers outside the precomputed table.
+
+    Cached because a target gets the same riddle question on every wrong guess.
+    """
+    if miller_rabin(n):
+        return PRIME
+    elif is_perfect_square(n):
+        return SQUARE
+    elif n % 5 == 0:
+        return DIV_5
+    elif n % 3 == 0:
+        return DIV_3
+    elif n % 2 == 0:
+        return EVEN
+    return ODD
+
+
+class NumberIndex:
+    def __init__(self, limit=128, divisors=DEFAULT_DIVISORS, max_limit=DEFAULT_MAX_LIMIT):
+        self.divisors = tuple(divisors)
+        self.max_limit = max_limit
+        self.limit = -1
+        self.grow(min(limit, max_limit))
+
+    def grow(self, limit):
+        """Rebuild every table to cover 0..limit."""
+        primes = sieve_flags(limit)
+
+        squares = bytearray(limit + 1)
+        for root in range(math.isqrt(limit) + 1):
+            squares[root * root] = 1
+
+        multiples = {}
+        for k in self.divisors:
+            flags = bytearray(limit + 1)
+            flags[::k] = b"\x01" * len(range(0, limit + 1, k))
+            multiples[k] = flags
+
+        # One clue code per number, written from lowest to highest priority so
+        # the final byte matches the first branch get_riddle_hint would take.
+        codes = bytearray([ODD]) * (limit + 1)
+        codes[::2] = bytes([EVEN]) * len(range(0, limit + 1, 2))
+        codes[::3] = bytes([DIV_3]) * len(range(0, limit + 1, 3))
+        codes[::5] = bytes([DIV_5]) * len(range(0, limit + 1, 5))
+        for root in range(math.isqrt(limit) + 1):
+            codes[root * root] = SQUARE
+        for n in range(2, limit + 1):
+            if primes[n]:
+                codes[n] = PRIME
+
+        self._prime_bits = pack_bits(primes)
+        self._square_bits = pack_bits(squares)
+        self._divisible_bits = {k: pack_bits(flags) for k, flags in multiples.items()}
+        self._clue_codes = codes
+        self.limit = limit
+
+    def ensure(self, n):
+        """Make sure n is covered, doubling the index if it is not.
+
+        Returns False when n is beyond max_limit and must be computed directly.
+        """
+        if n <= self.limit:
+            return True
+        if n > self.max_limit:
+            return False
+        self.grow(min(max(n, 2 * self.limit), self.max_limit))
+        return True
+
+    @instrument("is_prime")
+    def is_prime(self, n):
+        if n < 2:
+            return False
+        if n > self.limit and not self.ensure(n):
+            return miller_rabin(n)
+        return (self._prime_bits[n >> 3] >> (n & 7)) & 1 == 1
+
+    def is_square(self, n):
+        if n < 0:
+            return False
+        if n > self.limit and not self.ensure(n):
+            return is_perfect_square(n)
+        return (self._square_bits[n >> 3] >> (n & 7)) & 1 == 1
+
+    def is_divisible(self, n, k):
+        if k in self._divisible_bits and n >= 0 and (n <= self.limit or self.ensure(n)):
+            return (self._divisible_bits[k][n >> 3] >> (n & 7)) & 1 == 1
+        return n % k == 0
+
+    def clue_code(self, n):
+        if n > self.limit and not self.ensure(n):
+            return big_clue_code(n)
+        return self._clue_codes[n]
+
+    def clue_codes(self, numbers):
+        """clue_code for every number in an array, as a uint8 array of the same shape."""
+        # Imported here: only batch callers need NumPy, and the games never do.
+        import numpy as np
+        numbers = np.asarray(numbers)
+        codes = np.zeros(numbers.shape, dtype=np.uint8)
+        if numbers.size == 0:
+            return codes
+        table = numbers <= self.max_limit
+        if table.any():
+            small = numbers[table].astype(np.int64)
+            self.ensure(int(small.max()))
+            codes[table] = np.frombuffer(self._clue_codes, dtype=np.uint8)[small]
+        if not table.all():
+            big, inverse = np.unique(numbers[~table], return_inverse=True)
+            big_codes = np.array([big_clue_code(n) for n in big.tolist()], dtype=np.uint8)
+            codes[~table] = big_codes[inverse.ravel()]
+        return codes
+
+    @instrument("number_clue")
+    def number_clue(self, n):
+        """The property clue get_riddle_hint gives for n."""
+        return NUMBER_CLUES[self.clue_code(n)]
+
+    def clue_mask(self, code, limit):
+        """Bitset as an int: bit n is set for each n in 0..limit whose clue is code.
+
+        limit must be within max_limit.
+        """
+        if not self.ensure(limit):
+            raise ValueError(f"{limit} is past the index limit {self.max_limit}")
+        table = bytes(int(c == code) for c in range(256))
+        return int.from_bytes(pack_bits(self._clue_codes[:limit + 1].translate(table)), "little")
+
+
+# Shared index used by the game scripts.
+NUMBER_INDEX = NumberIndex()
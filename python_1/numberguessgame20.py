@@ -1,197 +1,316 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import font as tkfont
 import random
 import time
 
+from checkpoint import open_default
+from engine import DIFFICULTY_CHOICES, difficulty_config
+from game_flow import start_round
+from leaderboard import record_score
+from number_index import NUMBER_INDEX
+from hint_rules import TK_HINTS
+from metrics import METRICS, instrument
+from replay_log import RECORDER
+from streams import STREAMS
+from timed_input import TkCountdown
+
 # =========================
 # Game Logic
 # =========================
 class NumberGuessingGame:
-    def __init__(self, root):
+    def __init__(self, root, checkpoints=None, board=None):
+        RECORDER.source = "tk"
         self.root = root
+        self.checkpoints = checkpoints
+        # Victories go on board, or on the default leaderboard if it is None.
+        self.board = board
+        self.saved = None
         self.root.title("Number Guessing Game - Deluxe Edition")
         self.root.geometry("480x500")
         self.root.resizable(False, False)
 
         self.score = 0
         self.level = 1
-        self.attempts_left = 0
-        self.number_to_guess = 0
+        self.round = None
+        self.stream = None
         self.start_time = None
         self.difficulty = None
+        self.countdown = None
+
+        # Every screen is built once and raised when needed; level changes
+        # only update text, so no widgets or fonts are created mid-game.
+        self.title_font = tkfont.Font(family="Arial", size=20, weight="bold")
+        self.heading_font = tkfont.Font(family="Arial", size=14)
+        self.body_font = tkfont.Font(family="Arial", size=12)
+        self.entry_font = tkfont.Font(family="Arial", size=14)
+        self.hint_font = tkfont.Font(family="Arial", size=11)
+        self.banner_font = tkfont.Font(family="Arial", size=24, weight="bold")
+        self.score_font = tkfont.Font(family="Arial", size=16)
+
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+        self.welcome_frame = self.make_welcome_frame()
+        self.game_frame = self.make_game_frame()
+        self.victory_frame = self.make_victory_frame()
 
         self.build_welcome_screen()
 
     # -------------------------
     # Screen Builders
     # -------------------------
-    def clear_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
-    def build_welcome_screen(self):
-        self.clear_screen()
+    def make_frame(self):
+        frame = tk.Frame(self.root)
+        frame.grid(row=0, column=0, sticky="nsew")
+        return frame
 
-        tk.Label(self.root, text="🎯 Number Guessing Game", font=("Arial", 20, "bold")).pack(pady=20)
-        tk.Label(self.root, text="Choose Difficulty:", font=("Arial", 14)).pack(pady=10)
+    def make_welcome_frame(self):
+        frame = self.make_frame()
+        tk.Label(frame, text="🎯 Number Guessing Game", font=self.title_font).pack(pady=20)
+        tk.Label(frame, text="Choose Difficulty:", font=self.heading_font).pack(pady=10)
 
-        tk.Button(self.root, text="Easy", width=15, font=("Arial", 12),
+        tk.Button(frame, text="Easy", width=15, font=self.body_font,
                   command=lambda: self.start_game("Easy")).pack(pady=5)
-        tk.Button(self.root, text="Normal", width=15, font=("Arial", 12),
+        tk.Button(frame, text="Normal", width=15, font=self.body_font,
                   command=lambda: self.start_game("Normal")).pack(pady=5)
-        tk.Button(self.root, text="Hard", width=15, font=("Arial", 12),
+        tk.Button(frame, text="Hard", width=15, font=self.body_font,
                   command=lambda: self.start_game("Hard")).pack(pady=5)
-
-    def build_game_screen(self):
-        self.clear_screen()
-
-        tk.Label(self.root, text=f"Difficulty: {self.difficulty['name']}", font=("Arial", 14)).pack(pady=5)
-        tk.Label(self.root, text=f"Level {self.level}/{self.difficulty['levels']}", font=("Arial", 12)).pack()
-        tk.Label(self.root, text=f"Range: 1 to {self.range_max}", font=("Arial", 12)).pack()
-
-        self.attempts_label = tk.Label(self.root, text=f"Attempts Left: {self.attempts_left}", font=("Arial", 12))
+        # Shown by build_welcome_screen when there is a game to resume.
+        self.resume_button = tk.Button(frame, width=30, font=self.body_font, command=self.resume_game)
+        return frame
+
+    def make_game_frame(self):
+        frame = self.make_frame()
+        self.difficulty_label = tk.Label(frame, font=self.heading_font)
+        self.difficulty_label.pack(pady=5)
+        self.level_label = tk.Label(frame, font=self.body_font)
+        self.level_label.pack()
+        self.range_label = tk.Label(frame, font=self.body_font)
+        self.range_label.pack()
+
+        self.attempts_label = tk.Label(frame, font=self.body_font)
         self.attempts_label.pack(pady=5)
 
-        self.score_label = tk.Label(self.root, text=f"Score: {self.score}", font=("Arial", 12))
+        self.score_label = tk.Label(frame, font=self.body_font)
         self.score_label.pack()
 
-        tk.Label(self.root, text="Enter your guess:", font=("Arial", 12)).pack(pady=10)
-        self.guess_entry = tk.Entry(self.root, font=("Arial", 14), justify="center")
+        self.timer_label = tk.Label(frame, font=self.body_font, fg="darkcyan")
+        self.timer_label.pack()
+
+        tk.Label(frame, text="Enter your guess:", font=self.body_font).pack(pady=10)
+        self.guess_entry = tk.Entry(frame, font=self.entry_font, justify="center")
         self.guess_entry.pack()
-        self.guess_entry.focus()
 
-        tk.Button(self.root, text="Submit Guess", font=("Arial", 12), command=self.check_guess).pack(pady=10)
+        tk.Button(frame, text="Submit Guess", font=self.body_font, command=self.check_guess).pack(pady=10)
 
-        self.hint_label = tk.Label(self.root, text="", font=("Arial", 11), fg="blue")
+        self.hint_label = tk.Label(frame, text="", font=self.hint_font, fg="blue")
         self.hint_label.pack(pady=10)
 
-        tk.Button(self.root, text="Quit", command=self.root.quit).pack(pady=10)
+        tk.Button(frame, text="Quit", command=self.root.quit).pack(pady=10)
+        return frame
+
+    def make_victory_frame(self):
+        frame = self.make_frame()
+        tk.Label(frame, text="🏆 You Win!", font=self.banner_font, fg="green").pack(pady=30)
+        self.final_score_label = tk.Label(frame, font=self.score_font)
+        self.final_score_label.pack(pady=10)
+
+        tk.Button(frame, text="Play Again", font=self.entry_font,
+                  command=self.build_welcome_screen).pack(pady=20)
+        tk.Button(frame, text="Quit", font=self.entry_font, command=self.root.quit).pack(pady=10)
+        return frame
+
+    def build_welcome_screen(self):
+        self.saved = self.checkpoints.unfinished() if self.checkpoints is not None else None
+        if self.saved is None:
+            self.resume_button.pack_forget()
+        else:
+            name = difficulty_config(str(self.saved.difficulty))["name"]
+            self.resume_button.config(
+                text=f"Resume {name} — Level {self.saved.level}, Score {self.saved.score}")
+            self.resume_button.pack(pady=15)
+        self.welcome_frame.tkraise()
+
+    @instrument("tk_screen")
+    def build_game_screen(self):
+        self.difficulty_label.config(text=f"Difficulty: {self.difficulty['name']}")
+        self.level_label.config(text=f"Level {self.level}/{self.difficulty['levels']}")
+        self.range_label.config(text=f"Range: 1 to {self.range_max}")
+        self.attempts_label.config(text=f"Attempts Left: {self.attempts_left}")
+        self.score_label.config(text=f"Score: {self.score}")
+        self.hint_label.config(text="", fg="blue")
+        self.guess_entry.delete(0, tk.END)
+
+        self.game_frame.tkraise()
+        self.guess_entry.focus()
 
     # -------------------------
     # Game Setup
     # -------------------------
     def start_game(self, difficulty_name):
+        self.end_checkpoint()
+        self.stream = STREAMS.spawn()
+        RECORDER.start_session(self.stream)
         self.difficulty = self.get_difficulty(difficulty_name)
         self.level = 1
         self.score = 0
         self.start_level()
 
     def get_difficulty(self, name):
-        if name == "Easy":
-            return {"name": "Easy", "levels": 3, "attempts": 10, "base_range": 10, "hint_type": "direct"}
-        elif name == "Normal":
-            return {"name": "Normal", "levels": 5, "attempts": 7, "base_range": 50, "hint_type": "mixed"}
-        else:
-            return {"name": "Hard", "levels": 7, "attempts": 5, "base_range": 100, "hint_type": "riddle"}
-
-    def start_level(self):
-        self.range_max = int(self.difficulty["base_range"] * (self.level / self.difficulty["levels"])) + 5
-        self.number_to_guess = random.randint(1, self.range_max)
-        self.attempts_left = self.difficulty["attempts"]
-        self.start_time = time.time()
+        # The Tk menu has no Huge button; anything but Easy and Normal is Hard.
+        choice = DIFFICULTY_CHOICES[name] if name in ("Easy", "Normal") else "3"
+        return difficulty_config(choice, timed=False)
+
+    def resume_game(self):
+        saved, self.saved = self.saved, None
+        difficulty = difficulty_config(str(saved.difficulty), timed=False)
+        self.stream = self.checkpoints.resume(difficulty)
+        if self.stream is None:
+            self.build_welcome_screen()
+            return
+        RECORDER.start_session(self.stream)
+        self.difficulty = difficulty
+        self.level = saved.level
+        self.score = saved.score
+        self.start_level(saved)
+
+    # The current level's state lives in the engine's Round; the Tk app
+    # spends the attempt before checking the guess.
+    @property
+    def attempts_left(self):
+        return self.round.attempts_left if self.round is not None else 0
+
+    @property
+    def number_to_guess(self):
+        return self.round.target if self.round is not None else 0
+
+    @property
+    def range_max(self):
+        return self.round.level.range
+
+    def start_level(self, resume=None):
+        """Deal the next level, or continue the one in checkpoint resume."""
+        self.round, self.start_time = start_round(self.level, self.difficulty, self.stream, resume,
+                                                  TK_HINTS, spend_first=True)
+        self.save_checkpoint()
 
         self.build_game_screen()
+        self.stop_countdown()
+        # Tk levels are untimed (get_difficulty); a timed config gets a live countdown.
+        if self.round.level.timer:
+            self.countdown = TkCountdown(self.root, self.timer_label,
+                                         self.start_time + self.round.level.timer, self.time_up)
+
+    def stop_countdown(self):
+        if self.countdown is not None:
+            self.countdown.cancel()
+            self.countdown = None
+
+    # -------------------------
+    # Checkpoints
+    # -------------------------
+    def save_checkpoint(self):
+        if self.checkpoints is None:
+            return
+        self.checkpoints.save(self.stream, self.difficulty, self.level, self.number_to_guess,
+                              self.attempts_left, self.score, time.perf_counter() - self.start_time)
+
+    def end_checkpoint(self):
+        """Mark the game in play, and a saved game passed over for a new one, as ended."""
+        if self.checkpoints is None:
+            return
+        self.checkpoints.end()
+        if self.saved is not None:
+            self.checkpoints.discard()
+            self.saved = None
+
+    def time_up(self):
+        self.countdown = None
+        RECORDER.record_timeout(self.level, self.difficulty, self.number_to_guess, self.attempts_left,
+                                time.perf_counter() - self.start_time)
+        METRICS.count("timeout")
+        self.restart("⏰ Time’s up! Restarting from Level 1.")
+
+    def restart(self, message):
+        self.start_game(self.difficulty["name"])
+        self.hint_label.config(text=message, fg="red")
 
     # -------------------------
     # Hint System
     # -------------------------
     def is_prime(self, n):
-        if n < 2:
-            return False
-        for i in range(2, int(n ** 0.5) + 1):
-            if n % i == 0:
-                return False
-        return True
-
-    def get_riddle_hint(self, number):
-        clues = []
-        if self.is_prime(number):
-            clues.append("It’s a prime number.")
-        elif int(number ** 0.5) ** 2 == number:
-            clues.append("It’s a perfect square.")
-        elif number % 5 == 0:
-            clues.append("It’s divisible by 5.")
-        elif number % 3 == 0:
-            clues.append("It’s divisible by 3.")
-        elif number % 2 == 0:
-            clues.append("It’s an even number.")
-        else:
-            clues.append("It’s an odd number.")
+        return NUMBER_INDEX.is_prime(n)
 
-        if number > 50:
-            clues.append("It’s greater than 50.")
-        else:
-            clues.append("It’s 50 or less.")
+    def get_riddle_clues(self, number):
+        return list(TK_HINTS.clues(number, self.round.level.upper))
 
-        return random.choice(clues)
+    def get_riddle_hint(self, number):
+        return random.choice(TK_HINTS.clues(number, self.round.level.upper))
 
     def get_adaptive_hint(self, guess, target):
-        diff = abs(guess - target)
-        if diff == 0:
-            return "🎯 Spot on!"
-        elif diff <= 3:
-            return "🔥 Super hot!"
-        elif diff <= 10:
-            return "🌡️ Getting warm."
-        elif diff <= 20:
-            return "❄️ A bit chilly."
-        else:
-            return "🥶 Freezing cold."
+        return TK_HINTS.band_text(guess, target)
 
     # -------------------------
     # Game Logic
     # -------------------------
+    @instrument("tk_guess")
     def check_guess(self):
         guess_text = self.guess_entry.get().strip()
         if not guess_text.isdigit():
-            messagebox.showwarning("Invalid Input", "Please enter a valid number.")
+            self.hint_label.config(text="Please enter a valid number.", fg="red")
             return
 
         guess = int(guess_text)
-        self.attempts_left -= 1
+        seconds = time.perf_counter() - self.start_time
+        if self.round.timed_out(seconds):
+            # Submitted before the countdown's last tick was handled.
+            self.stop_countdown()
+            self.time_up()
+            return
+        outcome = self.round.guess(guess, seconds)
         self.attempts_label.config(text=f"Attempts Left: {self.attempts_left}")
 
-        if guess == self.number_to_guess:
-            elapsed = int(time.time() - self.start_time)
-            time_bonus = max(0, 10 - elapsed)
-            gained = (self.attempts_left * 10) + (self.level * 5) + time_bonus
+        if outcome.cleared:
+            RECORDER.record(self.level, self.difficulty, self.number_to_guess, guess,
+                            self.attempts_left, seconds)
+            gained = outcome.gained
             self.score += gained
+            METRICS.observe("level", seconds)
+            METRICS.count("level_cleared")
+            METRICS.count("points", gained)
 
-            messagebox.showinfo("Correct!", f"🎉 You cleared Level {self.level}!\n"
-                                            f"You earned {gained} points.\n"
-                                            f"Total Score: {self.score}")
+            message = f"🎉 You cleared Level {self.level}! You earned {gained} points."
             self.level += 1
             if self.level > self.difficulty["levels"]:
                 self.show_victory_screen()
             else:
                 self.start_level()
+                self.hint_label.config(text=message, fg="green")
             return
 
-        # Give adaptive hint
-        hint = self.get_adaptive_hint(guess, self.number_to_guess)
-
-        # Apply hint type logic
-        if self.difficulty["hint_type"] == "direct":
-            hint += " (Higher)" if guess < self.number_to_guess else " (Lower)"
-        elif self.difficulty["hint_type"] == "mixed" and self.attempts_left % 2 == 0:
-            hint += " (Hint: Higher)" if guess < self.number_to_guess else " (Hint: Lower)"
-        elif self.difficulty["hint_type"] == "riddle":
-            hint = self.get_riddle_hint(self.number_to_guess)
+        # Adaptive hint plus the hint type's direction, or a riddle clue in its place
+        feedback = outcome.feedback
+        hint = feedback.clue_text or feedback.band_text + (feedback.direction_text or "")
+        RECORDER.record(self.level, self.difficulty, self.number_to_guess, guess, self.attempts_left,
+                        seconds, feedback.direction, feedback.clue)
 
-        self.hint_label.config(text=hint)
+        self.hint_label.config(text=hint, fg="blue")
 
-        if self.attempts_left <= 0:
-            messagebox.showerror("Game Over", "💀 Out of attempts! Restarting from Level 1.")
-            self.start_game(self.difficulty["name"])
+        if outcome.lost:
+            METRICS.count("level_lost")
+            self.restart("💀 Out of attempts! Restarting from Level 1.")
+        else:
+            self.save_checkpoint()
 
     def show_victory_screen(self):
-        self.clear_screen()
-        tk.Label(self.root, text="🏆 You Win!", font=("Arial", 24, "bold"), fg="green").pack(pady=30)
-        tk.Label(self.root, text=f"Final Score: {self.score}", font=("Arial", 16)).pack(pady=10)
-
-        tk.Button(self.root, text="Play Again", font=("Arial", 14),
-                  command=self.build_welcome_screen).pack(pady=20)
-        tk.Button(self.root, text="Quit", font=("Arial", 14), command=self.root.quit).pack(pady=10)
+        self.stop_countdown()
+        self.end_checkpoint()
+        self.stream = None
+        rank = record_score(self.difficulty["name"], self.score, board=self.board)
+        text = f"Final Score: {self.score}"
+        if rank is not None:
+            text += f"\nLeaderboard rank on {self.difficulty['name']}: #{rank}"
+        self.final_score_label.config(text=text)
+        self.victory_frame.tkraise()
 
 
 # =========================
@@ -199,5 +318,10 @@ class NumberGuessingGame:
 # =========================
 if __name__ == "__main__":
     root = tk.Tk()
-    app = NumberGuessingGame(root)
-    root.mainloop()
+    checkpoints = open_default("tk")
+    app = NumberGuessingGame(root, checkpoints)
+    try:
+        root.mainloop()
+    finally:
+        if checkpoints is not None:
+            checkpoints.close()
@@ -2,15 +2,26 @@ import random
 import sys
 import time
 
+import game_flow
+from checkpoint import open_default
+from engine import difficulty_config
+from game_flow import start_round
+from hint_rules import HINTS
+from metrics import METRICS
+from number_index import NUMBER_INDEX
+from renderer import RENDERER
+from replay_log import RECORDER
+from streams import STREAMS
+
 # ================================
 # Utility Functions
 # ================================
 def slow_print(text, delay=0.03):
-    """Print text slowly for dramatic effect."""
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
+    """Print text slowly for dramatic effect.
+
+    The renderer buffers it and types it out when the game next waits for input.
+    """
+    RENDERER.type(text, delay)
 
 
 def get_ascii_banner():
@@ -37,180 +48,135 @@ __     ______  _    _   _      ____   _    _   _
 """
 
 
+def get_welcome_screen():
+    """Banner, greeting and difficulty menu, shown at once before the first prompt."""
+    return "\n".join([
+        get_ascii_banner(),
+        "🎯 Welcome to the Number Guessing Game — Deluxe Edition!\n",
+        "\nSelect a difficulty:",
+        "1. Easy",
+        "2. Normal",
+        "3. Hard",
+        "4. Huge (targets up to 10^18)",
+    ])
+
+
 # ================================
 # Riddle and Hint System
 # ================================
 def is_prime(n):
-    if n < 2:
-        return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
-            return False
-    return True
+    return NUMBER_INDEX.is_prime(n)
+
 
+def get_riddle_clues(number, upper=100):
+    """Every clue get_riddle_hint may give for number.
 
-def get_riddle_hint(number):
+    Range clues are relative to upper, the top of the difficulty's range.
+    """
+    return list(HINTS.clues(number, upper))
+
+
+def get_riddle_hint(number, upper=100):
     """Enhanced riddle-style hints for Hard mode."""
-    clues = []
-
-    if is_prime(number):
-        clues.append("It’s a prime number.")
-    elif int(number ** 0.5) ** 2 == number:
-        clues.append("It’s a perfect square.")
-    elif number % 5 == 0:
-        clues.append("It’s divisible by 5.")
-    elif number % 3 == 0:
-        clues.append("It’s divisible by 3.")
-    elif number % 2 == 0:
-        clues.append("It’s an even number.")
-    else:
-        clues.append("It’s an odd number.")
-
-    if number > 50:
-        clues.append("It’s greater than 50.")
-    else:
-        clues.append("It’s 50 or less.")
-
-    if number < 10:
-        clues.append("It’s a single-digit number.")
-    elif number >= 90:
-        clues.append("It’s close to 100.")
-
-    return random.choice(clues)
+    return random.choice(HINTS.clues(number, upper))
 
 
 def get_adaptive_hint(guess, target):
     """Give adaptive hot/cold hints based on distance."""
-    diff = abs(guess - target)
-    if diff == 0:
-        return "🎯 Spot on!"
-    elif diff <= 3:
-        return "🔥 Super hot!"
-    elif diff <= 10:
-        return "🌡️ Getting warm."
-    elif diff <= 20:
-        return "❄️ A bit chilly."
-    else:
-        return "🥶 Freezing cold."
+    return HINTS.band_text(guess, target)
 
 
 # ================================
 # Difficulty and Game Logic
 # ================================
-def select_difficulty():
-    slow_print("\nSelect a difficulty:")
-    slow_print("1. Easy")
-    slow_print("2. Normal")
-    slow_print("3. Hard")
-
-    while True:
-        choice = input("Enter 1, 2, or 3: ").strip()
-        if choice in ["1", "2", "3"]:
-            return choice
-        print("Invalid input. Please enter 1, 2, or 3.")
-
-
-def setup_difficulty(choice):
-    """Configure difficulty settings."""
-    if choice == "1":
-        return {
-            "name": "Easy",
-            "levels": 3,
-            "attempts": 10,
-            "base_range": 10,
-            "hint_type": "direct"
-        }
-    elif choice == "2":
-        return {
-            "name": "Normal",
-            "levels": 5,
-            "attempts": 7,
-            "base_range": 50,
-            "hint_type": "mixed"
-        }
-    else:
-        return {
-            "name": "Hard",
-            "levels": 7,
-            "attempts": 5,
-            "base_range": 100,
-            "hint_type": "riddle"
-        }
-
-
-def play_level(level, difficulty, score):
-    """Play a single level and return (success, new_score)."""
-    level_range = int(difficulty["base_range"] * (level / difficulty["levels"])) + 5
-    number_to_guess = random.randint(1, level_range)
-    attempts_left = difficulty["attempts"]
-    start_time = time.time()
-
-    slow_print(f"\nLevel {level} — Range: 1 to {level_range}")
-    slow_print(f"You have {attempts_left} attempts!")
-
-    while attempts_left > 0:
+def setup_difficulty(choice, base_range=None):
+    """Configure difficulty settings.
+
+    base_range overrides the chosen mode's range, e.g. for big-range play.
+    """
+    return difficulty_config(choice, base_range, timed=False)
+
+
+def play_level(level, difficulty, score, ask=RENDERER.ask, stream=None, resume=None, save=None):
+    """Play a single level and return (success, new_score).
+
+    stream is the game's SessionStream; without one the level gets a fresh stream.
+    resume is a Checkpoint of this level to continue from. save(game_round,
+    score, seconds) is called once the level starts and after every miss.
+    """
+    stream = STREAMS.spawn() if stream is None else stream
+    game_round, start_time = start_round(level, difficulty, stream, resume)
+
+    slow_print(f"\nLevel {level} — Range: 1 to {game_round.level.range}")
+    slow_print(f"You have {game_round.attempts_left} attempts!")
+    if save is not None:
+        save(game_round, score, time.perf_counter() - start_time)
+
+    while game_round.attempts_left > 0:
         try:
-            guess = int(input("Enter your guess: "))
+            guess = int(ask("Enter your guess: "))
         except ValueError:
-            print("Please enter a valid number.")
+            RENDERER.show("Please enter a valid number.")
             continue
 
-        if guess == number_to_guess:
-            elapsed = int(time.time() - start_time)
-            time_bonus = max(0, 10 - elapsed)
-            gained = (attempts_left * 10) + (level * 5) + time_bonus
-            score += gained
+        seconds = time.perf_counter() - start_time
+        outcome = game_round.guess(guess, seconds)
+        if outcome.cleared:
+            RECORDER.record(level, difficulty, game_round.target, guess, game_round.attempts_left, seconds)
+            score += outcome.gained
+            METRICS.observe("level", seconds)
+            METRICS.count("level_cleared")
+            METRICS.count("points", outcome.gained)
 
             slow_print(f"🎉 Correct! You cleared Level {level}!")
-            slow_print(f"🏅 You earned {gained} points (Total: {score})")
+            slow_print(f"🏅 You earned {outcome.gained} points (Total: {score})")
             return True, score
 
-        attempts_left -= 1
-        print(get_adaptive_hint(guess, number_to_guess))
+        feedback = outcome.feedback
+        for line in feedback.lines():
+            RENDERER.show(line)
+        RECORDER.record(level, difficulty, game_round.target, guess, game_round.attempts_left,
+                        seconds, feedback.direction, feedback.clue)
 
-        if difficulty["hint_type"] == "direct":
-            if guess < number_to_guess:
-                print("Too low! Try higher.")
-            else:
-                print("Too high! Try lower.")
-        elif difficulty["hint_type"] == "mixed" and attempts_left % 2 == 0:
-            if guess < number_to_guess:
-                print("Hint: The number is higher.")
-            else:
-                print("Hint: The number is lower.")
-        elif difficulty["hint_type"] == "riddle":
-            print(get_riddle_hint(number_to_guess))
-
-        print(f"Attempts left: {attempts_left}")
+        RENDERER.show(f"Attempts left: {game_round.attempts_left}")
+        if save is not None:
+            save(game_round, score, seconds)
 
+    METRICS.count("level_lost")
     slow_print("\n💀 Out of attempts! Game over.")
     return False, score
 
 
-def play_game():
-    """Main game loop."""
-    print(get_ascii_banner())
-    slow_print("🎯 Welcome to the Number Guessing Game — Deluxe Edition!\n")
+class GameFlow(game_flow.GameFlow):
+    """The shared game flow (game_flow.py) with this CLI's screens and prompts."""
+
+    setup_difficulty = staticmethod(setup_difficulty)
+    play_level = staticmethod(play_level)
 
-    difficulty_choice = select_difficulty()
-    difficulty = setup_difficulty(difficulty_choice)
+    def welcome_screen(self):
+        return get_welcome_screen()
 
-    slow_print(f"\nYou selected {difficulty['name']} mode.")
-    slow_print("Let's begin!\n")
+    def victory_banner(self):
+        return get_victory_banner()
 
-    score = 0
+    def say(self, text, colour=None):
+        slow_print(text)
 
-    for level in range(1, difficulty["levels"] + 1):
-        success, score = play_level(level, difficulty, score)
-        if not success:
-            slow_print("Restarting from Level 1...")
-            return play_game()
 
-    slow_print(get_victory_banner())
-    slow_print(f"🏆 Final Score: {score}")
-    slow_print("Thanks for playing!\n")
+def play_game():
+    """Main game loop."""
+    checkpoints = open_default("cli")
+    try:
+        GameFlow(checkpoints=checkpoints).run()
+    finally:
+        if checkpoints is not None:
+            checkpoints.close()
     sys.exit()
 
 
 if __name__ == "__main__":
+    # --batch [file] plays scripted JSON-lines sessions instead (see batch.py).
+    if sys.argv[1:2] == ["--batch"]:
+        import batch
+        sys.exit(batch.main(sys.argv[2:]))
     play_game()
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+
+from engine import level_info
+from hint_rules import HINTS
+from numberguessinggamepython import setup_difficulty
+from solver import Solver
+
+# ================================
+# Par Score Tables
+# ================================
+# Exact win probabilities and expected level scores for every (difficulty,
+# level), under optimal play and under a random player who guesses uniformly
+# among the targets still possible. Level score follows play_level:
+# attempts_left * 10 + level * 5 + time_bonus, where attempts_left is counted
+# before the winning guess is deducted. Time bonus depends on how fast a human
+# types, so tables are built with a fixed assumed bonus (0 by default).
+#
+# Huge ranges are far too big to enumerate. Direct hints show higher/lower
+# after every miss, so the targets still possible are always a run of
+# consecutive numbers and a state is just (run length, attempts left);
+# RangeSolver searches that instead. Runs up to SEARCH_LIMIT long try every
+# guess, longer ones only the SEARCH_WINDOW guesses below the middle (mirror
+# images score the same). That matched the full search on every run up to 600
+# long. The random player is not computed for such ranges; its entry is null.
+#
+# Building takes seconds; the result is stored as JSON next to this file and
+# loaded at startup instead.
+
+PAR_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "par_table.json")
+DIFFICULTY_CHOICES = ("1", "2", "3", "4")
+SEARCH_LIMIT = 128
+SEARCH_WINDOW = 32
+
+
+class ScoreSolver(Solver):
+    """Solver whose second value is expected level score instead of attempts."""
+
+    def __init__(self, hint_type, attempts, upper, win_bonus, policy="optimal"):
+        super().__init__(hint_type, attempts, upper)
+        self.win_bonus = win_bonus
+        self.policy = policy
+
+    def _search(self, candidates, attempts_left):
+        weights = {t: self.weight(t, attempts_left) for t in candidates}
+        total = sum(weights.values())
+        hit_points = attempts_left * 10 + self.win_bonus
+
+        results = []
+        for guess in candidates:
+            p_win = weights[guess] / total
+            points = p_win * hit_points
+            if attempts_left > 1:
+                for mass, members in self.outcomes(guess, candidates, attempts_left).values():
+                    share = mass / total
+                    child_p, child_points, _ = self.value(tuple(members), attempts_left - 1)
+                    p_win += share * child_p
+                    points += share * child_points
+            results.append((p_win, points, guess))
+
+        if self.policy == "random":
+            n = len(results)
+            return sum(r[0] for r in results) / n, sum(r[1] for r in results) / n, None
+        return max(results, key=lambda r: r[1])
+
+
+class RangeSolver:
+    """Optimal expected level score for direct hints, keyed by run length."""
+
+    def __init__(self, attempts, win_bonus):
+        self.attempts = attempts
+        self.win_bonus = win_bonus
+        self._memo = {}
+
+    @staticmethod
+    def pieces(side):
+        """Lengths of the runs one side of a guess splits into, by hot/cold band."""
+        runs, start = [], 0
+        for limit in HINTS.band_limits[1:]:
+            if side > start:
+                runs.append(min(side, limit) - start)
+            start = limit
+        if side > start:
+            runs.append(side - start)
+        return runs
+
+    def _try(self, length, attempts_left, below):
+        """(win probability, expected points) guessing with below targets under the guess."""
+        p_win = 1 / length
+        points = p_win * (attempts_left * 10 + self.win_bonus)
+        if attempts_left > 1:
+            for run in self.pieces(below) + self.pieces(length - 1 - below):
+                share = run / length
+                child_p, child_points = self.value(run, attempts_left - 1)
+                p_win += share * child_p
+                points += share * child_points
+        return p_win, points
+
+    def value(self, length, attempts_left):
+        """Return (win_probability, expected_points) for a run of length targets."""
+        if length <= 0 or attempts_left <= 0:
+            return 0.0, 0.0
+        found = self._memo.get((length, attempts_left))
+        if found is None:
+            middle = (length - 1) // 2
+            low = 0 if length <= SEARCH_LIMIT else max(0, middle - SEARCH_WINDOW)
+            p_win, points = max((self._try(length, attempts_left, below) for below in range(low, middle + 1)),
+                                key=lambda r: r[1])
+            # Summing shares can round a certain win to just over 1.
+            found = min(1.0, p_win), points
+            self._memo[(length, attempts_left)] = found
+        return found
+
+
+def level_entry(difficulty, level, time_bonus=0):
+    level_range = level_info(difficulty, level).range
+    entry = {"level": level, "range": level_range}
+    if level_range > SEARCH_LIMIT:
+        if difficulty["hint_type"] != "direct":
+            raise ValueError(f"range {level_range} is too big to search with {difficulty['hint_type']} hints")
+        solver = RangeSolver(difficulty["attempts"], level * 5 + time_bonus)
+        p_win, points = solver.value(level_range, difficulty["attempts"])
+        entry["optimal"] = {"win_probability": p_win, "expected_score": points}
+        entry["random"] = None
+        return entry
+
+    candidates = tuple(range(1, level_range + 1))
+    for policy in ("optimal", "random"):
+        solver = ScoreSolver(difficulty["hint_type"], difficulty["attempts"],
+                             difficulty["base_range"], level * 5 + time_bonus, policy)
+        p_win, points, _ = solver.value(candidates, difficulty["attempts"])
+        entry[policy] = {"win_probability": p_win, "expected_score": points}
+    return entry
+
+
+def build_table(time_bonus=0):
+    """Compute the full table; slow, meant for regenerating the JSON file."""
+    table = {"time_bonus": time_bonus, "difficulties": {}}
+    for choice in DIFFICULTY_CHOICES:
+        difficulty = setup_difficulty(choice)
+        levels = [level_entry(difficulty, level, time_bonus)
+                  for level in range(1, difficulty["levels"] + 1)]
+        table["difficulties"][difficulty["name"]] = {
+            "attempts": difficulty["attempts"],
+            "hint_type": difficulty["hint_type"],
+            "levels": levels,
+        }
+    return table
+
+
+def write_table(table, path=PAR_TABLE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=1)
+        f.write("\n")
+
+
+_loaded = {}
+
+
+def load_table(path=PAR_TABLE_PATH):
+    """Load the precomputed table once per process."""
+    if path not in _loaded:
+        with open(path, encoding="utf-8") as f:
+            _loaded[path] = json.load(f)
+    return _loaded[path]
+
+
+def level_par(difficulty_name, level, table=None):
+    """Expected score for clearing one level with optimal play."""
+    table = table or load_table()
+    entry = table["difficulties"][difficulty_name]["levels"][level - 1]["optimal"]
+    if not entry["win_probability"]:
+        return 0.0
+    return entry["expected_score"] / entry["win_probability"]
+
+
+def run_par(difficulty_name, table=None):
+    """Expected final score of a winning run with optimal play."""
+    table = table or load_table()
+    levels = table["difficulties"][difficulty_name]["levels"]
+    return sum(level_par(difficulty_name, row["level"], table) for row in levels)
+
+
+def normalize_score(score, difficulty_name, table=None):
+    """Final score as a fraction of par, comparable across difficulties."""
+    return score / run_par(difficulty_name, table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or show the par score table.")
+    parser.add_argument("--build", action="store_true",
+                        help="Recompute the table and write par_table.json.")
+    parser.add_argument("--time-bonus", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.build:
+        table = build_table(args.time_bonus)
+        write_table(table)
+    else:
+        table = load_table()
+
+    for name, info in table["difficulties"].items():
+        print(f"{name} (par {run_par(name, table):.1f})")
+        for row in info["levels"]:
+            best, rand = row["optimal"], row["random"]
+            random_text = ("not computed" if rand is None else
+                           f"win {rand['win_probability']:.2%} score {rand['expected_score']:.1f}")
+            print(f"  Level {row['level']} (1 to {row['range']}): "
+                  f"optimal win {best['win_probability']:.2%} score {best['expected_score']:.1f} | "
+                  f"random {random_text}")
+
+
+if __name__ == "__main__":
+    main()
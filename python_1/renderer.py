@@ -0,0 +1,233 @@
+import atexit
+import os
+import re
+import sys
+import time
+
+from metrics import instrument
+from timed_input import read_line
+
+try:
+    import select
+except ImportError:
+    select = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# ================================
+# Typewriter Renderer
+# ================================
+# All game output goes through one ordered buffer instead of straight to
+# stdout. Nothing is written until the game needs the player, at ask(), or
+# the buffer fills up, or the process exits. Then:
+#   - "instant" writes everything with one write and one flush.
+#   - "typewriter" and "fast" animate the typed segments frame by frame. Each
+#     frame is one write of every character that is due, not one write per
+#     character. Between frames the renderer polls stdin, and a keypress
+#     (in a normal terminal, the player pressing Enter) dumps the rest at once
+#     so their input is read immediately.
+# The mode comes from the GUESS_RENDER environment variable. It defaults to
+# instant when stdout is not a terminal, so scripted, CI and remote runs never
+# sleep.
+
+MODES = ("typewriter", "fast", "instant")
+FAST_FACTOR = 0.1
+FRAME = 1 / 30
+MAX_PENDING = 64 * 1024
+ANSI = re.compile(r"(\x1b\[[0-9;]*m)")
+RESET = "\x1b[0m"
+
+
+def default_mode():
+    mode = os.environ.get("GUESS_RENDER", "").lower()
+    if mode in MODES:
+        return mode
+    try:
+        return "typewriter" if sys.stdout.isatty() else "instant"
+    except (AttributeError, ValueError):
+        return "instant"
+
+
+class Renderer:
+    def __init__(self, mode=None, stream=None, stdin=None):
+        self.mode = mode or default_mode()
+        self.stream = stream
+        self.stdin = stdin
+        self._pending = []
+        self._pending_size = 0
+        self.writes = 0
+
+    def _out(self):
+        return self.stream or sys.stdout
+
+    # -------------------------
+    # Queueing
+    # -------------------------
+    def show(self, text="", end="\n"):
+        """Queue text that appears all at once, like print()."""
+        self._queue(str(text) + end, 0.0)
+
+    def type(self, text, delay=0.03, end="\n"):
+        """Queue text that is typed out at delay seconds per character."""
+        self._queue(str(text) + end, delay)
+
+    def _queue(self, text, delay):
+        if "\x1b[" in text and not text.endswith(RESET):
+            # Colour lasts for one print, as with colorama's autoreset.
+            text += RESET
+        self._pending.append((text, delay))
+        self._pending_size += len(text)
+        if self._pending_size > MAX_PENDING:
+            self.flush()
+
+    # -------------------------
+    # Output
+    # -------------------------
+    def ask(self, prompt="", deadline=None):
+        """Render pending output plus prompt, then read a line like input().
+
+        With a deadline (a time.perf_counter() value) the prompt shows a live
+        countdown and timed_input.InputTimeout is raised when it runs out.
+        """
+        if deadline is None:
+            self._queue(prompt, 0.0)
+        self.flush()
+        return self._read(prompt, deadline)
+
+    @instrument("input_wait")
+    def _read(self, prompt, deadline):
+        # Timed on its own, after the flush, so input_wait holds no render time.
+        if deadline is not None:
+            return read_line(prompt, deadline, self._out(), self.stdin)
+        if self.stdin is None:
+            return input()
+        line = self.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip("\n")
+
+    @instrument("render")
+    def flush(self):
+        pending, self._pending, self._pending_size = self._pending, [], 0
+        if self.mode == "instant":
+            self._write("".join(text for text, _ in pending))
+            return
+
+        scale = FAST_FACTOR if self.mode == "fast" else 1.0
+        skipped = False
+        for text, delay in pending:
+            if skipped or delay <= 0:
+                self._write(text)
+                continue
+            if self._animate(text, delay * scale):
+                skipped = True
+        if skipped:
+            self._write(RESET)
+
+    def _animate(self, text, delay):
+        """Type text out; return True if the player skipped the animation."""
+        tokens = [t for t in ANSI.split(text) if t]
+        chars = []
+        for token in tokens:
+            chars.extend([token] if ANSI.fullmatch(token) else token)
+
+        style = ""
+        shown = 0
+        start = time.monotonic()
+        while shown < len(chars):
+            due = min(len(chars), int((time.monotonic() - start) / delay) + 1)
+            if due > shown:
+                chunk = "".join(chars[shown:due])
+                # Re-send the active colour so autoreset streams keep it per frame.
+                self._write(style + chunk)
+                for token in chars[shown:due]:
+                    if ANSI.fullmatch(token):
+                        style = "" if token == RESET else style + token
+                shown = due
+            if shown < len(chars) and self._key_pressed(min(FRAME, delay * (len(chars) - shown))):
+                self._write(style + "".join(chars[shown:]))
+                return True
+        return False
+
+    def _key_pressed(self, timeout):
+        """Wait up to timeout seconds; return True as soon as input is waiting."""
+        stdin = self.stdin or sys.stdin
+        if msvcrt is not None and stdin is sys.stdin:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    return True
+                time.sleep(0.005)
+            return False
+        if select is not None:
+            try:
+                ready, _, _ = select.select([stdin], [], [], timeout)
+                return bool(ready)
+            except (OSError, ValueError, TypeError):
+                pass
+        time.sleep(timeout)
+        return False
+
+    def _write(self, text):
+        if not text:
+            return
+        out = self._out()
+        out.write(text)
+        out.flush()
+        self.writes += 1
+
+    def close(self):
+        if self._pending:
+            self.flush()
+
+
+RENDERER = Renderer()
+atexit.register(RENDERER.close)
+
+
+# ================================
+# Banner Cache
+# ================================
+# Pre-rendered screens are kept as text files, keyed by name and by the
+# modification time of the script that draws them, so editing the art
+# invalidates them. A cached screen needs nothing imported to show it, which
+# keeps colour libraries off the path to the first prompt. The directory is
+# $GUESS_CACHE_DIR, else ~/.cache/number-guess. If it cannot be written, the
+# screen is simply rendered each time.
+
+def cache_dir():
+    return os.environ.get("GUESS_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "number-guess")
+
+
+def cached_banner(name, render, source):
+    """render()'s text, from the cache when source has not changed since it was stored."""
+    directory = cache_dir()
+    try:
+        stamp = os.stat(source).st_mtime_ns
+    except OSError:
+        return render()
+    path = os.path.join(directory, f"{name}-{stamp}.txt")
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    text = render()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for stale in os.listdir(directory):
+            if stale.startswith(name + "-"):
+                os.remove(os.path.join(directory, stale))
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+    return text
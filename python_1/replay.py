@@ -0,0 +1,269 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from hint_rules import HINTS
+from engine import level_info, level_score, level_table
+from numberguessinggamepython import get_adaptive_hint, get_riddle_clues, setup_difficulty
+from replay_log import (BAND_LIMITS, DIFFICULTY_IDS, HEADER, HIGHER, LOWER, MAGIC, NO_CLUE,
+                        NO_DIRECTION, RECORD, SEED, SOURCES, TIMEOUT, VERSION, band_code)
+from streams import SessionStream, seed_tag
+
+# ================================
+# Replay Reader and Analytics
+# ================================
+# Reads the guess logs written by replay_log.py. open_records memory-maps a
+# file as a NumPy structured array, so analysis reads columns straight from
+# the page cache without parsing or copying. summary and verify work through
+# the file in fixed-size chunks, so memory use does not depend on file size.
+#
+# replay_session rebuilds the text a player saw, hint by hint, and the score,
+# from the records alone. It checks each record against the game rules on the
+# way, so a corrupt or mismatched log fails loudly instead of replaying wrongly.
+# For a disputed score, verify also regenerates each session's targets from
+# the root seed it was played with, as logged in the file's SEED records (or
+# given with --seed), and counts the sessions whose recorded targets differ.
+#
+#   python3 replay.py summary guesses.bin
+#   python3 replay.py verify guesses.bin --seed 42
+#   python3 replay.py sessions guesses.bin
+#   python3 replay.py show guesses.bin --session 123456789
+
+RECORD_DTYPE = np.dtype([
+    ("target", "<u8"), ("guess", "<i8"), ("session", "<u8"), ("elapsed", "<f8"),
+    ("level", "u1"), ("difficulty", "u1"), ("attempts_left", "u1"), ("band", "u1"),
+    ("direction", "u1"), ("clue", "u1"), ("source", "u1"), ("event", "u1"),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+CHUNK_ROWS = 1 << 22
+DIFFICULTY_NAMES = {code: name for name, code in DIFFICULTY_IDS.items()}
+
+
+def open_records(path):
+    """Memory-map a guess log as a read-only structured array."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: not a guess log (too short)")
+    magic, record_size, version = HEADER.unpack(header)
+    if magic != MAGIC or record_size != RECORD.size or version != VERSION:
+        raise ValueError(f"{path}: unsupported guess log (magic {magic!r}, version {version})")
+    # A record still being written at the end is ignored.
+    count = (size - HEADER.size) // RECORD.size
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+
+
+def chunks(records, rows=CHUNK_ROWS):
+    """The guess and timeout records in slices of at most rows; SEED records are left out."""
+    for start in range(0, len(records), rows):
+        chunk = records[start:start + rows]
+        seeds = chunk["event"] == SEED
+        yield chunk[~seeds] if seeds.any() else chunk
+
+
+def logged_seeds(records):
+    """The root seeds named by the log's SEED records."""
+    seeds = set()
+    for start in range(0, len(records), CHUNK_ROWS):
+        chunk = records[start:start + CHUNK_ROWS]
+        seeds.update(chunk["target"][chunk["event"] == SEED].tolist())
+    return sorted(seeds)
+
+
+def session_records(records, session):
+    """The records of one session, in the order they were played."""
+    rows = np.concatenate([chunk[chunk["session"] == session] for chunk in chunks(records)]
+                          or [np.zeros(0, dtype=RECORD_DTYPE)])
+    if len(rows) == 0:
+        raise KeyError(session)
+    return rows
+
+
+def session_ids(records):
+    seen = set()
+    for chunk in chunks(records):
+        seen.update(np.unique(chunk["session"]).tolist())
+    return sorted(seen)
+
+
+# ================================
+# Replay
+# ================================
+def replay_session(rows):
+    """Rebuild what the player saw; return (lines, final_score)."""
+    lines = []
+    score = 0
+    level = None
+    for row in rows:
+        difficulty = setup_difficulty(str(int(row["difficulty"])))
+        target = int(row["target"])
+        guess = int(row["guess"])
+        attempts_left = int(row["attempts_left"])
+        if int(row["level"]) != level:
+            level = int(row["level"])
+            lines.append(f"Level {level} — Range: 1 to {level_info(difficulty, level).range} "
+                         f"({difficulty['name']})")
+        if row["event"] == TIMEOUT:
+            lines.append(f"⏰ Time’s up after {float(row['elapsed']):.1f}s!")
+            continue
+        lines.append(f"> {guess}")
+
+        where = f"session {int(row['session'])} level {level} guess {guess}"
+        if band_code(guess, target) != row["band"]:
+            raise ValueError(f"{where}: recorded hot/cold hint does not match target {target}")
+        if guess == target:
+            gained = level_score(attempts_left, level, row["elapsed"])
+            score += gained
+            lines.append(f"🎉 Correct! You cleared Level {level}!")
+            lines.append(f"🏅 You earned {gained} points (Total: {score})")
+            continue
+
+        lines.append(get_adaptive_hint(guess, target))
+        direction = int(row["direction"])
+        if direction != NO_DIRECTION:
+            if (direction == HIGHER) != (guess < target):
+                raise ValueError(f"{where}: recorded direction is wrong for target {target}")
+            lines.append(HINTS.direction_text(difficulty["hint_type"], direction))
+        clue = int(row["clue"])
+        if clue != NO_CLUE:
+            clues = get_riddle_clues(target, difficulty["base_range"])
+            if clue >= len(clues):
+                raise ValueError(f"{where}: riddle clue {clue} does not exist for target {target}")
+            lines.append(clues[clue])
+        lines.append(f"Attempts left: {attempts_left}")
+    return lines, score
+
+
+# ================================
+# Analytics
+# ================================
+def summary(records):
+    """Per-difficulty guess counts, solve rate, mean time and hot/cold band shares."""
+    slots = max(DIFFICULTY_IDS.values()) + 1
+    guesses = np.zeros(slots, dtype=np.int64)
+    correct = np.zeros(slots, dtype=np.int64)
+    elapsed = np.zeros(slots)
+    bands = np.zeros((slots, len(BAND_LIMITS) + 1), dtype=np.int64)
+    sources = np.zeros(len(SOURCES), dtype=np.int64)
+    for chunk in chunks(records):
+        difficulty = chunk["difficulty"]
+        guesses += np.bincount(difficulty, minlength=slots)
+        correct += np.bincount(difficulty, weights=chunk["band"] == 0, minlength=slots).astype(np.int64)
+        elapsed += np.bincount(difficulty, weights=chunk["elapsed"], minlength=slots)
+        bands += np.bincount(difficulty.astype(np.int64) * bands.shape[1] + chunk["band"],
+                             minlength=bands.size).reshape(bands.shape)
+        sources += np.bincount(chunk["source"], minlength=len(SOURCES))[:len(SOURCES)]
+    return {"guesses": guesses, "correct": correct, "elapsed": elapsed, "bands": bands,
+            "sources": sources}
+
+
+def verify(records):
+    """Count records whose hints disagree with their target and guess."""
+    bad = 0
+    for chunk in chunks(records):
+        guess = chunk["guess"]
+        target = chunk["target"].astype(np.int64)
+        band_ok = HINTS.bands(guess, target) == chunk["band"]
+        direction = chunk["direction"]
+        direction_ok = ((direction == NO_DIRECTION) | ((direction == HIGHER) & (guess < target))
+                        | ((direction == LOWER) & (guess > target)))
+        bad += int(np.count_nonzero(~(band_ok & direction_ok)))
+    return bad
+
+
+def audit_targets(records, seed, rows=CHUNK_ROWS):
+    """(sessions checked, sessions whose targets the seed did not deal).
+
+    Only sessions played from seed's streams are checked; session ids carry
+    seed_tag(seed) in their top 32 bits and the game index in the bottom 32.
+    Each chunk is checked as it is read. What is kept between chunks is a flag
+    per game index, checked and wrong, so memory grows with the games dealt,
+    not with the log.
+    """
+    tag = seed_tag(seed)
+    checked = np.zeros(0, dtype=bool)
+    wrong = np.zeros(0, dtype=bool)
+    for chunk in chunks(records, rows):
+        mine = chunk[(chunk["session"] >> np.uint64(32)) == tag]
+        if not len(mine):
+            continue
+        games = (mine["session"] & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        keys, inverse = np.unique((games << 16) | (mine["difficulty"].astype(np.int64) << 8) | mine["level"],
+                                  return_inverse=True)
+        top = int(games.max()) + 1
+        if top > len(checked):
+            size = max(top, 2 * len(checked))
+            checked = np.concatenate([checked, np.zeros(size - len(checked), dtype=bool)])
+            wrong = np.concatenate([wrong, np.zeros(size - len(wrong), dtype=bool)])
+        checked[games] = True
+        # The target each (game, difficulty, level) was dealt; 0, which no
+        # level deals, for a level the difficulty does not have.
+        expected = np.zeros(len(keys), dtype=np.uint64)
+        dealt = {}
+        for i, key in enumerate(keys.tolist()):
+            game, difficulty, level = key >> 16, (key >> 8) & 0xFF, key & 0xFF
+            if (game, difficulty) not in dealt:
+                stream = SessionStream(seed, game)
+                dealt[game, difficulty] = [stream.target(row)
+                                           for row in level_table(setup_difficulty(str(difficulty)))]
+            targets = dealt[game, difficulty]
+            if 1 <= level <= len(targets):
+                expected[i] = targets[level - 1]
+        wrong[games[mine["target"] != expected[inverse.ravel()]]] = True
+    return int(np.count_nonzero(checked)), int(np.count_nonzero(wrong))
+
+
+def print_summary(stats, total):
+    print(f"{total} guesses")
+    print(f"{'Difficulty':<10} {'Guesses':>12} {'Solved':>8} {'Mean s':>8}   "
+          "spot / hot / warm / chilly / cold")
+    for code, name in sorted(DIFFICULTY_NAMES.items()):
+        count = stats["guesses"][code]
+        if not count:
+            continue
+        shares = " / ".join(f"{share:.0%}" for share in stats["bands"][code] / count)
+        print(f"{name:<10} {count:>12} {stats['correct'][code] / count:>8.1%} "
+              f"{stats['elapsed'][code] / count:>8.2f}   {shares}")
+    print("By frontend: " + ", ".join(f"{name} {count}"
+                                      for name, count in zip(SOURCES, stats["sources"]) if count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read, analyse and replay guess logs.")
+    parser.add_argument("mode", choices=["summary", "verify", "sessions", "show"])
+    parser.add_argument("path", help="guess log written with GUESS_RECORD=<path>")
+    parser.add_argument("--session", type=int, help="show: session id to replay")
+    parser.add_argument("--seed", type=int,
+                        help="verify: check targets against this root seed (default: the seeds the log records)")
+    args = parser.parse_args(argv)
+
+    records = open_records(args.path)
+    if args.mode == "summary":
+        print_summary(summary(records), len(records))
+    elif args.mode == "verify":
+        bad = verify(records)
+        print(f"{len(records)} records checked, {bad} inconsistent")
+        for seed in logged_seeds(records) if args.seed is None else [args.seed]:
+            sessions, dealt_wrong = audit_targets(records, seed)
+            print(f"{sessions} sessions from seed {seed}, {dealt_wrong} with targets it did not deal")
+            bad += dealt_wrong
+        return 1 if bad else 0
+    elif args.mode == "sessions":
+        for session in session_ids(records):
+            print(session)
+    else:
+        if args.session is None:
+            parser.error("show needs --session")
+        lines, score = replay_session(session_records(records, args.session))
+        print("\n".join(lines))
+        print(f"Final score: {score}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import atexit
+import os
+import random
+import struct
+
+from hint_rules import HINTS, HIGHER, LOWER, NO_DIRECTION
+
+# ================================
+# Guess Recording
+# ================================
+# Every guess a frontend checks is appended to a binary log as one fixed-width
+# record, so hundreds of millions of guesses can be read back without parsing
+# (see replay.py for the NumPy reader and replay). A file is a 16-byte header
+# (magic, record size, version) followed by little-endian records:
+#
+#   target u64 | guess i64 | session u64 | elapsed f64 | level u8 | difficulty u8
+#   | attempts_left u8 | band u8 | direction u8 | clue u8 | source u8 | event u8
+#
+# Targets must fit in u64; engine.difficulty_config refuses a base_range that
+# would deal more. band is the hot/cold hint (0 spot on … 4 freezing),
+# direction the higher/lower hint shown (if any), and clue the index into
+# get_riddle_clues(target, base_range) of the riddle shown (if any).
+# Everything replay needs is in the record, so replays never depend on the
+# random state of the original run.
+# event is GUESS for a checked guess, or TIMEOUT for the marker written when a
+# level's timer runs out (its guess is 0 and carries no hint). A SEED record
+# is written the first time a recorder starts a game from a root seed: its
+# target is the full 64-bit seed (streams.py) and its session the game's id,
+# so "replay.py verify" can redeal every game without being told the seed.
+# Several processes with different seeds may share a file, which is why the
+# seed is a record and not part of the header. Readers skip SEED records.
+#
+# Recording is off unless GUESS_RECORD names a file. Frontends set
+# RECORDER.source so their sessions can be told apart. Records are batched and
+# written with one os.write per batch on an O_APPEND descriptor, so several
+# game processes can share a file without splitting records.
+
+MAGIC = b"GUESSRP1"
+VERSION = 1
+RECORD = struct.Struct("<QqQdBBBBBBBB")
+HEADER = struct.Struct("<8sII")
+BATCH_BYTES = 64 * 1024
+
+DIFFICULTY_IDS = {"Easy": 1, "Normal": 2, "Hard": 3, "Huge": 4}
+SOURCES = ("cli", "timed_cli", "tk")
+NO_CLUE = 255
+GUESS, TIMEOUT, SEED = 0, 1, 2
+BAND_LIMITS = HINTS.band_limits
+INT64_MAX = (1 << 63) - 1
+band_code = HINTS.band
+
+
+class ReplayRecorder:
+    def __init__(self, path=None, source="cli"):
+        self.path = path
+        self.source = source
+        self.session = 0
+        self._fd = None
+        self._batch = bytearray()
+        self._session_base = random.SystemRandom().getrandbits(32) << 32
+        self.session_id = self._session_base
+        self._seeds = set()
+        if path:
+            self.open(path)
+
+    @property
+    def enabled(self):
+        return self._fd is not None
+
+    def open(self, path):
+        self.close()
+        self.path = path
+        self._seeds = set()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, HEADER.pack(MAGIC, RECORD.size, VERSION))
+
+    def start_session(self, stream=None):
+        """Begin a new game; later records share a fresh session id.
+
+        A game played from a SessionStream takes the stream's id, so its
+        targets can be checked against the seed later.
+        """
+        self.session += 1
+        self.session_id = self._session_base | self.session if stream is None else stream.session_id
+        if stream is not None and self._fd is not None and stream.seed not in self._seeds:
+            self._seeds.add(stream.seed)
+            self._batch += RECORD.pack(stream.seed, 0, self.session_id, 0.0, 0, 0, 0, 0,
+                                       NO_DIRECTION, NO_CLUE, SOURCES.index(self.source), SEED)
+
+    def record(self, level, difficulty, target, guess, attempts_left, elapsed,
+               direction=NO_DIRECTION, clue=None, event=GUESS):
+        if self._fd is None:
+            return
+        if clue is None:
+            clue = NO_CLUE
+        stored_guess = max(-INT64_MAX, min(INT64_MAX, guess))
+        self._batch += RECORD.pack(
+            target, stored_guess, self.session_id, elapsed, level,
+            DIFFICULTY_IDS[difficulty["name"]], attempts_left, band_code(guess, target),
+            direction, clue, SOURCES.index(self.source), event)
+        if len(self._batch) >= BATCH_BYTES:
+            self.flush()
+
+    def record_timeout(self, level, difficulty, target, attempts_left, elapsed):
+        self.record(level, difficulty, target, 0, attempts_left, elapsed, event=TIMEOUT)
+
+    def flush(self):
+        if self._fd is not None and self._batch:
+            os.write(self._fd, self._batch)
+            self._batch.clear()
+
+    def close(self):
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+
+RECORDER = ReplayRecorder(os.environ.get("GUESS_RECORD"))
+atexit.register(RECORDER.close)
@@ -0,0 +1,321 @@
+import os
+import random
+import struct
+import time
+from array import array
+
+# ================================
+# Compact Session Store
+# ================================
+# Session state lives in parallel typed arrays (one column per field) instead
+# of one object per session, so an idle session costs a few dozen bytes.
+# Difficulty configs are interned: a session stores a one-byte id into
+# DIFFICULTY_TABLE, and every session sharing a difficulty shares one dict.
+#
+# A session id packs a slot number and that slot's generation, so ids of
+# evicted sessions never alias a slot that has since been reused. When the
+# columns grow past the memory budget, sessions idle for longer than
+# idle_timeout are evicted: appended to spill_path when one is set, dropped
+# otherwise. A spilled session is restored transparently on its next use and
+# gets a new id.
+#
+# Spilled sessions are indexed by slot, not held in a dict: spill_head holds
+# the record number of the last session spilled from each slot, and every
+# spill record stores its session id and the record spilled from the same
+# slot before it, so a lookup follows that chain in the file (usually one
+# read). A byte per record marks it live; restored and released sessions are
+# marked dead, and once dead records outnumber live ones (and there are at
+# least MIN_COMPACT_RECORDS), the spill file is rewritten with only the live
+# records. The index counts towards the memory budget, which is checked
+# whenever sessions are created, restored from spill or adopted.
+
+FIELDS = (
+    ("difficulty_id", "B"),
+    ("level", "B"),
+    ("attempts_left", "B"),
+    ("score", "I"),
+    ("number_to_guess", "Q"),
+    ("game", "Q"),
+    ("start_time", "d"),
+    ("last_active", "d"),
+)
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+RECORD = struct.Struct("<" + "".join(code for _, code in FIELDS))
+# Session id and previous record number from the same slot (-1 for none).
+SPILL_RECORD = struct.Struct("<Qq" + RECORD.format[1:])
+MIN_COMPACT_RECORDS = 4096
+
+# Id 0 means "no game in progress".
+DIFFICULTY_TABLE = [None]
+_difficulty_ids = {}
+
+
+def intern_difficulty(difficulty):
+    """Return the shared id for a difficulty config, registering it if new."""
+    key = tuple(sorted(difficulty.items()))
+    if key not in _difficulty_ids:
+        if len(DIFFICULTY_TABLE) > 255:
+            raise ValueError("too many distinct difficulty configs")
+        _difficulty_ids[key] = len(DIFFICULTY_TABLE)
+        DIFFICULTY_TABLE.append(dict(difficulty))
+    return _difficulty_ids[key]
+
+
+class SessionStore:
+    def __init__(self, memory_budget=None, idle_timeout=300.0, spill_path=None):
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.spill_path = spill_path
+        self.columns = {name: array(code) for name, code in FIELDS}
+        self.generation = array("H")
+        self.free_slots = array("I")
+        self.live = 0
+        self.evicted = 0
+        self.spill_head = array("q")
+        self._spill_live = array("B")
+        self._spill_dead = 0
+        self._spill_buffer = bytearray()
+        self._spill_file = None
+
+    # -------------------------
+    # Sizing
+    # -------------------------
+    @staticmethod
+    def bytes_per_session():
+        return sum(array(code).itemsize for _, code in FIELDS) + array("H").itemsize
+
+    def memory_bytes(self):
+        """Bytes used by the column buffers (allocated slots, not capacity) and the spill index."""
+        return (len(self.generation) * self.bytes_per_session()
+                + self.free_slots.itemsize * len(self.free_slots)
+                + self.spill_head.itemsize * len(self.spill_head) + len(self._spill_live))
+
+    def _over_budget(self, extra_sessions):
+        return self.memory_budget is not None and \
+            self.memory_bytes() + extra_sessions * self.bytes_per_session() > self.memory_budget
+
+    def __len__(self):
+        return self.live
+
+    def __contains__(self, sid):
+        """True if sid is a live session in memory (not spilled)."""
+        slot = sid & SLOT_MASK
+        return slot < len(self.generation) and self.generation[slot] == sid >> SLOT_BITS
+
+    # -------------------------
+    # Allocation
+    # -------------------------
+    def create(self, now=None):
+        """Allocate an empty session and return its id."""
+        now = time.monotonic() if now is None else now
+        if not self.free_slots and self._over_budget(1):
+            self.evict_idle(now)
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            for name, _ in FIELDS:
+                self.columns[name][slot] = 0
+        else:
+            slot = len(self.generation)
+            for name, _ in FIELDS:
+                self.columns[name].append(0)
+            self.generation.append(0)
+        self.columns["last_active"][slot] = now
+        self.live += 1
+        return (self.generation[slot] << SLOT_BITS) | slot
+
+    def release(self, sid):
+        """Free a session's slot."""
+        if sid in self:
+            self._free(sid & SLOT_MASK)
+        else:
+            found = self._find_spilled(sid)
+            if found is not None:
+                self._forget_spilled(found[0])
+
+    def adopt(self, sids, now=None):
+        """Allocate empty sessions under the given ids, e.g. ones restored after a
+        restart, and return their slots. Every slot must be free."""
+        now = time.monotonic() if now is None else now
+        slots = [sid & SLOT_MASK for sid in sids]
+        grow = max(slots, default=-1) + 1 - len(self.generation)
+        if self._over_budget(max(grow, 0)):
+            # Make room first; the adopted sessions are fresh, so they stay.
+            self.evict_idle(now)
+        if grow > 0:
+            start = len(self.generation)
+            for name, _ in FIELDS:
+                self.columns[name].extend([0] * grow)
+            self.generation.extend([0] * grow)
+            self.columns["last_active"][start:] = array("d", [float("inf")]) * grow
+            self.free_slots.extend(range(start, start + grow))
+        free = set(self.free_slots)
+        for sid, slot in zip(sids, slots):
+            if slot not in free:
+                raise ValueError(f"session {sid}: slot {slot} is taken")
+            free.remove(slot)
+            for name, _ in FIELDS:
+                self.columns[name][slot] = 0
+            self.columns["last_active"][slot] = now
+            self.generation[slot] = sid >> SLOT_BITS
+        self.free_slots = array("I", (slot for slot in self.free_slots if slot in free))
+        self.live += len(slots)
+        return slots
+
+    def _free(self, slot):
+        # Free slots never look idle, so eviction scans can skip them.
+        self.columns["last_active"][slot] = float("inf")
+        self.generation[slot] = (self.generation[slot] + 1) & 0xFFFF
+        self.free_slots.append(slot)
+        self.live -= 1
+
+    def resolve(self, sid, now=None):
+        """Return (sid, slot) for a live session, restoring it from spill if needed.
+
+        Raises KeyError for sessions that were released or dropped.
+        """
+        if sid in self:
+            slot = sid & SLOT_MASK
+            self.columns["last_active"][slot] = time.monotonic() if now is None else now
+            return sid, slot
+        found = self._find_spilled(sid)
+        if found is None:
+            raise KeyError(sid)
+        return self._restore(found, now)
+
+    # -------------------------
+    # Eviction
+    # -------------------------
+    def evict_idle(self, now=None):
+        """Evict every session idle for longer than idle_timeout."""
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.idle_timeout
+        last_active = self.columns["last_active"]
+        generation = self.generation
+        count = 0
+        for slot in range(len(generation)):
+            if last_active[slot] < cutoff:
+                sid = (generation[slot] << SLOT_BITS) | slot
+                if self.spill_path is not None:
+                    self._spill(sid, slot)
+                self._free(slot)
+                count += 1
+        self._write_spill()
+        self.evicted += count
+        return count
+
+    def _spill(self, sid, slot):
+        """Queue a session's record; evict_idle writes the batch with _write_spill."""
+        head = self.spill_head
+        if slot >= len(head):
+            head.extend(array("q", [-1]) * (len(self.generation) - len(head)))
+        record = len(self._spill_live)
+        self._spill_buffer += SPILL_RECORD.pack(
+            sid, head[slot], *(self.columns[name][slot] for name, _ in FIELDS))
+        head[slot] = record
+        self._spill_live.append(1)
+
+    def _write_spill(self):
+        if not self._spill_buffer:
+            return
+        if self._spill_file is None:
+            # Records of an earlier process are unreachable; start empty.
+            self._spill_file = open(self.spill_path, "w+b")
+        self._spill_file.seek(0, os.SEEK_END)
+        self._spill_file.write(self._spill_buffer)
+        self._spill_file.flush()
+        self._spill_buffer.clear()
+
+    def _find_spilled(self, sid):
+        """(record number, column values) of a spilled session, or None."""
+        slot = sid & SLOT_MASK
+        if slot >= len(self.spill_head) or self._spill_file is None:
+            return None
+        record = self.spill_head[slot]
+        while record >= 0:
+            self._spill_file.seek(record * SPILL_RECORD.size)
+            stored_sid, previous, *values = SPILL_RECORD.unpack(self._spill_file.read(SPILL_RECORD.size))
+            if stored_sid == sid and self._spill_live[record]:
+                return record, values
+            record = previous
+        return None
+
+    def _forget_spilled(self, record):
+        self._spill_live[record] = 0
+        self._spill_dead += 1
+        live = len(self._spill_live) - self._spill_dead
+        if self._spill_dead > max(live, MIN_COMPACT_RECORDS):
+            self.compact_spill()
+
+    def compact_spill(self, chunk_records=65536):
+        """Rewrite the spill file with only the sessions still spilled."""
+        if self._spill_file is None:
+            return
+        old = self._spill_file
+        old.seek(0)
+        head = array("q", [-1]) * len(self.spill_head)
+        temp_path = self.spill_path + ".compact"
+        kept = 0
+        record = 0
+        with open(temp_path, "wb") as new:
+            while True:
+                chunk = old.read(SPILL_RECORD.size * chunk_records)
+                if not chunk:
+                    break
+                for stored in SPILL_RECORD.iter_unpack(chunk):
+                    if self._spill_live[record]:
+                        slot = stored[0] & SLOT_MASK
+                        # Chains run from newer to older records, so the last
+                        # kept record of a slot is the new one's predecessor.
+                        new.write(SPILL_RECORD.pack(stored[0], head[slot], *stored[2:]))
+                        head[slot] = kept
+                        kept += 1
+                    record += 1
+        old.close()
+        os.replace(temp_path, self.spill_path)
+        self._spill_file = open(self.spill_path, "r+b")
+        self.spill_head = head
+        self._spill_live = array("B", [1]) * kept
+        self._spill_dead = 0
+
+    def _restore(self, found, now):
+        record, values = found
+        self._forget_spilled(record)
+        sid = self.create(now)
+        slot = sid & SLOT_MASK
+        for (name, _), value in zip(FIELDS, values):
+            self.columns[name][slot] = value
+        self.columns["last_active"][slot] = time.monotonic() if now is None else now
+        return sid, slot
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    from numberguessinggamepython import setup_difficulty
+
+    count = 1_000_000
+    tracemalloc.start()
+    store = SessionStore()
+    hard = intern_difficulty(setup_difficulty("3"))
+    rng = random.Random(0)
+    for _ in range(count):
+        slot = store.create(0.0) & SLOT_MASK
+        store.columns["difficulty_id"][slot] = hard
+        store.columns["level"][slot] = 1
+        store.columns["attempts_left"][slot] = 5
+        store.columns["number_to_guess"][slot] = rng.randint(1, 19)
+    current, _ = tracemalloc.get_traced_memory()
+    print(f"{count} idle sessions: {current / count:.1f} bytes each "
+          f"({store.bytes_per_session()} in columns)")
+
+    store.memory_budget = store.memory_bytes()
+    start = time.perf_counter()
+    store.create(now=1000.0)
+    print(f"Evicted {store.evicted} idle sessions in {time.perf_counter() - start:.2f}s")
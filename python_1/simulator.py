@@ -0,0 +1,211 @@
+import argparse
+
+import numpy as np
+
+from engine import DIFFICULTY_CHOICES, difficulty_config, level_info
+from hint_rules import HINTS
+from numberguessinggamepython import setup_difficulty
+from streams import TargetPool, new_seed
+
+# ================================
+# Headless Game Simulator
+# ================================
+# Plays many sessions of the CLI game at once using NumPy arrays instead of
+# input(). Every session in a batch is one run of play_game: levels are played
+# in order until the player clears them all or fails one.
+#
+# By default levels are untimed, as in the plain CLI. --timed gives each
+# difficulty its own timer from the engine, as in the timed CLI; --timer N
+# instead puts every difficulty on the same N second limit.
+
+HOT_COLD_BANDS = HINTS.band_limits
+
+
+def level_range_for(difficulty, level):
+    """The level's range, from the engine's level table."""
+    return level_info(difficulty, level).range
+
+
+def pick_guesses(strategy, lo, hi, rng, directional):
+    """Vectorized guess for every session from its remaining [lo, hi] window.
+
+    directional tells the player whether a higher/lower hint follows this guess.
+    """
+    if strategy == "bisect":
+        # Without a direction the hot/cold bands are symmetric, so probe from
+        # the low edge where they can only point one way.
+        return (lo + hi) // 2 if directional else lo
+    elif strategy == "random":
+        return rng.integers(lo, hi + 1)
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def narrow_by_band(guess, target, lo, hi):
+    """Shrink the window to what the hot/cold hint allows.
+
+    A band means prev < |guess - target| <= limit, i.e. one piece on each side
+    of the guess. The window keeps the hull of whichever pieces still overlap it.
+    """
+    diff = np.abs(guess - target)
+    prev = np.zeros_like(diff)
+    limit = np.full_like(diff, hi.max() + 1)
+    for lower, upper in zip(HOT_COLD_BANDS, HOT_COLD_BANDS[1:]):
+        inside = (diff > lower) & (diff <= upper)
+        prev = np.where(inside, lower, prev)
+        limit = np.where(inside, upper, limit)
+    prev = np.where(diff > HOT_COLD_BANDS[-1], HOT_COLD_BANDS[-1], prev)
+
+    left_lo, left_hi = np.maximum(lo, guess - limit), np.minimum(hi, guess - prev - 1)
+    right_lo, right_hi = np.maximum(lo, guess + prev + 1), np.minimum(hi, guess + limit)
+    left_ok = left_lo <= left_hi
+    right_ok = right_lo <= right_hi
+    new_lo = np.where(left_ok, left_lo, right_lo)
+    new_hi = np.where(right_ok, right_hi, left_hi)
+    return new_lo, new_hi
+
+
+def simulate_level(level, difficulty, targets, rng, strategy="bisect", think_time=2.0):
+    """Play one level for every session's target and return per-session outcome arrays."""
+    n = len(targets)
+    level_range = level_range_for(difficulty, level)
+    attempts = difficulty["attempts"]
+    hint_type = difficulty["hint_type"]
+    timer = difficulty.get("timer", 0)
+
+    lo = np.ones(n, dtype=np.int64)
+    hi = np.full(n, level_range, dtype=np.int64)
+    elapsed = np.zeros(n)
+    active = np.ones(n, dtype=bool)
+    won = np.zeros(n, dtype=bool)
+    timed_out = np.zeros(n, dtype=bool)
+    gained = np.zeros(n, dtype=np.int64)
+    used = np.zeros(n, dtype=np.int64)
+
+    for turn in range(attempts):
+        attempts_left = attempts - turn
+        directional = HINTS.shows_direction(hint_type, attempts_left - 1)
+        guess = pick_guesses(strategy, lo, hi, rng, directional)
+        elapsed += rng.exponential(think_time, size=n)
+        if timer:
+            # As Round.timed_out: a guess made after the timer ran out is not
+            # checked, so a late correct guess is a timeout, not a clear.
+            late = active & (elapsed > timer)
+            timed_out |= late
+            active &= ~late
+        used += active
+
+        hit = active & (guess == targets)
+        time_bonus = np.maximum(0, 10 - elapsed.astype(np.int64))
+        gained = np.where(hit, attempts_left * 10 + level * 5 + time_bonus, gained)
+        won |= hit
+        active &= ~hit
+
+        lo, hi = narrow_by_band(guess, targets, lo, hi)
+        if directional:
+            lo = np.where(guess < targets, np.maximum(lo, guess + 1), lo)
+            hi = np.where(guess > targets, np.minimum(hi, guess - 1), hi)
+        hi = np.maximum(lo, hi)
+
+    return won, gained, used, timed_out
+
+
+def simulate(difficulty, sessions, seed=None, strategy="bisect", think_time=2.0,
+             chunk_size=1_000_000):
+    """Simulate full games and return aggregated statistics.
+
+    Session k plays the targets of game k in a TargetPool for seed, the same
+    ones the server deals to its game k; rng drives the simulated players.
+    """
+    seed = new_seed() if seed is None else seed
+    pool = TargetPool.for_difficulty(difficulty, seed)
+    rng = np.random.default_rng(seed)
+    levels = difficulty["levels"]
+    reached = np.zeros(levels, dtype=np.int64)
+    cleared = np.zeros(levels, dtype=np.int64)
+    timeouts = np.zeros(levels, dtype=np.int64)
+    attempts_hist = np.zeros((levels, difficulty["attempts"] + 1), dtype=np.int64)
+    final_scores = []
+
+    for start in range(0, sessions, chunk_size):
+        n = min(chunk_size, sessions - start)
+        targets = pool.rows(start, n)
+        alive = np.ones(n, dtype=bool)
+        score = np.zeros(n, dtype=np.int64)
+
+        for level in range(1, levels + 1):
+            won, gained, used, timed_out = simulate_level(
+                level, difficulty, targets[:, level - 1], rng, strategy, think_time)
+            won &= alive
+            reached[level - 1] += alive.sum()
+            cleared[level - 1] += won.sum()
+            timeouts[level - 1] += (timed_out & alive).sum()
+            attempts_hist[level - 1] += np.bincount(used[won], minlength=difficulty["attempts"] + 1)
+            score += np.where(won, gained, 0)
+            alive = won
+
+        final_scores.append(score[alive])
+
+    final_scores = np.concatenate(final_scores)
+    return {
+        "difficulty": difficulty["name"],
+        "sessions": sessions,
+        "strategy": strategy,
+        "win_rate": len(final_scores) / sessions if sessions else 0.0,
+        "levels": [
+            {
+                "level": level,
+                "range": level_range_for(difficulty, level),
+                "reached": int(reached[level - 1]),
+                "clear_rate": float(cleared[level - 1] / reached[level - 1]) if reached[level - 1] else 0.0,
+                "timeouts": int(timeouts[level - 1]),
+                "attempts_used": attempts_hist[level - 1].tolist(),
+            }
+            for level in range(1, levels + 1)
+        ],
+        "score_percentiles": (
+            dict(zip(("p10", "p50", "p90", "max"),
+                     np.percentile(final_scores, [10, 50, 90, 100]).tolist()))
+            if len(final_scores) else {}
+        ),
+    }
+
+
+def print_report(report):
+    print(f"\n{report['difficulty']} — {report['sessions']} sessions ({report['strategy']})")
+    print(f"Win rate: {report['win_rate']:.2%}")
+    for row in report["levels"]:
+        print(f"  Level {row['level']} (1 to {row['range']}): "
+              f"clear {row['clear_rate']:.2%} of {row['reached']}, "
+              f"timeouts {row['timeouts']}, attempts used {row['attempts_used'][1:]}")
+    if report["score_percentiles"]:
+        print("  Winning scores: " + ", ".join(
+            f"{k}={v:.0f}" for k, v in report["score_percentiles"].items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless number guessing simulator.")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_CHOICES) + ["all"], default="all")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--strategy", choices=["bisect", "random"], default="bisect")
+    parser.add_argument("--think-time", type=float, default=2.0,
+                        help="Mean seconds a simulated player spends per guess.")
+    parser.add_argument("--timed", action="store_true",
+                        help="Use each difficulty's own level timer, as the timed CLI does.")
+    parser.add_argument("--timer", type=int, default=None,
+                        help="Level time limit in seconds for every difficulty (0 disables it); "
+                             "overrides --timed.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    names = list(DIFFICULTY_CHOICES) if args.difficulty == "all" else [args.difficulty]
+    for name in names:
+        choice = DIFFICULTY_CHOICES[name]
+        difficulty = difficulty_config(choice) if args.timed else setup_difficulty(choice)
+        if args.timer is not None:
+            difficulty["timer"] = args.timer
+        print_report(simulate(difficulty, args.sessions, args.seed,
+                              args.strategy, args.think_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import contextlib
+import os
+import sys
+import tracemalloc
+
+import numberguessinggamepython as game
+
+# ================================
+# Restart Soak Benchmark
+# ================================
+# Drives GameFlow through many losing games (guess 0 is never the target) and
+# checks that stack depth and traced memory stay flat. With the old recursive
+# play_game this died at the recursion limit after about a thousand losses.
+
+
+def stack_depth():
+    depth = 0
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def soak(restarts, choice="3", samples=10):
+    game.RENDERER.mode = "instant"
+    depths = set()
+    checkpoints = []
+    every = max(1, restarts // samples)
+
+    def ask(prompt):
+        # Flush like RENDERER.ask does, so buffered output is not counted as growth.
+        game.RENDERER.flush()
+        if prompt.startswith("Enter 1"):
+            depths.add(stack_depth())
+            if flow.restarts % every == 0:
+                checkpoints.append((flow.restarts, tracemalloc.get_traced_memory()[0]))
+            return choice
+        return "0"
+
+    flow = game.GameFlow(ask)
+    tracemalloc.start()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        while flow.restarts < restarts:
+            flow.step()
+        game.RENDERER.flush()
+    tracemalloc.stop()
+    return depths, checkpoints
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak GameFlow restarts.")
+    parser.add_argument("--restarts", type=int, default=100_000)
+    parser.add_argument("--tolerance", type=int, default=64 * 1024,
+                        help="Allowed growth in traced bytes after warm-up.")
+    args = parser.parse_args(argv)
+
+    depths, checkpoints = soak(args.restarts)
+    for restarts, current in checkpoints:
+        print(f"after {restarts:>7} restarts: {current / 1024:.1f} KiB traced")
+    print(f"stack depths seen at the difficulty prompt: {sorted(depths)}")
+
+    warm = checkpoints[1][1] if len(checkpoints) > 1 else checkpoints[0][1]
+    growth = max(current for _, current in checkpoints[1:] or checkpoints) - warm
+    ok = len(depths) == 1 and growth <= args.tolerance
+    print(f"memory growth after warm-up: {growth} bytes — {'OK' if ok else 'FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
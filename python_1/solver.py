@@ -0,0 +1,201 @@
+import argparse
+import functools
+
+from hint_rules import HINTS
+from engine import DIFFICULTIES, level_table
+from numberguessinggamepython import get_adaptive_hint, get_riddle_clues, setup_difficulty
+
+# ================================
+# Optimal-Strategy Solver
+# ================================
+# Exhaustive search over the feedback play_level gives after each wrong guess:
+# the hot/cold hint, the higher/lower hint when the hint type shows one that
+# turn, and in riddle mode a clue picked at random from get_riddle_clues.
+#
+# A policy is scored by win probability first and expected attempts second, so
+# "optimal" never trades a lower chance of winning for fewer guesses. Guesses
+# are restricted to targets that are still possible.
+#
+# Riddle clues are random, but every target receives one clue per miss, so
+# after m misses target t carries weight len(clues(t)) ** -m. The posterior is
+# therefore fixed by the candidate set and the attempts left, which is what the
+# memo is keyed on. Direct and mixed feedback only depends on distances, so
+# those candidate sets are shifted to start at 0 and shared between levels.
+#
+# Levels over ENUMERATE_LIMIT targets (Huge) are not searched here; par_table's
+# RangeSolver covers them for direct hints.
+
+EPSILON = 1e-12
+ENUMERATE_LIMIT = 1000
+
+
+def shows_direction(hint_type, attempts_left):
+    """Whether play_level prints higher/lower after a miss with attempts_left."""
+    return HINTS.shows_direction(hint_type, attempts_left - 1)
+
+
+class Solver:
+    def __init__(self, hint_type, attempts, upper=100):
+        self.hint_type = hint_type
+        self.attempts = attempts
+        self.upper = upper
+        self._memo = {}
+        self._clues = {}
+
+    def clues(self, target):
+        if target not in self._clues:
+            self._clues[target] = tuple(get_riddle_clues(target, self.upper))
+        return self._clues[target]
+
+    def weight(self, target, attempts_left):
+        if self.hint_type != "riddle":
+            return 1.0
+        return len(self.clues(target)) ** -(self.attempts - attempts_left)
+
+    def outcomes(self, guess, candidates, attempts_left):
+        """Group the other candidates by the feedback they produce for guess.
+
+        Returns {feedback: (probability mass, candidates)} with unnormalized mass.
+        """
+        direction = shows_direction(self.hint_type, attempts_left)
+        groups = {}
+        for target in candidates:
+            if target == guess:
+                continue
+            band = get_adaptive_hint(guess, target)
+            side = (guess < target) - (guess > target) if direction else 0
+            weight = self.weight(target, attempts_left)
+            if self.hint_type == "riddle":
+                clues = self.clues(target)
+                for clue in clues:
+                    key = (band, side, clue)
+                    mass, members = groups.get(key, (0.0, []))
+                    members.append(target)
+                    groups[key] = (mass + weight / len(clues), members)
+            else:
+                key = (band, side, None)
+                mass, members = groups.get(key, (0.0, []))
+                members.append(target)
+                groups[key] = (mass + weight, members)
+        return groups
+
+    def normalize(self, candidates):
+        """Memo key and offset for a sorted candidate tuple."""
+        if self.hint_type == "riddle" or not candidates:
+            return candidates, 0
+        offset = candidates[0]
+        if offset == 0:
+            return candidates, 0
+        return tuple(t - offset for t in candidates), offset
+
+    def value(self, candidates, attempts_left):
+        """Return (win_probability, expected_attempts, best_guess)."""
+        if not candidates or attempts_left <= 0:
+            return 0.0, 0.0, None
+        key, offset = self.normalize(candidates)
+        found = self._memo.get((key, attempts_left))
+        if found is None:
+            found = self._search(key, attempts_left)
+            self._memo[(key, attempts_left)] = found
+        p_win, expected, guess = found
+        return p_win, expected, None if guess is None else guess + offset
+
+    def _search(self, candidates, attempts_left):
+        weights = {t: self.weight(t, attempts_left) for t in candidates}
+        total = sum(weights.values())
+
+        if attempts_left == 1 or len(candidates) == 1:
+            guess = max(candidates, key=weights.get)
+            return weights[guess] / total, 1.0, guess
+
+        best = None
+        for guess in candidates:
+            p_win = weights[guess] / total
+            expected = 1.0
+            for mass, members in self.outcomes(guess, candidates, attempts_left).values():
+                share = mass / total
+                child_p, child_e, _ = self.value(tuple(members), attempts_left - 1)
+                p_win += share * child_p
+                expected += share * child_e
+            if (best is None or p_win > best[0] + EPSILON
+                    or (abs(p_win - best[0]) <= EPSILON and expected < best[1] - EPSILON)):
+                best = (p_win, expected, guess)
+        return best
+
+
+class DecisionNode:
+    """One point in a solved level: what to guess and where each reply leads."""
+
+    def __init__(self, solver, candidates, attempts_left):
+        self.solver = solver
+        self.candidates = candidates
+        self.attempts_left = attempts_left
+        self.win_probability, self.expected_attempts, self.guess = solver.value(
+            candidates, attempts_left)
+
+    def children(self):
+        """Map each possible feedback to the node the player ends up in."""
+        if self.guess is None or self.attempts_left <= 1:
+            return {}
+        groups = self.solver.outcomes(self.guess, self.candidates, self.attempts_left)
+        return {
+            feedback: DecisionNode(self.solver, tuple(members), self.attempts_left - 1)
+            for feedback, (_, members) in groups.items()
+        }
+
+    def child(self, band, higher=None, clue=None):
+        """Follow the hints actually shown after a miss."""
+        side = 0 if higher is None else (1 if higher else -1)
+        return self.children()[(band, side, clue)]
+
+
+@functools.lru_cache(maxsize=None)
+def _solver_for(hint_type, attempts, upper):
+    return Solver(hint_type, attempts, upper)
+
+
+@functools.lru_cache(maxsize=256)
+def solve_level(level_range, attempts, hint_type, upper=100):
+    """Decision tree for guessing 1..level_range, cached per level shape."""
+    solver = _solver_for(hint_type, attempts, upper)
+    return DecisionNode(solver, tuple(range(1, level_range + 1)), attempts)
+
+
+def solve_difficulty(difficulty):
+    """Solve every level of a setup_difficulty config."""
+    results = []
+    for level in level_table(difficulty):
+        root = solve_level(level.range, level.attempts, level.hint_type, level.upper)
+        results.append((level.number, level.range, root))
+    return results
+
+
+def min_attempts_to_win(level_range, hint_type, upper=100, limit=20):
+    """Fewest attempts that guarantee a win, or None if limit is not enough."""
+    for attempts in range(1, limit + 1):
+        if solve_level(level_range, attempts, hint_type, upper).win_probability >= 1 - EPSILON:
+            return attempts
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimal guessing policy per level.")
+    parser.add_argument("--difficulty", choices=[d.choice for d in DIFFICULTIES], default="1",
+                        help="Same numbering as the game menu.")
+    args = parser.parse_args(argv)
+
+    difficulty = setup_difficulty(args.difficulty)
+    print(f"{difficulty['name']}: {difficulty['attempts']} attempts, {difficulty['hint_type']} hints")
+    if any(level.range > ENUMERATE_LIMIT for level in level_table(difficulty)):
+        print(f"  Levels have more than {ENUMERATE_LIMIT} targets, too many to enumerate; "
+              f"python3 par_table.py shows their optimal win rate and score.")
+        return
+    for level, level_range, root in solve_difficulty(difficulty):
+        status = "" if root.win_probability > EPSILON else "  UNWINNABLE"
+        print(f"  Level {level} (1 to {level_range}): first guess {root.guess}, "
+              f"win {root.win_probability:.2%}, "
+              f"expected attempts {root.expected_attempts:.2f}{status}")
+
+
+if __name__ == "__main__":
+    main()
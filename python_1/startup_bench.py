@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ================================
+# Startup Benchmark
+# ================================
+# Measures how long each entry point takes to be ready for the player:
+#   time to first prompt  launch the CLI, wait for the difficulty prompt on
+#                         stdout, kill it. The first launch runs with an empty
+#                         banner cache (cold), the rest reuse it (warm).
+#   import time           python -X importtime for each game module: the total,
+#                         and the modules with the largest cumulative times.
+# The Tk app needs a display to reach a prompt, so only its imports are timed.
+#
+# Runs use GUESS_RENDER=instant and a private GUESS_CACHE_DIR, with no
+# GUESS_RECORD, so they measure startup alone. With --budget-ms the exit
+# status is 1 when any warm median is over budget, for use in CI.
+#
+#   python3 startup_bench.py --runs 20 --budget-ms 150 --json startup.json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROMPT = b"Enter 1, 2, 3, or 4: "
+ENTRY_POINTS = {
+    "cli": "numberguessinggamepython.py",
+    "timed_cli": "import tkinter as tk.py",
+}
+MODULES = {
+    "cli": "numberguessinggamepython",
+    "tk": "numberguessgame20",
+}
+
+
+def time_to_prompt(script, env, timeout=10.0):
+    """Seconds from launch until PROMPT is written to stdout."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, script)], cwd=HERE, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    seen = b""
+    try:
+        while PROMPT not in seen:
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                raise RuntimeError(f"{script} exited before its first prompt")
+            seen = seen[-len(PROMPT):] + chunk
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"{script} showed no prompt within {timeout}s")
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+        process.stdin.close()
+        process.stdout.close()
+
+
+def import_times(module, env, top=8):
+    """(total µs, [(cumulative µs, module name)] of the slowest imports) from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    total = next(c for c, name in reversed(rows) if name.strip() == module)
+    slowest = sorted(((c, name.strip()) for c, name in rows if name.strip() != module), reverse=True)
+    return total, slowest[:top]
+
+
+def measure(runs):
+    cache = tempfile.mkdtemp(prefix="guess-startup-")
+    env = dict(os.environ, GUESS_RENDER="instant", GUESS_CACHE_DIR=cache)
+    env.pop("GUESS_RECORD", None)
+    results = {"python": sys.version.split()[0], "runs": runs, "prompt": {}, "imports": {}}
+    try:
+        for name, script in ENTRY_POINTS.items():
+            try:
+                cold = time_to_prompt(script, env)
+                warm = [time_to_prompt(script, env) for _ in range(runs)]
+            except RuntimeError as error:
+                results["prompt"][name] = {"error": str(error)}
+                continue
+            results["prompt"][name] = {
+                "cold_ms": cold * 1000,
+                "median_ms": statistics.median(warm) * 1000,
+                "min_ms": min(warm) * 1000,
+                "max_ms": max(warm) * 1000,
+            }
+        for name, module in MODULES.items():
+            try:
+                total, slowest = import_times(module, env)
+            except RuntimeError as error:
+                results["imports"][name] = {"error": str(error)}
+                continue
+            results["imports"][name] = {"total_ms": total / 1000,
+                                        "slowest": [[n, c / 1000] for c, n in slowest]}
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+    return results
+
+
+def print_results(results):
+    print(f"Time to first prompt ({results['runs']} warm runs, Python {results['python']})")
+    for name, row in results["prompt"].items():
+        if "error" in row:
+            print(f"  {name:<10} {row['error']}")
+            continue
+        print(f"  {name:<10} median {row['median_ms']:7.1f} ms   min {row['min_ms']:7.1f}   "
+              f"max {row['max_ms']:7.1f}   cold cache {row['cold_ms']:7.1f}")
+    print("Import time (-X importtime)")
+    for name, row in results["imports"].items():
+        if "error" in row:
+            print(f"  {name:<10} {row['error']}")
+            continue
+        print(f"  {name:<10} {row['total_ms']:7.1f} ms; slowest: "
+              + ", ".join(f"{module} {ms:.1f}" for module, ms in row["slowest"][:5]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup and import time.")
+    parser.add_argument("--runs", type=int, default=10, help="warm launches per entry point")
+    parser.add_argument("--budget-ms", type=float, help="fail if a warm median is slower")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.budget_ms is not None:
+        over = [name for name, row in results["prompt"].items()
+                if "error" in row or row["median_ms"] > args.budget_ms]
+        if over:
+            print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import functools
+import hashlib
+import os
+import random
+
+from engine import level_table
+
+# ================================
+# Per-Session Random Streams
+# ================================
+# Every game draws from its own random streams, derived from a root seed and
+# the game's index, so no two sessions share a generator and any session can
+# be replayed from (seed, index) alone. The root seed comes from GUESS_SEED,
+# or from the OS when that is unset.
+#
+#   SessionStream   one game in a single-player frontend: a targets stream
+#                   (one draw per level, in order) and a clues stream for
+#                   riddle picks. These are random.Random generators seeded
+#                   with "<seed>:<index>:<name>", the way batch mode and the
+#                   tournament already key their streams. Nothing here imports
+#                   NumPy, so CLI startup stays fast.
+#   TargetPool      level targets for many numbered games, for the server and
+#                   the simulator. Games are generated a block at a time with
+#                   one vectorised NumPy call. Block b is drawn from the b-th
+#                   child of SeedSequence(seed) (what SeedSequence.spawn would
+#                   return), so a game's row depends only on the seed, the
+#                   level ranges and its index, and never on other games.
+#
+# The recorder stores seed_tag(seed) in the top half of each session id and
+# the game index in the bottom half, and logs the full seed once in a SEED
+# record, so "replay.py verify" can check every recorded target against the
+# stream it came from. Checkpoints store the full seed in every record.
+#
+#   GUESS_SEED=42 python3 numberguessinggamepython.py
+
+ENV_SEED = "GUESS_SEED"
+POOL_BLOCK = 1024
+POOL_CACHE = 64
+INT64_MAX = (1 << 63) - 1
+
+
+def new_seed():
+    """The root seed: GUESS_SEED if set, otherwise 64 random bits from the OS."""
+    seed = os.environ.get(ENV_SEED)
+    if seed:
+        # SeedSequence and the checkpoint format both need an unsigned 64-bit seed.
+        if not 0 <= int(seed) < 1 << 64:
+            raise ValueError(f"{ENV_SEED} must be from 0 to 2**64 - 1, not {seed}")
+        return int(seed)
+    return random.SystemRandom().getrandbits(64)
+
+
+def seed_tag(seed):
+    """32 bits identifying a seed without revealing it."""
+    return int.from_bytes(hashlib.blake2b(str(seed).encode(), digest_size=4).digest(), "little")
+
+
+def keyed_random(seed, index, name):
+    """An independent generator for one named stream of one game."""
+    return random.Random(f"{seed}:{index}:{name}")
+
+
+class SessionStream:
+    """The random streams of one game."""
+
+    __slots__ = ("seed", "index", "targets", "clues")
+
+    def __init__(self, seed, index):
+        self.seed = seed
+        self.index = index
+        self.targets = keyed_random(seed, index, "targets")
+        self.clues = keyed_random(seed, index, "clues")
+
+    @property
+    def session_id(self):
+        return (seed_tag(self.seed) << 32) | self.index
+
+    def target(self, level):
+        """The next level's target; levels must be drawn in order."""
+        return self.targets.randint(1, level.range)
+
+
+class SessionStreams:
+    """Hands out numbered games under one root seed, like SeedSequence.spawn."""
+
+    def __init__(self, seed=None):
+        self.seed = new_seed() if seed is None else seed
+        self.spawned = 0
+        self._pools = {}
+
+    def claim(self):
+        """The next unused game index."""
+        self.spawned += 1
+        return self.spawned - 1
+
+    def spawn(self):
+        return SessionStream(self.seed, self.claim())
+
+    def stream(self, index):
+        """A fresh copy of game index's streams, e.g. to replay it."""
+        return SessionStream(self.seed, index)
+
+    def pool(self, difficulty):
+        """The shared TargetPool for a difficulty config's level ranges."""
+        ranges = tuple(level.range for level in level_table(difficulty))
+        if ranges not in self._pools:
+            self._pools[ranges] = TargetPool(ranges, self.seed)
+        return self._pools[ranges]
+
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+class TargetPool:
+    """Level targets for numbered games, generated POOL_BLOCK games at a time."""
+
+    def __init__(self, ranges, seed, block=POOL_BLOCK):
+        self.ranges = tuple(ranges)
+        self.seed = seed
+        self.block = block
+        # The most recently used blocks stay cached as lists of rows; older
+        # ones are regenerated on demand.
+        self._block_rows = functools.lru_cache(maxsize=POOL_CACHE)(
+            lambda number: list(map(tuple, self._generate(number).tolist())))
+
+    @classmethod
+    def for_difficulty(cls, difficulty, seed, block=POOL_BLOCK):
+        return cls((level.range for level in level_table(difficulty)), seed, block)
+
+    def _generate(self, number):
+        """Block number's targets as an array of shape (block, levels)."""
+        np = _numpy()
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(number,))
+        if max(self.ranges) < INT64_MAX:
+            highs = np.array(self.ranges, dtype=np.int64) + 1
+            return np.random.default_rng(sequence).integers(1, highs, size=(self.block, len(highs)))
+        # Past int64, draw Python ints one at a time from a generator seeded by the same child.
+        rng = random.Random(int.from_bytes(sequence.generate_state(4, np.uint64).tobytes(), "little"))
+        return np.array([[rng.randint(1, high) for high in self.ranges] for _ in range(self.block)],
+                        dtype=object)
+
+    def targets(self, index):
+        """Game index's target for every level."""
+        return self._block_rows(index // self.block)[index % self.block]
+
+    def rows(self, start, count):
+        """Targets of games start .. start+count-1 as one (count, levels) array."""
+        np = _numpy()
+        first, last = start // self.block, (start + count - 1) // self.block
+        table = np.concatenate([self._generate(number) for number in range(first, last + 1)])
+        offset = start - first * self.block
+        return table[offset:offset + count]
+
+
+STREAMS = SessionStreams()
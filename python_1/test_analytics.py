@@ -0,0 +1,56 @@
+import pytest
+
+from analytics import analyse, clue_kind_names
+from engine import difficulty_config
+from hint_rules import HINTS
+from replay_log import ReplayRecorder
+
+HARD = difficulty_config("3")
+
+
+def write_log(path, games):
+    """games: per session, (target, [(guess, attempts_left)], timed out at the end)."""
+    recorder = ReplayRecorder(path)
+    for session, (target, guesses, timed_out) in enumerate(games, 1):
+        recorder.session_id = session
+        for guess, attempts_left in guesses:
+            recorder.record(1, HARD, target, guess, attempts_left, 1.0)
+        if timed_out:
+            recorder.record_timeout(1, HARD, target, guesses[-1][1] if guesses else 5, 30.0)
+    recorder.close()
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 1000])
+def test_each_lost_level_counts_once(tmp_path, chunk_rows):
+    path = str(tmp_path / "guesses.bin")
+    write_log(path, [
+        (7, [(1, 1), (2, 0)], True),   # last miss ran past the timer: exhausted
+        (7, [(1, 1)], True),           # timer ran out with an attempt left
+        (7, [(1, 1), (2, 0)], False),  # out of attempts
+        (7, [(1, 1), (7, 1)], False),  # cleared
+    ])
+    totals = analyse([path], chunk_rows=chunk_rows)
+    assert totals["exhausted"][3, 1] == 2
+    assert totals["timeouts"][3, 1] == 1
+    assert totals["solve_attempts"][3, 1].sum() == 1
+    assert totals["bands"][3, 1].sum() == 7
+
+
+def test_clues_are_counted_by_the_rule_that_gave_them(tmp_path):
+    saved = list(HINTS.rules)
+    HINTS.add_clue_rule("fifty", lambda n, upper: n == 50, "It’s exactly half.", kind="exactly half")
+    try:
+        path = str(tmp_path / "guesses.bin")
+        recorder = ReplayRecorder(path)
+        recorder.session_id = 1
+        # Target 50 has no edge clue, so its third clue is the new rule's.
+        for clue in (0, 1, 2, 3):
+            recorder.record(1, HARD, 50, 1, 4, 1.0, clue=clue)
+        recorder.close()
+        totals = analyse([path])
+        shown = dict(zip(clue_kind_names(), totals["clues"][3].tolist()))
+        assert {kind: n for kind, n in shown.items() if n} == \
+            {"divisible by 5": 1, "half or less": 1, "exactly half": 1}
+    finally:
+        HINTS.rules[:] = saved
+        HINTS.compile()
@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+
+import pytest
+
+import autotune
+
+
+def test_parse_target():
+    assert autotune.parse_target("Hard=0.4") == ("Hard", 0.4)
+    for text in ("Huge=0.5", "Tiny=0.5", "Easy", "Easy=", "Easy=most", "Easy=1.5", "Easy=-0.1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            autotune.parse_target(text)
+
+
+def test_huge_is_rejected_on_the_command_line(capsys):
+    with pytest.raises(SystemExit):
+        autotune.main(["--target", "Huge=0.5"])
+    assert "Huge" not in capsys.readouterr().err.split("Name in")[1]
+
+
+def test_starting_config_is_on_the_grid():
+    for name in autotune.DEFAULT_TARGETS:
+        config = autotune.starting_config(name)
+        assert all(config[param] in grid for param, grid in autotune.GRID.items())
+
+
+def test_neighbours_move_one_parameter():
+    start = autotune.starting_config("Normal")
+    for step in (1, 2):
+        for neighbour in autotune.neighbours(start, step):
+            moved = [p for p in autotune.GRID if neighbour[p] != start[p]]
+            assert len(moved) == 1 and autotune.distance(neighbour, start) == step
+
+
+def test_results_are_cached_on_disk(tmp_path):
+    path = str(tmp_path / "cache.json")
+    config = autotune.starting_config("Easy")
+    tuner = autotune.Tuner(sessions=200, cache_path=path)
+    first = tuner.results([config])
+    tuner.close()
+    assert tuner.evaluations == len(autotune.PLAYER_MODELS) and tuner.hits == 0
+
+    again = autotune.Tuner(sessions=200, cache_path=path)
+    assert again.results([config]) == first
+    assert again.evaluations == 0 and again.hits == len(autotune.PLAYER_MODELS)
+
+
+def test_main_writes_the_table_where_asked(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    table = tmp_path / "out" / "table.json"
+    table.parent.mkdir()
+    autotune.main(["--target", "Easy=0.9", "--sessions", "200", "--workers", "1", "--cache", "",
+                   "--tolerance", "0.5", "--table", str(table)])
+    assert list(json.loads(table.read_text())) == ["Easy"]
+    assert [p.name for p in tmp_path.iterdir()] == ["out"]
+    assert f"written to {table}" in capsys.readouterr().out
+
+
+def test_default_table_is_next_to_the_cache():
+    assert os.path.dirname(autotune.DEFAULT_TABLE_PATH) == os.path.dirname(autotune.DEFAULT_CACHE_PATH)
@@ -0,0 +1,74 @@
+import io
+import json
+
+import batch
+
+
+def play(*messages, seed=0):
+    return list(batch.run([json.dumps(m) for m in messages], seed))
+
+
+def test_a_pinned_game_to_victory():
+    results = play({"session": "a", "start": "Easy", "targets": [4, 7, 2]},
+                   {"session": "a", "guess": 5},
+                   {"session": "a", "guess": 4, "elapsed": 2.5},
+                   {"session": "a", "guess": 7},
+                   {"session": "a", "guess": 2})
+    assert results[0] == {"session": "a", "result": "start", "difficulty": "Easy",
+                          "level": 1, "range": 8, "attempts": 10}
+    assert results[1]["result"] == "miss" and results[1]["attempts_left"] == 9
+    assert [r["result"] for r in results[2:]] == ["correct", "correct", "won"]
+    assert results[-1]["score"] == sum(r["gained"] for r in results[2:])
+    # A slower correct guess scores no more than an instant one.
+    instant = play({"session": "a", "start": "1", "targets": [4]}, {"session": "a", "guess": 4})
+    assert instant[1]["gained"] >= results[2]["gained"]
+
+
+def test_a_lost_game_reports_the_target():
+    results = play({"session": "b", "start": "Hard", "targets": [9]},
+                   *[{"session": "b", "guess": 1}] * 5)
+    assert [r.get("attempts_left") for r in results[1:5]] == [4, 3, 2, 1]
+    assert results[-1]["result"] == "lost" and results[-1]["target"] == 9
+
+
+def test_bad_elapsed_is_a_line_error_on_any_guess():
+    lines = [json.dumps({"session": "c", "start": "Easy", "targets": [4, 7, 2]}),
+             json.dumps({"session": "c", "guess": 5, "elapsed": -1}),
+             json.dumps({"session": "c", "guess": 5, "elapsed": "soon"}),
+             json.dumps({"session": "c", "guess": 5, "elapsed": True}),
+             '{"session": "c", "guess": 4, "elapsed": NaN}',
+             '{"session": "c", "guess": 4, "elapsed": Infinity}',
+             json.dumps({"session": "c", "guess": 5, "elapsed": 0})]
+    results = list(batch.run(lines))
+    for number, result in enumerate(results[1:6], 2):
+        assert result["line"] == number and result["session"] == "c"
+        assert result["error"].startswith("elapsed must be")
+    # The rejected lines used no attempts.
+    assert results[-1]["attempts_left"] == 9
+
+
+def test_bad_lines_do_not_stop_the_run():
+    lines = ["not json", "", json.dumps({"session": "d"}),
+             json.dumps({"session": "d", "guess": 3}),
+             json.dumps({"session": "d", "start": "Tiny"}),
+             json.dumps({"session": "d", "start": "2"}),
+             json.dumps({"session": "d", "guess": "3"})]
+    results = list(batch.run(lines))
+    assert [r.get("line") for r in results] == [1, 3, 4, 5, None, 7]
+    assert results[2]["error"] == "no game in progress, send start first"
+    assert results[4]["result"] == "start"
+    assert results[5]["error"] == "Please enter a valid number."
+
+
+def test_sessions_are_seeded_by_name():
+    first = play({"session": "x", "start": "Normal"}, {"session": "x", "guess": 1}, seed=3)
+    again = play({"session": "x", "start": "Normal"}, {"session": "x", "guess": 1}, seed=3)
+    assert first == again
+
+
+def test_write_results_in_blocks(monkeypatch):
+    monkeypatch.setattr(batch, "WRITE_BLOCK", 16)
+    out = io.StringIO()
+    results = [{"line": n, "error": "x"} for n in range(10)]
+    batch.write_results(iter(results), out)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == results
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import candidates
+from candidates import CandidateTracker, hint_totals, session_gains
+from hint_rules import HIGHER, HINTS, LOWER, TK_HINTS
+from replay import open_records, session_records
+from replay_log import ReplayRecorder
+from engine import difficulty_config
+
+
+def brute_force(level_range, upper, hints, heard):
+    """Targets in 1..level_range consistent with every (guess, feedback) heard."""
+    left = []
+    for target in range(1, level_range + 1):
+        ok = True
+        for guess, feedback in heard:
+            ok = (target != guess and hints.band(guess, target) == feedback.band
+                  and (feedback.direction != HIGHER or target > guess)
+                  and (feedback.direction != LOWER or target < guess)
+                  and (feedback.clue_text is None or feedback.clue_text in hints.clues(target, upper)))
+            if not ok:
+                break
+        if ok:
+            left.append(target)
+    return left
+
+
+@pytest.mark.parametrize("hints, hint_type, level_range, upper", [
+    (HINTS, "direct", 20, 20),
+    (HINTS, "mixed", 150, 100),
+    (HINTS, "riddle", 300, 100),
+    (TK_HINTS, "riddle", 100, 100),
+])
+def test_tracker_matches_brute_force(hints, hint_type, level_range, upper):
+    rng = random.Random(level_range)
+    for _ in range(30):
+        target = rng.randint(1, level_range)
+        tracker = CandidateTracker(level_range, upper, hints)
+        heard = []
+        for attempts_left in range(8, 0, -1):
+            guess = rng.randint(1, level_range)
+            if guess == target:
+                continue
+            feedback = hints.miss(hint_type, guess, target, attempts_left, upper, rng)
+            heard.append((guess, feedback))
+            gains = tracker.observe(guess, feedback)
+            expected = brute_force(level_range, upper, hints, heard)
+            assert list(tracker) == expected
+            assert tracker.count == len(expected) == gains[-1].after
+            assert target in tracker
+            assert [tracker.nth(k) for k in range(len(expected))] == expected
+
+
+def test_wide_windows_defer_clues_until_they_fit(monkeypatch):
+    monkeypatch.setattr(candidates, "BITSET_LIMIT", 64)
+    tracker = CandidateTracker(1000, 100)
+    gain = tracker.add_clue("It’s greater than 50.")
+    assert gain.after is None and not tracker.exact
+    tracker.add_direction(500, LOWER)
+    tracker.add_direction(449, HIGHER)
+    assert tracker.exact
+    assert list(tracker) == list(range(450, 500))
+
+
+def test_hint_totals_streams_interleaved_sessions(tmp_path):
+    path = str(tmp_path / "guesses.bin")
+    normal = difficulty_config("2")
+    recorder = ReplayRecorder(path)
+    # Two sessions, their records interleaved as two processes sharing a log would be.
+    for guess in (1, 2, 3):
+        for session, target in ((1, 9), (2, 4)):
+            recorder.session_id = session
+            feedback = HINTS.miss("mixed", guess, target, 7 - guess, 100)
+            recorder.record(1, normal, target, guess, 7 - guess, 0.5, feedback.direction)
+    recorder.close()
+
+    records = open_records(path)
+    totals = hint_totals(records)
+    assert totals["miss"][0] == totals["band"][0] == 6
+    shown = {}
+    for session in (1, 2):
+        for _, _, _, gains in session_gains(session_records(records, session)):
+            for gain in gains:
+                shown[gain.kind] = shown.get(gain.kind, 0) + 1
+    assert {kind: total[0] for kind, total in totals.items()} == shown
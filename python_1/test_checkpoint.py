@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+import checkpoint
+from checkpoint import (DEALT_KEY, RECORD, CheckpointBusy, CheckpointLog, GameSaves, checkpoint_for,
+                        read_log)
+from engine import difficulty_config, level_table
+from streams import SessionStreams
+
+NORMAL = difficulty_config("2")
+
+
+def saved(key, seed=7, game=0, level=1, attempts_left=5):
+    return checkpoint_for(key, seed, game, NORMAL, level, 10, attempts_left, 0, 1.0, "server")
+
+
+def test_newest_record_wins_and_drops_end_games(tmp_path):
+    path = str(tmp_path / "log.bin")
+    log = CheckpointLog(path)
+    log.save(saved(1, attempts_left=5))
+    log.save(saved(1, attempts_left=4))
+    log.save(saved(2, game=1))
+    log.drop(2, 7, 1)
+    log.close()
+
+    log = CheckpointLog(path)
+    games = log.load()
+    assert list(games) == [1] and games[1].attempts_left == 4
+    assert log.highest == {7: 1}
+    log.close()
+
+
+def test_log_has_one_writer(tmp_path):
+    path = str(tmp_path / "log.bin")
+    log = CheckpointLog(path)
+    with pytest.raises(CheckpointBusy):
+        CheckpointLog(path)
+    log.close()
+    CheckpointLog(path).close()
+
+
+def test_compaction_keeps_live_games_and_dealt_indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "MIN_COMPACT_RECORDS", 10)
+    path = str(tmp_path / "log.bin")
+    log = CheckpointLog(path)
+    for game in range(50):
+        log.save(saved(game, game=game))
+        log.drop(game, 7, game)
+    log.save(saved(99, seed=8, game=3))
+    log.flush()
+
+    games = log.load()
+    assert list(games) == [99]
+    records, _, highest = read_log(path)
+    assert records == 3
+    assert highest == {7: 49, 8: 3}
+    # Appends after compaction go to the new file.
+    log.save(saved(100, seed=8, game=4))
+    log.close()
+    assert set(read_log(path)[1]) == {99, 100}
+    assert os.path.getsize(path) == 16 + 4 * RECORD.size
+    assert not os.path.exists(path + ".compact")
+
+
+def test_corrupt_header_is_set_aside(tmp_path):
+    path = str(tmp_path / "log.bin")
+    with open(path, "wb") as f:
+        f.write(b"not a checkpoint log")
+    log = CheckpointLog(path)
+    assert log.load() == {}
+    log.save(saved(1))
+    log.close()
+    with open(path + ".corrupt", "rb") as f:
+        assert f.read() == b"not a checkpoint log"
+    assert list(read_log(path)[1]) == [1]
+
+
+def save_level(saves, stream, level, attempts_left):
+    target = stream.target(level_table(NORMAL)[level - 1])
+    saves.save(stream, NORMAL, level, target, attempts_left, 40, 2.0)
+
+
+def test_game_saves_resume_discard_and_end(tmp_path):
+    directory = str(tmp_path)
+    streams = SessionStreams(42)
+    stream = streams.spawn()
+    playing = GameSaves(directory, "cli")
+    save_level(playing, stream, 1, 7)
+    save_level(playing, stream, 2, 6)
+    # A game still being played is not offered to another launch.
+    assert GameSaves(directory, "cli").unfinished() is None
+    playing.close()
+
+    saves = GameSaves(directory, "cli")
+    offered = saves.unfinished()
+    assert (offered.level, offered.attempts_left, offered.score) == (2, 6, 40)
+    resumed = saves.resume(NORMAL)
+    assert resumed.target(level_table(NORMAL)[2]) == stream.target(level_table(NORMAL)[2])
+    save_level(saves, resumed, 3, 7)
+    saves.close()
+
+    saves = GameSaves(directory, "cli")
+    assert saves.unfinished().level == 3
+    assert GameSaves(directory, "tk").unfinished() is None
+    saves.discard()
+    assert saves.unfinished() is None
+    assert os.listdir(directory) == []
+
+    save_level(saves, streams.spawn(), 1, 7)
+    saves.end()
+    assert GameSaves(directory, "cli").unfinished() is None
+
+
+def test_dealt_key_is_not_a_game(tmp_path):
+    path = str(tmp_path / "log.bin")
+    log = CheckpointLog(path)
+    log.save(saved(1, game=5))
+    log.compact([])
+    log.close()
+    records, games, highest = read_log(path)
+    assert (records, games, highest) == (1, {}, {7: 5})
+    assert DEALT_KEY not in games
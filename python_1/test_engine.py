@@ -0,0 +1,127 @@
+import importlib.util
+import os
+import random
+import time
+import types
+
+import pytest
+
+import numberguessinggamepython as cli
+from engine import (DIFFICULTIES, LEVEL_TABLES, MAX_TARGET, Round, difficulty_config, level_info, level_score,
+                    level_table)
+from renderer import RENDERER
+from streams import SessionStream
+
+
+def test_level_tables():
+    assert [level.range for level in LEVEL_TABLES["Easy"]] == [8, 11, 15]
+    assert [level.range for level in LEVEL_TABLES["Hard"]] == [19, 33, 47, 62, 76, 90, 105]
+    for d in DIFFICULTIES:
+        table = LEVEL_TABLES[d.name]
+        assert len(table) == d.levels
+        assert [level.number for level in table] == list(range(1, d.levels + 1))
+        assert {(level.attempts, level.timer, level.hint_type, level.upper) for level in table} == {
+            (d.attempts, d.timer, d.hint_type, d.base_range)}
+        assert table[-1].range <= MAX_TARGET
+
+
+def test_tables_are_shared_per_config():
+    assert level_table(difficulty_config("2")) is LEVEL_TABLES["Normal"]
+    assert level_info(difficulty_config("2"), 3) is LEVEL_TABLES["Normal"][2]
+    untimed = level_table(difficulty_config("2", timed=False))
+    assert untimed is not LEVEL_TABLES["Normal"] and {level.timer for level in untimed} == {0}
+    assert "timer" not in difficulty_config("2", timed=False)
+
+
+def test_difficulty_config():
+    assert difficulty_config("9")["name"] == "Huge"
+    assert level_info(difficulty_config("1", base_range=1000), 3).range == 1005
+    with pytest.raises(ValueError):
+        difficulty_config("1", base_range=MAX_TARGET)
+
+
+def test_level_score():
+    assert level_score(7, 2, 0.0) == 70 + 10 + 10
+    assert level_score(7, 2, 3.9) == 70 + 10 + 7
+    assert level_score(0, 1, 60) == 5
+
+
+def test_round_clear_scores_attempts_left():
+    level = LEVEL_TABLES["Easy"][0]
+    game_round = Round(level, 5, rng=random.Random(0))
+    miss = game_round.guess(3)
+    assert not miss.cleared and not miss.lost and miss.gained == 0
+    assert miss.feedback.lines() and game_round.attempts_left == 9
+    hit = game_round.guess(5, 2.0)
+    assert hit == (True, level_score(9, 1, 2.0), None, False)
+    assert game_round.attempts_left == 9
+
+
+def test_spend_first_charges_the_clearing_guess():
+    level = LEVEL_TABLES["Easy"][0]
+    cli_round = Round(level, 5)
+    tk_round = Round(level, 5, spend_first=True)
+    assert cli_round.guess(5).gained - tk_round.guess(5).gained == 10
+    assert tk_round.attempts_left == level.attempts - 1
+
+    # The last attempt still clears, and a miss on it loses either way.
+    for spend_first in (False, True):
+        last = Round(level, 5, spend_first=spend_first, attempts_left=1)
+        assert last.guess(4).lost and last.attempts_left == 0
+        last = Round(level, 5, spend_first=spend_first, attempts_left=1)
+        assert last.guess(5).cleared
+
+
+def test_running_out_of_attempts():
+    game_round = Round(LEVEL_TABLES["Hard"][0], 10, rng=random.Random(1))
+    outcomes = [game_round.guess(1) for _ in range(5)]
+    assert [o.lost for o in outcomes] == [False] * 4 + [True]
+
+
+def test_timed_out():
+    timed = Round(LEVEL_TABLES["Normal"][0], 5)
+    assert not timed.timed_out(0) and not timed.timed_out(25)
+    assert timed.timed_out(25.01)
+    untimed = Round(level_info(difficulty_config("2", timed=False), 1), 5)
+    assert not untimed.timed_out(10 ** 6)
+
+
+def scripted(monkeypatch, module, guesses):
+    """Feed guesses to module.play_level and collect everything it prints."""
+    shown = []
+    monkeypatch.setattr(module, "slow_print", lambda text, delay=0.03: shown.append(text))
+    monkeypatch.setattr(RENDERER, "show", shown.append)
+    answers = iter(guesses)
+    return shown, lambda prompt: next(answers)
+
+
+def test_plain_cli_plays_through_the_engine(monkeypatch):
+    difficulty = cli.setup_difficulty("1")
+    target = SessionStream(7, 0).target(level_info(difficulty, 1))
+    wrong = target % 8 + 1
+    shown, ask = scripted(monkeypatch, cli, ["x", str(wrong), str(target)])
+    cleared, score = cli.play_level(1, difficulty, 100, ask, SessionStream(7, 0))
+    assert cleared and score == 100 + level_score(9, 1, 0)
+    assert "Please enter a valid number." in shown and "Attempts left: 9" in shown
+
+    shown, ask = scripted(monkeypatch, cli, [str(wrong)] * 10)
+    assert cli.play_level(1, difficulty, 100, ask, SessionStream(7, 0)) == (False, 100)
+    assert shown[-1] == "\n💀 Out of attempts! Game over."
+
+
+def test_timed_cli_rejects_a_late_guess(monkeypatch):
+    pytest.importorskip("colorama")
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import tkinter as tk.py")
+    spec = importlib.util.spec_from_file_location("timed_cli", path)
+    timed_cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(timed_cli)
+
+    difficulty = timed_cli.setup_difficulty("2")
+    assert difficulty["timer"] == 25
+    target = SessionStream(7, 0).target(level_info(difficulty, 1))
+    # The player takes 30 seconds over a correct guess.
+    late = types.SimpleNamespace(perf_counter=lambda: time.perf_counter() + 30)
+    monkeypatch.setattr(timed_cli, "time", late)
+    shown, ask = scripted(monkeypatch, timed_cli, [str(target)])
+    assert timed_cli.play_level(1, difficulty, 0, ask, SessionStream(7, 0)) == (False, 0)
+    assert shown[-1].endswith("Time’s up! You ran out of time.")
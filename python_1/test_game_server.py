@@ -0,0 +1,122 @@
+import asyncio
+
+from engine import difficulty_config
+from game_server import GameServer, read_reply
+from leaderboard import Leaderboard
+from streams import SessionStreams
+
+SEED = 99
+
+
+def targets(choice, game):
+    """The targets the server with SEED deals game number game."""
+    return SessionStreams(SEED).pool(difficulty_config(choice, timed=False)).targets(game)
+
+
+class Client:
+    def __init__(self, reader, writer, sid):
+        self.reader, self.writer, self.sid = reader, writer, sid
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        welcome = (await reader.readline()).decode("utf-8").split()
+        assert welcome[0] == "WELCOME"
+        return cls(reader, writer, int(welcome[1]))
+
+    async def send(self, line):
+        self.writer.write((line + "\n").encode("utf-8"))
+        await self.writer.drain()
+        return await read_reply(self.reader)
+
+    def close(self):
+        self.writer.close()
+
+
+def serve(scenario, **options):
+    """Run scenario(server, port) against a server on a free port."""
+    async def run():
+        server = GameServer(port=0, seed=SEED, **options)
+        await server.start()
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(server, port)
+        finally:
+            server.server.close()
+            await server.server.wait_closed()
+            server.close_checkpoints()
+    return asyncio.run(run())
+
+
+def test_a_full_game_and_error_replies(tmp_path):
+    async def scenario(server, port):
+        client = await Client.connect(port)
+        assert await client.send("GUESS 3") == ["ERROR send START first"]
+        assert await client.send("STATUS") == ["ERROR no game in progress, send START"]
+        assert await client.send("START 9") == ["ERROR choose 1, 2, 3 or 4"]
+        assert await client.send("DANCE") == ["ERROR unknown command DANCE"]
+        assert await client.send("") == ["ERROR unknown command (empty)"]
+
+        dealt = targets("1", 0)
+        assert await client.send("start 1") == ["LEVEL 1 3 8 10"]
+        assert await client.send("GUESS x") == ["ERROR Please enter a valid number."]
+        wrong = dealt[0] % 8 + 1
+        reply = await client.send(f"GUESS {wrong}")
+        assert reply[-1] == "MISS 9" and all(line.startswith("HINT ") for line in reply[:-1])
+        assert await client.send("STATUS") == ["LEVEL 1 3 8 9"]
+
+        reply = await client.send(f"GUESS {dealt[0]}")
+        assert reply[0].startswith("CORRECT ") and reply[-1] == "LEVEL 2 3 11 10"
+        await client.send(f"GUESS {dealt[1]}")
+        reply = await client.send(f"GUESS {dealt[2]}")
+        score = int(reply[0].split()[2])
+        assert reply[-1] == f"VICTORY {score}"
+        assert await client.send("QUIT") == ["BYE"]
+        assert await client.reader.readline() == b""
+        client.close()
+        return client.sid, score
+
+    path = str(tmp_path / "leaderboard.bin")
+    sid, score = serve(scenario, leaderboard_path=path)
+    assert Leaderboard(path).top("Easy")[0][:2] == (f"session-{sid}", score)
+
+
+def test_running_out_of_attempts():
+    async def scenario(server, port):
+        client = await Client.connect(port)
+        await client.send("START 3")
+        wrong = targets("3", 0)[0] % 19 + 1
+        replies = [(await client.send(f"GUESS {wrong}"))[-1] for _ in range(5)]
+        assert replies == ["MISS 4", "MISS 3", "MISS 2", "MISS 1", "LOST attempts"]
+        assert await client.send("STATUS") == ["ERROR no game in progress, send START"]
+        client.close()
+    serve(scenario)
+
+
+def test_resume_on_a_new_connection():
+    async def scenario(server, port):
+        first = await Client.connect(port)
+        await first.send("START 2")
+        await first.send(f"GUESS {targets('2', 0)[0] % 15 + 1}")
+        first.close()
+
+        second = await Client.connect(port)
+        assert await second.send("RESUME 12345") == ["ERROR unknown or expired session"]
+        assert await second.send(f"RESUME {first.sid}") == [f"WELCOME {first.sid}", "LEVEL 1 5 15 6"]
+        reply = await second.send(f"GUESS {targets('2', 0)[0]}")
+        assert reply[-1] == "LEVEL 2 5 25 7"
+        second.close()
+    serve(scenario)
+
+
+def test_expired_session_gets_a_new_id():
+    async def scenario(server, port):
+        client = await Client.connect(port)
+        await client.send("START 1")
+        server.store.release(client.sid)
+        reply = await client.send("STATUS")
+        assert reply[0].startswith("WELCOME ") and int(reply[0].split()[1]) != client.sid
+        assert reply[1:] == ["ERROR session expired, send START"]
+        assert await client.send("START 1") == ["LEVEL 1 3 8 10"]
+        client.close()
+    serve(scenario)
@@ -0,0 +1,107 @@
+import random
+
+import numpy as np
+import pytest
+
+from hint_rules import HIGHER, HINTS, LOWER, NO_DIRECTION, TK_HINTS, HintEngine
+
+
+# The if/elif hint functions the CLIs and the Tk app had before the rule engine.
+def old_is_prime(n):
+    if n < 2:
+        return False
+    for i in range(2, int(n ** 0.5) + 1):
+        if n % i == 0:
+            return False
+    return True
+
+
+def old_property_clue(number):
+    if old_is_prime(number):
+        return "It’s a prime number."
+    elif int(number ** 0.5) ** 2 == number:
+        return "It’s a perfect square."
+    elif number % 5 == 0:
+        return "It’s divisible by 5."
+    elif number % 3 == 0:
+        return "It’s divisible by 3."
+    elif number % 2 == 0:
+        return "It’s an even number."
+    return "It’s an odd number."
+
+
+def old_riddle_clues(number):
+    clues = [old_property_clue(number)]
+    clues.append("It’s greater than 50." if number > 50 else "It’s 50 or less.")
+    if number < 10:
+        clues.append("It’s a single-digit number.")
+    elif number >= 90:
+        clues.append("It’s close to 100.")
+    return clues
+
+
+def old_adaptive_hint(guess, target):
+    diff = abs(guess - target)
+    if diff == 0:
+        return "🎯 Spot on!"
+    elif diff <= 3:
+        return "🔥 Super hot!"
+    elif diff <= 10:
+        return "🌡️ Getting warm."
+    elif diff <= 20:
+        return "❄️ A bit chilly."
+    return "🥶 Freezing cold."
+
+
+def test_clues_match_the_old_hint_functions():
+    for number in range(1, 2001):
+        assert list(HINTS.clues(number, 100)) == old_riddle_clues(number)
+        assert list(TK_HINTS.clues(number, 100)) == old_riddle_clues(number)[:2]
+
+
+def test_bands_and_directions_match_the_old_hints():
+    rng = random.Random(3)
+    pairs = [(rng.randint(-50, 200), rng.randint(1, 150)) for _ in range(5000)]
+    guesses, targets = np.array(pairs).T
+    assert [HINTS.band_text(g, t) for g, t in pairs] == [old_adaptive_hint(g, t) for g, t in pairs]
+    assert HINTS.band_text_array(HINTS.bands(guesses, targets)).tolist() == \
+        [old_adaptive_hint(g, t) for g, t in pairs]
+    for attempts_left in (1, 2):
+        batch = HINTS.directions("mixed", guesses, targets, attempts_left)
+        one = [HINTS.direction("mixed", g, t, attempts_left) for g, t in pairs]
+        assert batch.tolist() == one
+        shown = attempts_left % 2 == 0
+        assert set(one) <= ({NO_DIRECTION, HIGHER, LOWER} if shown else {NO_DIRECTION})
+    assert not HINTS.directions("riddle", guesses, targets, 2).any()
+
+
+@pytest.mark.parametrize("engine", [HINTS, TK_HINTS])
+@pytest.mark.parametrize("upper", [100, 1000, 10 ** 18])
+def test_batch_clues_match_one_at_a_time(engine, upper):
+    rng = random.Random(upper)
+    targets = np.array([rng.randint(1, min(upper, 1 << 62)) for _ in range(3000)] + [1, 2, 9, 10, upper],
+                       dtype=np.uint64)
+    table = engine.clue_table(targets, upper)
+    rules = engine.clue_rules(targets, upper)
+    for target, clues, row in zip(targets.tolist(), table, rules.tolist()):
+        assert clues == engine.clues(target, upper)
+        assert sum(rule >= 0 for rule in row) == len(clues)
+
+
+def test_batch_clues_take_an_upper_per_target():
+    targets = np.array([60, 60, 5])
+    uppers = np.array([100, 200, 100])
+    table = HINTS.clue_table(targets, uppers)
+    assert table.tolist() == [HINTS.clues(60, 100), HINTS.clues(60, 200), HINTS.clues(5, 100)]
+
+
+def test_added_rules_reach_scalar_and_batch_clues():
+    engine = HintEngine()
+    engine.add_clue_rule("teens", lambda n, upper: (n >= 13) & (n <= 19), "It’s in its teens.")
+    assert engine.clues(15, 100)[-1] == "It’s in its teens."
+    assert engine.clues(25, 100) == HINTS.clues(25, 100)
+    rules = engine.clue_rules(np.array([15, 5, 95]), 100)
+    kinds = [[engine.rules[rule].kind for rule in row if rule >= 0] for row in rules.tolist()]
+    assert kinds == [["divisible by 5", "half or less", "It’s in its teens."],
+                     ["prime", "half or less", "single digit"],
+                     ["divisible by 5", "above half", "close to top"]]
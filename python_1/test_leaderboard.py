@@ -0,0 +1,86 @@
+import os
+
+import leaderboard
+from leaderboard import RECORD, Leaderboard
+
+
+def log_size(path):
+    return os.path.getsize(path) // RECORD.size
+
+
+def test_top_is_ranked_and_survives_reload(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    board = Leaderboard(path, keep=3)
+    for i, score in enumerate([5, 40, 12, 40, 7]):
+        board.record("Hard", score, f"p{i}", timestamp=i)
+    board.close()
+
+    # Ties keep the older entry first.
+    expected = [("p1", 40, 1), ("p3", 40, 3), ("p2", 12, 2)]
+    assert board.top("Hard") == expected
+    assert Leaderboard(path, keep=3).top("Hard") == expected
+    assert board.top("Easy") == []
+
+
+def test_compaction_keeps_only_board_records(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    board = Leaderboard(path, keep=10, compact_ratio=2)
+    for i in range(100):
+        board.record("Normal", i, "p", timestamp=i)
+    board.close()
+
+    assert log_size(path) <= 2 * 10
+    assert [score for _, score, _ in Leaderboard(path, keep=10).top("Normal")] == list(range(99, 89, -1))
+
+
+def test_compaction_keeps_other_writers_records(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    first = Leaderboard(path, keep=10, compact_ratio=2)
+    second = Leaderboard(path, keep=10, compact_ratio=2)
+    second.record("Easy", 1000, "other", timestamp=0.5)
+    second.flush()
+
+    # first compacts, then second appends to the replaced log.
+    for i in range(50):
+        first.record("Easy", i, "me", timestamp=i + 1)
+    first.flush()
+    second.record("Easy", 999, "other", timestamp=100)
+    second.close()
+    first.close()
+
+    top = Leaderboard(path, keep=10).top("Easy", 2)
+    assert top == [("other", 1000, 0.5), ("other", 999, 100)]
+
+
+def test_partial_record_is_truncated(tmp_path):
+    path = str(tmp_path / "lb.bin")
+    board = Leaderboard(path)
+    board.record("Huge", 3, "p", timestamp=1)
+    board.close()
+    with open(path, "ab") as f:
+        f.write(b"\0" * (RECORD.size // 2))
+
+    board = Leaderboard(path)
+    board.record("Huge", 4, "p", timestamp=2)
+    board.close()
+    assert log_size(path) == 2
+    assert Leaderboard(path).top("Huge") == [("p", 4, 2), ("p", 3, 1)]
+
+
+def test_record_score_ranks_the_new_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard, "_default_board", None)
+    path = str(tmp_path / "lb.bin")
+    assert leaderboard.record_score("Easy", 50, "ann", path) == 1
+    assert leaderboard.record_score("Easy", 80, "bob", path) == 1
+    # The same player and score again ranks below the older tie.
+    assert leaderboard.record_score("Easy", 50, "ann", path) == 3
+    leaderboard._default_board.close()
+
+
+def test_record_score_on_a_given_board(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard, "_default_board", None)
+    board = Leaderboard(str(tmp_path / "lb.bin"))
+    assert leaderboard.record_score("Hard", 70, "cy", board=board) == 1
+    assert leaderboard._default_board is None
+    assert Leaderboard(str(tmp_path / "lb.bin")).top("Hard")[0][:2] == ("cy", 70)
+    board.close()
@@ -0,0 +1,37 @@
+import os
+
+from metrics import DEFAULT_INTERVAL, ENV_INTERVAL, Metrics, env_interval, parse
+
+
+def test_write_round_trips(tmp_path):
+    path = str(tmp_path / "guess.prom")
+    recorder = Metrics(path)
+    recorder.observe("level", 0.002)
+    recorder.count("level_cleared", 3)
+    recorder.write()
+    histograms, counters = parse([path])
+    assert counters == {"level_cleared": 3}
+    assert sum(histograms["level"][0]) == 1
+
+
+def test_failed_export_is_logged_and_leaves_no_temp_file(tmp_path, monkeypatch, caplog):
+    path = str(tmp_path / "guess.prom")
+    recorder = Metrics(path)
+
+    def fail(src, dst):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(os, "replace", fail)
+    recorder._export()
+    assert "metrics export to" in caplog.text
+    assert os.listdir(tmp_path) == []
+
+
+def test_bad_interval_falls_back_to_default(monkeypatch, caplog):
+    for text in ("abc", "0", "-5", "nan", "inf"):
+        monkeypatch.setenv(ENV_INTERVAL, text)
+        assert env_interval() == DEFAULT_INTERVAL
+    assert ENV_INTERVAL in caplog.text
+    monkeypatch.setenv(ENV_INTERVAL, "2.5")
+    assert env_interval() == 2.5
+    monkeypatch.delenv(ENV_INTERVAL)
+    assert env_interval() == DEFAULT_INTERVAL
@@ -0,0 +1,47 @@
+import pytest
+
+from engine import DIFFICULTIES
+from numberguessinggamepython import setup_difficulty
+from par_table import (SEARCH_LIMIT, RangeSolver, ScoreSolver, level_entry, load_table, normalize_score,
+                       run_par)
+
+
+@pytest.mark.parametrize("level_range", [1, 2, 8, 15, 40, 60])
+@pytest.mark.parametrize("attempts", [1, 3, 5])
+def test_range_solver_matches_full_search(level_range, attempts):
+    full = ScoreSolver("direct", attempts, 100, 5).value(tuple(range(1, level_range + 1)), attempts)
+    p_win, points = RangeSolver(attempts, 5).value(level_range, attempts)
+    assert p_win == pytest.approx(full[0])
+    assert points == pytest.approx(full[1])
+
+
+def test_every_difficulty_has_a_par():
+    table = load_table()
+    for difficulty in DIFFICULTIES:
+        assert run_par(difficulty.name, table) > 0
+    assert normalize_score(run_par("Huge", table), "Huge", table) == pytest.approx(1.0)
+
+
+def test_table_matches_a_rebuild():
+    table = load_table()
+    for choice, level in (("1", 2), ("2", 1)):
+        difficulty = setup_difficulty(choice)
+        row = table["difficulties"][difficulty["name"]]["levels"][level - 1]
+        assert level_entry(difficulty, level) == row
+
+
+@pytest.mark.parametrize("attempts", [3, 5])
+def test_windowed_range_solver_matches_full_search(attempts):
+    # Just above SEARCH_LIMIT, RangeSolver only tries SEARCH_WINDOW guesses below the middle.
+    level_range = SEARCH_LIMIT + 12
+    full = ScoreSolver("direct", attempts, 100, 5).value(tuple(range(1, level_range + 1)), attempts)
+    p_win, points = RangeSolver(attempts, 5).value(level_range, attempts)
+    assert p_win == pytest.approx(full[0])
+    assert points == pytest.approx(full[1])
+
+
+def test_win_probability_is_never_above_one():
+    for info in load_table()["difficulties"].values():
+        for row in info["levels"]:
+            assert 0 <= row["optimal"]["win_probability"] <= 1.0
+    assert RangeSolver(64, 15).value(10 ** 18, 64)[0] == 1.0
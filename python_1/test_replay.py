@@ -0,0 +1,84 @@
+import pytest
+
+import replay
+from engine import MAX_TARGET, difficulty_config, level_table, new_round
+from replay_log import ReplayRecorder
+from streams import SessionStreams
+
+HARD = difficulty_config("3", timed=False)
+
+
+def play(recorder, stream, guesses_per_level):
+    """Play stream's game on Hard, guessing 1, 2, ... then the target; return the score."""
+    recorder.start_session(stream)
+    score = 0
+    for level, misses in zip(level_table(HARD), guesses_per_level):
+        game_round = new_round(level, stream)
+        for guess in range(1, misses + 1):
+            if guess == game_round.target:
+                break
+            outcome = game_round.guess(guess, 1.0)
+            recorder.record(level.number, HARD, game_round.target, guess, game_round.attempts_left, 1.0,
+                            outcome.feedback.direction, outcome.feedback.clue)
+        outcome = game_round.guess(game_round.target, 3.0)
+        recorder.record(level.number, HARD, game_round.target, game_round.target,
+                        game_round.attempts_left, 3.0)
+        score += outcome.gained
+    return score
+
+
+def test_replay_rebuilds_hints_and_score(tmp_path):
+    path = str(tmp_path / "guesses.bin")
+    recorder = ReplayRecorder(path)
+    stream = SessionStreams(5).spawn()
+    score = play(recorder, stream, [2, 3, 0])
+    recorder.close()
+
+    records = replay.open_records(path)
+    rows = replay.session_records(records, stream.session_id)
+    lines, replayed = replay.replay_session(rows)
+    assert replayed == score
+    assert lines[0].startswith("Level 1 — Range: 1 to")
+    assert sum(line.startswith("> ") for line in lines) == len(rows)
+    assert lines[-1].startswith("🏅 You earned")
+    assert replay.verify(records) == 0
+
+
+def test_replay_rejects_a_tampered_hint(tmp_path):
+    path = str(tmp_path / "guesses.bin")
+    recorder = ReplayRecorder(path)
+    stream = SessionStreams(5).spawn()
+    play(recorder, stream, [2])
+    recorder.close()
+    rows = replay.session_records(replay.open_records(path), stream.session_id).copy()
+    rows["band"][0] = (rows["band"][0] + 1) % 5
+    with pytest.raises(ValueError):
+        replay.replay_session(rows)
+
+
+@pytest.mark.parametrize("rows", [1, 3, 1 << 20])
+def test_audit_targets_flags_sessions_the_seed_did_not_deal(tmp_path, rows):
+    path = str(tmp_path / "guesses.bin")
+    recorder = ReplayRecorder(path)
+    streams = SessionStreams(11)
+    for _ in range(4):
+        play(recorder, streams.spawn(), [1, 1])
+    # Another seed sharing the file is not this seed's to check.
+    play(recorder, SessionStreams(12).spawn(), [1])
+    # A game whose first target was tampered with.
+    forged = streams.spawn()
+    recorder.start_session(forged)
+    level = level_table(HARD)[0]
+    recorder.record(1, HARD, forged.target(level) % level.range + 1, 1, 4, 1.0)
+    recorder.close()
+
+    records = replay.open_records(path)
+    assert replay.logged_seeds(records) == [11, 12]
+    assert replay.audit_targets(records, 11, rows) == (5, 1)
+    assert replay.audit_targets(records, 12, rows) == (1, 0)
+
+
+def test_targets_must_fit_the_log():
+    assert level_table(difficulty_config("4", base_range=MAX_TARGET - 10))[-1].range <= MAX_TARGET
+    with pytest.raises(ValueError):
+        difficulty_config("4", base_range=MAX_TARGET)
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import session_store
+from session_store import SLOT_BITS, SLOT_MASK, SPILL_RECORD, SessionStore
+
+
+def new_session(store, score, now=0.0):
+    sid = store.create(now)
+    store.columns["score"][sid & SLOT_MASK] = score
+    return sid
+
+
+def score_of(store, sid, now=100.0):
+    sid, slot = store.resolve(sid, now)
+    return store.columns["score"][slot]
+
+
+def test_released_ids_are_not_reused():
+    store = SessionStore()
+    sid = store.create(0.0)
+    store.release(sid)
+    reused = store.create(0.0)
+    assert reused & SLOT_MASK == sid & SLOT_MASK
+    assert reused >> SLOT_BITS == (sid >> SLOT_BITS) + 1
+    with pytest.raises(KeyError):
+        store.resolve(sid)
+
+
+def test_idle_sessions_spill_and_restore(tmp_path):
+    store = SessionStore(idle_timeout=10.0, spill_path=str(tmp_path / "spill.bin"))
+    idle = [new_session(store, score) for score in range(5)]
+    busy = new_session(store, 99, now=50.0)
+
+    assert store.evict_idle(now=55.0) == 5
+    assert len(store) == 1
+    assert score_of(store, busy) == 99
+    # Refill the freed slots, so restores must not read their new occupants.
+    others = [new_session(store, 1000 + i, now=60.0) for i in range(5)]
+    for score, sid in enumerate(idle):
+        assert score_of(store, sid) == score
+        with pytest.raises(KeyError):
+            store.resolve(sid)
+    assert [score_of(store, sid) for sid in others] == [1000 + i for i in range(5)]
+    store.close()
+
+
+def test_spill_chain_finds_every_generation_of_a_slot(tmp_path):
+    store = SessionStore(idle_timeout=0.0, spill_path=str(tmp_path / "spill.bin"))
+    spilled = []
+    for score in range(4):
+        spilled.append(new_session(store, score))
+        store.evict_idle(now=1.0)
+    assert len({sid & SLOT_MASK for sid in spilled}) == 1
+    store.release(spilled[1])
+    for score in (3, 0, 2):
+        assert score_of(store, spilled[score]) == score
+    with pytest.raises(KeyError):
+        store.resolve(spilled[1])
+    store.close()
+
+
+def test_spill_file_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "MIN_COMPACT_RECORDS", 10)
+    path = str(tmp_path / "spill.bin")
+    store = SessionStore(idle_timeout=0.0, spill_path=path)
+    sids = [new_session(store, score) for score in range(100)]
+    store.evict_idle(now=1.0)
+    for sid in sids[:90]:
+        store.release(sid)
+
+    assert os.path.getsize(path) < 50 * SPILL_RECORD.size
+    assert [score_of(store, sid) for sid in sids[90:]] == list(range(90, 100))
+    store.close()
+
+
+def test_budget_is_enforced_when_adopting(tmp_path):
+    store = SessionStore(idle_timeout=10.0, spill_path=str(tmp_path / "spill.bin"))
+    idle = [new_session(store, score) for score in range(10)]
+    store.memory_budget = store.memory_bytes()
+
+    store.adopt([(3 << SLOT_BITS) | 20], now=100.0)
+    assert store.evicted == 10
+    assert score_of(store, idle[4], now=101.0) == 4
+    store.close()
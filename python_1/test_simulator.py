@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import simulator
+from engine import difficulty_config
+from numberguessinggamepython import setup_difficulty
+
+
+def test_bisect_always_wins_easy():
+    report = simulator.simulate(setup_difficulty("1"), 2_000, seed=1)
+    assert report["win_rate"] == 1.0
+    assert [row["clear_rate"] for row in report["levels"]] == [1.0, 1.0, 1.0]
+    assert [row["timeouts"] for row in report["levels"]] == [0, 0, 0]
+    # Range 8 with direction after every miss: never more than 4 guesses.
+    assert sum(report["levels"][0]["attempts_used"][5:]) == 0
+
+
+def test_win_rate_counts_only_full_runs():
+    report = simulator.simulate(setup_difficulty("3"), 5_000, seed=2, strategy="random")
+    levels = report["levels"]
+    assert 0 < report["win_rate"] < 1
+    assert levels[0]["reached"] == 5_000
+    for row, after in zip(levels, levels[1:]):
+        assert after["reached"] == round(row["reached"] * row["clear_rate"])
+    assert report["win_rate"] == pytest.approx(levels[-1]["reached"] * levels[-1]["clear_rate"] / 5_000)
+
+
+def test_same_seed_same_report():
+    difficulty = setup_difficulty("2")
+    assert simulator.simulate(difficulty, 3_000, seed=5) == simulator.simulate(difficulty, 3_000, seed=5)
+
+
+def test_a_late_guess_is_a_timeout():
+    difficulty = dict(setup_difficulty("1"), timer=5)
+    # The bisect player's first guess on Easy level 1 is 4, so target 4 is hit at once.
+    targets = np.full(1_000, 4)
+    won, gained, used, timed_out = simulator.simulate_level(
+        1, difficulty, targets, np.random.default_rng(0), think_time=0.001)
+    assert won.all() and not timed_out.any() and (used == 1).all()
+    # The same guess made after the timer ran out does not count.
+    won, gained, used, timed_out = simulator.simulate_level(
+        1, difficulty, targets, np.random.default_rng(0), think_time=1000)
+    assert (won ^ timed_out).all() and timed_out.mean() > 0.9
+    assert (used[timed_out] == 0).all() and (gained[timed_out] == 0).all()
+
+
+def test_timeouts_end_runs():
+    report = simulator.simulate(difficulty_config("2"), 5_000, seed=3, think_time=8.0)
+    untimed = simulator.simulate(setup_difficulty("2"), 5_000, seed=3, think_time=8.0)
+    assert report["levels"][0]["timeouts"] > 0
+    assert report["win_rate"] < untimed["win_rate"]
+    assert all(row["timeouts"] == 0 for row in untimed["levels"])
+
+
+def test_timer_options(capsys):
+    simulator.main(["--difficulty", "Normal", "--sessions", "2000", "--seed", "3", "--think-time", "8"])
+    untimed = capsys.readouterr().out
+    simulator.main(["--difficulty", "Normal", "--sessions", "2000", "--seed", "3", "--think-time", "8",
+                    "--timed"])
+    timed = capsys.readouterr().out
+    simulator.main(["--difficulty", "Normal", "--sessions", "2000", "--seed", "3", "--think-time", "8",
+                    "--timed", "--timer", "25"])
+    assert "timeouts 0," in untimed and "timeouts 0," not in timed.splitlines()[3]
+    assert capsys.readouterr().out == timed
@@ -0,0 +1,45 @@
+import pytest
+
+from hint_rules import HINTS
+from solver import EPSILON, main, min_attempts_to_win, solve_level
+
+
+def play(root, target, hint_type):
+    """Follow the tree against target; return the attempts used, or None if lost."""
+    node, used = root, 0
+    while node.guess is not None:
+        used += 1
+        if node.guess == target:
+            return used
+        if node.attempts_left <= 1:
+            return None
+        higher = None
+        if HINTS.shows_direction(hint_type, node.attempts_left - 1):
+            higher = target > node.guess
+        node = node.child(HINTS.band_text(node.guess, target), higher)
+    return None
+
+
+@pytest.mark.parametrize("hint_type, level_range, attempts", [
+    ("direct", 15, 3), ("direct", 40, 4), ("mixed", 30, 4), ("mixed", 55, 7),
+])
+def test_tree_plays_to_its_value(hint_type, level_range, attempts):
+    root = solve_level(level_range, attempts, hint_type)
+    results = [play(root, target, hint_type) for target in range(1, level_range + 1)]
+    won = [used for used in results if used is not None]
+    assert len(won) / level_range == pytest.approx(root.win_probability)
+    if len(won) == level_range:
+        assert sum(won) / level_range == pytest.approx(root.expected_attempts)
+
+
+def test_min_attempts_to_win():
+    assert min_attempts_to_win(1, "direct") == 1
+    assert min_attempts_to_win(3, "direct") == 2
+    assert solve_level(8, 2, "direct").win_probability < 1 - EPSILON
+    assert min_attempts_to_win(100, "direct", limit=2) is None
+
+
+def test_main_explains_levels_too_big_to_enumerate(capsys):
+    main(["--difficulty", "4"])
+    out = capsys.readouterr().out
+    assert out.startswith("Huge:") and "too many to enumerate" in out
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import replay
+from engine import difficulty_config, level_table
+from replay_log import ReplayRecorder
+from streams import ENV_SEED, SessionStream, SessionStreams, TargetPool, new_seed, seed_tag
+
+NORMAL = difficulty_config("2")
+
+
+def dealt(stream, difficulty=NORMAL):
+    return [stream.target(level) for level in level_table(difficulty)]
+
+
+def test_session_streams_replay_from_seed_and_index():
+    first, second = SessionStreams(42), SessionStreams(42)
+    games = [dealt(first.spawn()) for _ in range(20)]
+    assert games == [dealt(second.spawn()) for _ in range(20)]
+    assert dealt(first.stream(7)) == games[7]
+    assert len(set(map(tuple, games))) > 1
+    assert games != [dealt(SessionStreams(43).spawn()) for _ in range(20)]
+
+
+def test_session_id_carries_tag_and_index():
+    stream = SessionStreams(42).stream(5)
+    assert stream.session_id == (seed_tag(42) << 32) | 5
+    assert stream.clues.random() == SessionStream(42, 5).clues.random()
+
+
+def test_new_seed_reads_env(monkeypatch):
+    monkeypatch.setenv(ENV_SEED, "123")
+    assert new_seed() == 123
+    monkeypatch.setenv(ENV_SEED, str(1 << 64))
+    with pytest.raises(ValueError):
+        new_seed()
+    monkeypatch.delenv(ENV_SEED)
+    assert new_seed() != new_seed()
+
+
+def test_target_pool_rows_depend_only_on_seed_and_index():
+    ranges = tuple(level.range for level in level_table(NORMAL))
+    pool, other = TargetPool(ranges, 9, block=16), TargetPool(ranges, 9, block=16)
+    # Drawing games in another order deals each the same row.
+    backwards = {i: other.targets(i) for i in reversed(range(40))}
+    assert [pool.targets(i) for i in range(40)] == [backwards[i] for i in range(40)]
+    rows = pool.rows(10, 20)
+    assert rows.tolist() == [list(pool.targets(i)) for i in range(10, 30)]
+    assert np.all((rows >= 1) & (rows <= np.array(ranges)))
+    assert pool.targets(3) != TargetPool(ranges, 10, block=16).targets(3)
+
+
+def test_recorder_logs_the_full_seed(tmp_path):
+    path = str(tmp_path / "guesses.bin")
+    seed = (1 << 64) - 5
+    streams = SessionStreams(seed)
+    recorder = ReplayRecorder(path)
+    for _ in range(3):
+        stream = streams.spawn()
+        recorder.start_session(stream)
+        level = level_table(NORMAL)[0]
+        target = stream.target(level)
+        recorder.record(1, NORMAL, target, target, 5, 1.0)
+    recorder.close()
+
+    records = replay.open_records(path)
+    assert replay.logged_seeds(records) == [seed]
+    assert sum(len(chunk) for chunk in replay.chunks(records)) == 3
+    assert replay.audit_targets(records, seed) == (3, 0)
@@ -0,0 +1,81 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+import timed_input
+from timed_input import InputTimeout, TkCountdown, read_line
+
+
+def test_piped_line_is_read_then_checked_against_the_deadline():
+    out = io.StringIO()
+    assert read_line("> ", time.perf_counter() + 60, out, io.StringIO("42\n")) == "42"
+    assert out.getvalue() == "> "
+    with pytest.raises(InputTimeout):
+        read_line("> ", time.perf_counter() - 1, out, io.StringIO("42\n"))
+    with pytest.raises(EOFError):
+        read_line("> ", time.perf_counter() + 60, out, io.StringIO(""))
+
+
+def test_edit_applies_backspace_and_stops_at_enter():
+    assert timed_input._edit("", "12\x7f3\rignored") == ("13", True)
+    assert timed_input._edit("4", "5") == ("45", False)
+    with pytest.raises(EOFError):
+        timed_input._edit("", "\x04")
+
+
+@pytest.mark.skipif(timed_input.termios is None or not hasattr(os, "openpty"), reason="needs a pty")
+def test_terminal_prompt_gives_up_at_the_deadline():
+    master, slave = os.openpty()
+    with os.fdopen(slave, "r") as stdin:
+        os.write(master, b"7")
+        deadline = time.perf_counter() + 0.2
+        with pytest.raises(InputTimeout):
+            read_line("> ", deadline, io.StringIO(), stdin)
+        assert time.perf_counter() - deadline < 0.05
+
+        # Typed once the prompt is up, so the terminal is already in cbreak mode.
+        threading.Timer(0.05, os.write, (master, b"19\x7f8\n")).start()
+        out = io.StringIO()
+        assert read_line("> ", time.perf_counter() + 5, out, stdin) == "18"
+        assert "⏳" in out.getvalue()
+    os.close(master)
+
+
+class FakeRoot:
+    def __init__(self):
+        self.jobs = {}
+
+    def after(self, ms, callback):
+        self.jobs[len(self.jobs)] = callback
+        return len(self.jobs) - 1
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+
+class FakeLabel:
+    text = None
+
+    def config(self, text):
+        self.text = text
+
+
+def test_tk_countdown_ticks_expires_and_cancels(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "perf_counter", lambda: now[0])
+    root, label, expired = FakeRoot(), FakeLabel(), []
+    countdown = TkCountdown(root, label, 101.0, lambda: expired.append(True))
+    assert label.text == "⏳ Time left: 1.0 sec"
+    now[0] = 100.55
+    root.jobs.pop(countdown._job)()
+    assert label.text == "⏳ Time left: 0.5 sec" and not expired
+    now[0] = 101.0
+    root.jobs.pop(countdown._job)()
+    assert expired and countdown._job is None
+
+    countdown = TkCountdown(root, label, 105.0, lambda: expired.append(False))
+    countdown.cancel()
+    assert root.jobs == {} and label.text == ""
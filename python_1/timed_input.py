@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+
+try:
+    import select
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# ================================
+# Deadline-Enforced Input
+# ================================
+# Reads a line of input but gives up at a deadline instead of waiting forever.
+# On a terminal the prompt is redrawn with a live countdown while the player
+# types, and the wait ends within a few milliseconds of the deadline.
+# Deadlines are time.perf_counter() values. For piped (non-terminal) input the
+# line is read normally and the deadline is checked once it arrives, because
+# scripted input has no one typing.
+#
+# TkCountdown gives the Tk app the same countdown through root.after, so
+# nothing blocks its event loop.
+
+TICK = 0.1
+
+
+class InputTimeout(Exception):
+    """The player did not finish their line before the deadline."""
+
+
+def read_line(prompt, deadline, stream=None, stdin=None):
+    """Read one line before deadline or raise InputTimeout."""
+    stream = stream or sys.stdout
+    stdin = stdin or sys.stdin
+    try:
+        interactive = stdin.isatty()
+    except (AttributeError, ValueError):
+        interactive = False
+
+    if interactive and msvcrt is not None:
+        return _read_console(prompt, deadline, stream)
+    if interactive and termios is not None:
+        return _read_tty(prompt, deadline, stream, stdin)
+
+    stream.write(prompt)
+    stream.flush()
+    line = stdin.readline()
+    if not line:
+        raise EOFError
+    if time.perf_counter() > deadline:
+        raise InputTimeout
+    return line.rstrip("\n")
+
+
+def _draw(stream, prompt, remaining, buffer):
+    stream.write(f"\r⏳ {max(0.0, remaining):4.1f}s  {prompt}{buffer}\x1b[K")
+    stream.flush()
+
+
+def _edit(buffer, text):
+    """Apply typed characters; return (buffer, finished)."""
+    for char in text:
+        if char in "\r\n":
+            return buffer, True
+        elif char in "\x7f\b":
+            buffer = buffer[:-1]
+        elif char == "\x04" and not buffer:
+            raise EOFError
+        elif char.isprintable():
+            buffer += char
+    return buffer, False
+
+
+def _read_tty(prompt, deadline, stream, stdin):
+    fd = stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    buffer = ""
+    shown = None
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                _draw(stream, prompt, 0.0, buffer)
+                stream.write("\n")
+                raise InputTimeout
+            if shown != (round(remaining, 1), buffer):
+                shown = (round(remaining, 1), buffer)
+                _draw(stream, prompt, remaining, buffer)
+            ready, _, _ = select.select([fd], [], [], min(TICK, remaining))
+            if ready:
+                buffer, finished = _edit(buffer, os.read(fd, 1024).decode("utf-8", "ignore"))
+                if finished:
+                    stream.write("\n")
+                    return buffer
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def _read_console(prompt, deadline, stream):
+    buffer = ""
+    shown = None
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            _draw(stream, prompt, 0.0, buffer)
+            stream.write("\n")
+            raise InputTimeout
+        if shown != (round(remaining, 1), buffer):
+            shown = (round(remaining, 1), buffer)
+            _draw(stream, prompt, remaining, buffer)
+        if msvcrt.kbhit():
+            buffer, finished = _edit(buffer, msvcrt.getwch())
+            if finished:
+                stream.write("\n")
+                return buffer
+        else:
+            time.sleep(0.002)
+
+
+class TkCountdown:
+    """Live countdown on a Tk label that calls on_expire at the deadline."""
+
+    def __init__(self, root, label, deadline, on_expire, tick_ms=100):
+        self.root = root
+        self.label = label
+        self.deadline = deadline
+        self.on_expire = on_expire
+        self.tick_ms = tick_ms
+        self._job = None
+        self._tick()
+
+    def _tick(self):
+        remaining = self.deadline - time.perf_counter()
+        if remaining <= 0:
+            self._job = None
+            self.label.config(text="⏳ Time left: 0.0 sec")
+            self.on_expire()
+            return
+        self.label.config(text=f"⏳ Time left: {remaining:.1f} sec")
+        wait = min(self.tick_ms, max(1, int(remaining * 1000)))
+        self._job = self.root.after(wait, self._tick)
+
+    def cancel(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self.label.config(text="")
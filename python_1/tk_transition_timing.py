@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+from leaderboard import Leaderboard
+from numberguessgame20 import NumberGuessingGame
+
+# ================================
+# Tk Screen Transition Timing
+# ================================
+# Times each screen change of NumberGuessingGame, including the layout and
+# redraw Tk does before the frame is visible (update_idletasks). Run under a
+# real or virtual display, e.g. `xvfb-run python3 tk_transition_timing.py`.
+# --json prints the summary as JSON instead, for bench_suite.py. The victories
+# it stages are recorded on a throwaway leaderboard, not the player's.
+
+
+def time_call(root, action):
+    start = time.perf_counter()
+    action()
+    root.update_idletasks()
+    return time.perf_counter() - start
+
+
+def measure(rounds, difficulty="Hard"):
+    with tempfile.TemporaryDirectory() as directory:
+        board = Leaderboard(os.path.join(directory, "leaderboard.bin"))
+        try:
+            return measure_transitions(rounds, difficulty, board)
+        finally:
+            board.close()
+
+
+def measure_transitions(rounds, difficulty, board):
+    root = tk.Tk()
+    game = NumberGuessingGame(root, board=board)
+    root.update()
+
+    timings = {"welcome -> game": [], "level -> level": [], "game -> victory": [],
+               "victory -> welcome": []}
+    for _ in range(rounds):
+        timings["welcome -> game"].append(time_call(root, lambda: game.start_game(difficulty)))
+        for _ in range(1, game.difficulty["levels"]):
+            game.level += 1
+            timings["level -> level"].append(time_call(root, game.start_level))
+        timings["game -> victory"].append(time_call(root, game.show_victory_screen))
+        timings["victory -> welcome"].append(time_call(root, game.build_welcome_screen))
+        root.update()
+
+    widgets = len(root.winfo_children())
+    root.destroy()
+    return timings, widgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time Tk screen transitions.")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--difficulty", choices=["Easy", "Normal", "Hard"], default="Hard")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        timings, widgets = measure(args.rounds, args.difficulty)
+    except tk.TclError as exc:
+        print(f"No display available ({exc}). Try: xvfb-run python3 {sys.argv[0]}")
+        return 2
+
+    summary = {}
+    for name, samples in timings.items():
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        summary[name] = {"mean_ms": statistics.mean(samples) * 1000, "p95_ms": p95 * 1000,
+                         "samples": len(samples)}
+    if args.json:
+        print(json.dumps({"transitions": summary, "widgets": widgets}))
+        return 0
+    for name, row in summary.items():
+        print(f"{name:<20} mean {row['mean_ms']:7.3f} ms   "
+              f"p95 {row['p95_ms']:7.3f} ms   ({row['samples']} samples)")
+    print(f"top-level widgets after run: {widgets}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
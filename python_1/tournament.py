@@ -0,0 +1,315 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from candidates import CandidateTracker
+from engine import DIFFICULTY_CHOICES, Round, difficulty_config, level_table
+from hint_rules import BANDS, DIRECTION_TEXTS, HIGHER, LOWER
+from solver import shows_direction, solve_level
+
+# ================================
+# Bot Tournament
+# ================================
+# Bots play the CLI game headlessly and see exactly what a player sees: after
+# each miss, the lines play_level prints (the hot/cold hint, then the
+# higher/lower hint or riddle clue, if any). A bot is a Strategy subclass:
+#
+#   class MyBot(Strategy):
+#       def start_level(self, level, level_range, attempts, difficulty): ...
+#       def guess(self): return 42
+#       def feedback(self, guess, lines): ...
+#
+# Built-in bots are named below. Others are loaded as "module:Class".
+#
+# Each (bot, difficulty, game) is seeded from --seed alone. Every bot gets the
+# same targets in game n, and results do not depend on --workers. Games are
+# split into batches and played in a process pool. Bots answer instantly, so
+# every clear earns the full time bonus.
+
+# Hot/cold hint text -> (closest, farthest) distance it allows.
+BAND_DISTANCES = {
+    text: (previous + 1, limit)
+    for (previous, _), (limit, text) in zip(((-1, None),) + BANDS, BANDS)
+}
+BAND_CODES = {text: code for code, (_, text) in enumerate(BANDS)}
+# Higher/lower hint text -> True if the target is higher.
+HIGHER_TEXTS = {
+    text: higher
+    for higher_text, lower_text in DIRECTION_TEXTS["cli"].values()
+    for text, higher in ((higher_text, True), (lower_text, False))
+}
+SOLVER_LIMIT = 110
+
+
+def read_hints(lines):
+    """Split the lines shown after a miss into (band, higher, clue).
+
+    higher is None when no direction was shown; clue is None outside riddle mode.
+    """
+    band, higher, clue = None, None, None
+    for line in lines:
+        if line in BAND_DISTANCES:
+            band = line
+        elif line in HIGHER_TEXTS:
+            higher = HIGHER_TEXTS[line]
+        else:
+            clue = line
+    return band, higher, clue
+
+
+# ================================
+# Strategies
+# ================================
+class Strategy:
+    """A bot. One instance plays one game; rng is its only source of randomness."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def start_level(self, level, level_range, attempts, difficulty):
+        pass
+
+    def guess(self):
+        raise NotImplementedError
+
+    def feedback(self, guess, lines):
+        """lines: what play_level printed after this wrong guess, in order."""
+
+
+class RandomBot(Strategy):
+    """Guesses anywhere the higher/lower hints still allow."""
+
+    def start_level(self, level, level_range, attempts, difficulty):
+        self.lo, self.hi = 1, level_range
+
+    def guess(self):
+        return self.rng.randint(self.lo, self.hi)
+
+    def feedback(self, guess, lines):
+        _, higher, _ = read_hints(lines)
+        if higher is True:
+            self.lo = max(self.lo, guess + 1)
+        elif higher is False:
+            self.hi = min(self.hi, guess - 1)
+        self.hi = max(self.lo, self.hi)
+
+
+class BisectBot(Strategy):
+    """Keeps the window every hint allows and probes its middle.
+
+    When the next miss will not show a direction, it probes the low edge instead,
+    where the symmetric hot/cold bands can only point one way.
+    """
+
+    def start_level(self, level, level_range, attempts, difficulty):
+        self.lo, self.hi = 1, level_range
+        self.attempts_left = attempts
+        self.hint_type = difficulty["hint_type"]
+
+    def guess(self):
+        if shows_direction(self.hint_type, self.attempts_left):
+            return (self.lo + self.hi) // 2
+        return self.lo
+
+    def feedback(self, guess, lines):
+        self.attempts_left -= 1
+        band, higher, _ = read_hints(lines)
+        closest, farthest = BAND_DISTANCES[band]
+        farthest = self.hi - self.lo if farthest is None else farthest
+        pieces = [(max(self.lo, guess - farthest), min(self.hi, guess - closest)),
+                  (max(self.lo, guess + closest), min(self.hi, guess + farthest))]
+        if higher is not None:
+            pieces = [pieces[1] if higher else pieces[0]]
+        pieces = [(lo, hi) for lo, hi in pieces if lo <= hi]
+        if pieces:
+            self.lo, self.hi = pieces[0][0], pieces[-1][1]
+
+
+class FilterBot(BisectBot):
+    """Tracks every target consistent with all hints, riddle clues included."""
+
+    def start_level(self, level, level_range, attempts, difficulty):
+        super().start_level(level, level_range, attempts, difficulty)
+        self.candidates = CandidateTracker(level_range, difficulty["base_range"])
+
+    def guess(self):
+        if not self.candidates.count:
+            return super().guess()
+        return self.candidates.nth(self.candidates.count // 2)
+
+    def feedback(self, guess, lines):
+        super().feedback(guess, lines)
+        band, higher, clue = read_hints(lines)
+        self.candidates.add_miss(guess)
+        self.candidates.add_band(guess, BAND_CODES[band])
+        if higher is not None:
+            self.candidates.add_direction(guess, HIGHER if higher else LOWER)
+        if clue is not None:
+            self.candidates.add_clue(clue)
+
+
+class SolverBot(FilterBot):
+    """Follows solver.py's optimal decision tree on ranges small enough to solve."""
+
+    def start_level(self, level, level_range, attempts, difficulty):
+        super().start_level(level, level_range, attempts, difficulty)
+        self.node = None
+        if level_range <= SOLVER_LIMIT:
+            self.node = solve_level(level_range, attempts, difficulty["hint_type"],
+                                    difficulty["base_range"])
+
+    def guess(self):
+        if self.node is None or self.node.guess is None:
+            return super().guess()
+        return self.node.guess
+
+    def feedback(self, guess, lines):
+        super().feedback(guess, lines)
+        if self.node is not None:
+            band, higher, clue = read_hints(lines)
+            self.node = self.node.children().get(
+                (band, 0 if higher is None else (1 if higher else -1), clue))
+
+
+BOTS = {"random": RandomBot, "bisect": BisectBot, "filter": FilterBot, "solver": SolverBot}
+
+
+def load_bot(spec):
+    """A built-in bot name or "module:Class"."""
+    if spec in BOTS:
+        return BOTS[spec]
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown bot {spec!r}; use one of {sorted(BOTS)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# ================================
+# Headless play
+# ================================
+def play_game(bot_class, difficulty, seed, bot_name, game):
+    """Play one full game; return (won, score, levels_cleared, guesses)."""
+    key = f"{seed}:{difficulty['name']}:{game}"
+    target_rng = random.Random(key + ":targets")
+    clue_rng = random.Random(key + ":clues")
+    bot = bot_class(random.Random(f"{key}:{bot_name}"))
+    score = 0
+    guesses = 0
+    for level in level_table(difficulty):
+        game_round = Round(level, target_rng.randint(1, level.range), rng=clue_rng)
+        bot.start_level(level.number, level.range, level.attempts, difficulty)
+        while True:
+            guess = bot.guess()
+            guesses += 1
+            outcome = game_round.guess(guess)
+            if outcome.cleared:
+                score += outcome.gained
+                break
+            if outcome.lost:
+                return False, score, level.number - 1, guesses
+            bot.feedback(guess, outcome.feedback.lines())
+    return True, score, difficulty["levels"], guesses
+
+
+def play_batch(task):
+    bot_name, choice, seed, start, stop = task
+    bot_class = load_bot(bot_name)
+    difficulty = difficulty_config(choice, timed=False)
+    totals = [0, 0, 0, 0]
+    for game in range(start, stop):
+        for i, value in enumerate(play_game(bot_class, difficulty, seed, bot_name, game)):
+            totals[i] += value
+    return bot_name, difficulty["name"], stop - start, totals
+
+
+# ================================
+# Tournament
+# ================================
+def run_tournament(bots, choices, games, seed=0, workers=1, batch=200):
+    """Play every bot on every difficulty and return ranked standings."""
+    for bot in bots:
+        load_bot(bot)
+    tasks = [(bot, choice, seed, start, min(games, start + batch))
+             for choice in choices for bot in bots for start in range(0, games, batch)]
+    results = {}
+    if workers <= 1:
+        batches = map(play_batch, tasks)
+    else:
+        pool = ProcessPoolExecutor(workers)
+        batches = pool.map(play_batch, tasks)
+    try:
+        for bot, difficulty, played, (wins, score, levels, guesses) in batches:
+            row = results.setdefault((difficulty, bot), {
+                "bot": bot, "difficulty": difficulty, "games": 0, "wins": 0,
+                "score": 0, "levels_cleared": 0, "guesses": 0})
+            row["games"] += played
+            row["wins"] += wins
+            row["score"] += score
+            row["levels_cleared"] += levels
+            row["guesses"] += guesses
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    return rank(results.values())
+
+
+def rank(rows):
+    """Standings per difficulty (win rate, then mean score) and overall (mean rank)."""
+    standings = {}
+    for row in rows:
+        row["win_rate"] = row["wins"] / row["games"]
+        row["mean_score"] = row["score"] / row["games"]
+        row["guesses_per_game"] = row["guesses"] / row["games"]
+        standings.setdefault(row["difficulty"], []).append(row)
+    ranks = {}
+    for table in standings.values():
+        table.sort(key=lambda r: (-r["win_rate"], -r["mean_score"], r["bot"]))
+        for position, row in enumerate(table, 1):
+            row["rank"] = position
+            ranks.setdefault(row["bot"], []).append(position)
+    overall = sorted(({"bot": bot, "mean_rank": sum(p) / len(p)} for bot, p in ranks.items()),
+                     key=lambda r: (r["mean_rank"], r["bot"]))
+    return {"difficulties": standings, "overall": overall}
+
+
+def print_standings(standings):
+    for difficulty, table in standings["difficulties"].items():
+        print(f"\n{difficulty}")
+        print(f"  {'#':>2} {'Bot':<24} {'Win rate':>9} {'Mean score':>11} {'Levels':>7} {'Guesses':>8}")
+        for row in table:
+            print(f"  {row['rank']:>2} {row['bot']:<24} {row['win_rate']:>9.2%} "
+                  f"{row['mean_score']:>11.1f} {row['levels_cleared'] / row['games']:>7.2f} "
+                  f"{row['guesses_per_game']:>8.2f}")
+    print("\nOverall")
+    for position, row in enumerate(standings["overall"], 1):
+        print(f"  {position:>2} {row['bot']:<24} mean rank {row['mean_rank']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a seeded bot tournament.")
+    parser.add_argument("--bots", default=",".join(BOTS),
+                        help="comma-separated built-in names or module:Class specs")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_CHOICES) + ["all"], default="all")
+    parser.add_argument("--games", type=int, default=1000, help="games per bot and difficulty")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=200, help="games per pool task")
+    parser.add_argument("--json", help="also write the standings to this file")
+    args = parser.parse_args(argv)
+
+    names = list(DIFFICULTY_CHOICES) if args.difficulty == "all" else [args.difficulty]
+    standings = run_tournament(args.bots.split(","), [DIFFICULTY_CHOICES[n] for n in names],
+                               args.games, args.seed, args.workers, args.batch)
+    print_standings(standings)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(standings, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())